@@ -3,10 +3,13 @@ from app.application.use_cases.use_case_interfaces.tapi_user_interface import (
     IUserUseCase,
 )
 from app.domain.dtos.tapi_user_create import UserCreateDTO
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
 from app.domain.dtos.tapi_user_organisation import UserAddOrganisationDTO, UserRemoveOrganisationDTO
 from app.domain.dtos.tapi_user_update import UserUpdateDTO  # Assuming this exists
 from app.domain.models.tapi_user_model import User
-from typing import List
+from app.domain.models.tapi_user_page_model import UserPage
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
 
 
 
@@ -17,28 +20,61 @@ class UserApplicationService:
     ):
         self.user_use_case = user_use_case
 
-    def create_user(self, user_dto: UserCreateDTO) -> str:
-        return self.user_use_case.create_user(user_dto)
+    @TraceHelper.traced
+    async def create_user(self, user_dto: UserCreateDTO) -> str:
+        return await self.user_use_case.create_user(user_dto)
+
+    @TraceHelper.traced
+    async def import_users(self, user_dtos: List[UserCreateDTO]) -> List[dict]:
+        return await self.user_use_case.import_users(user_dtos)
 
        
-    def update_user(self, user_reference: str, user_dto: UserUpdateDTO, current_user_reference) -> str:
-        return self.user_use_case.update_user(user_reference, user_dto, current_user_reference)
+    @TraceHelper.traced
+    async def update_user(self, user_reference: str, user_dto: UserUpdateDTO, current_user_reference, expected_version: Optional[int] = None) -> str:
+        return await self.user_use_case.update_user(user_reference, user_dto, current_user_reference, expected_version)
        
     
-    def remove_user_from_organisation(self, user_reference: str, organisation_remove_dto: UserRemoveOrganisationDTO, current_user_reference) -> str:
-        return self.user_use_case.remove_user_from_organisation(user_reference, organisation_remove_dto, current_user_reference)
+    @TraceHelper.traced
+    async def remove_user_from_organisation(self, user_reference: str, organisation_remove_dto: UserRemoveOrganisationDTO, current_user_reference, expected_version: Optional[int] = None) -> str:
+        return await self.user_use_case.remove_user_from_organisation(user_reference, organisation_remove_dto, current_user_reference, expected_version)
        
-    def add_user_to_organisation(self, user_reference: str, user_dto: UserAddOrganisationDTO, current_user_reference) -> str:
-        return self.user_use_case.add_user_to_organisation(user_reference, user_dto, current_user_reference)
+    @TraceHelper.traced
+    async def add_user_to_organisation(self, user_reference: str, user_dto: UserAddOrganisationDTO, current_user_reference, expected_version: Optional[int] = None) -> str:
+        return await self.user_use_case.add_user_to_organisation(user_reference, user_dto, current_user_reference, expected_version)
+
+    @TraceHelper.traced
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None
+    ) -> User:
+        return await self.user_use_case.get_user_by_reference(user_reference, fields)
+
+    @TraceHelper.traced
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        return await self.user_use_case.get_users_by_references(user_references, fields)
+
+    @TraceHelper.traced
+    async def get_all_users(
+        self, page: int, per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        return await self.user_use_case.get_all_users(page, per_page, fields)
 
-    def get_user_by_reference(self, user_reference: str) -> User:
-        return self.user_use_case.get_user_by_reference(user_reference)
+    @TraceHelper.traced
+    async def get_users_by_cursor(
+        self, cursor: Optional[str], per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> UserPage:
+        return await self.user_use_case.get_users_by_cursor(cursor, per_page, fields)
 
-    def get_all_users(self, page: int) -> List[User]:
-        return self.user_use_case.get_all_users(page)
+    def export_users(
+        self, export_filter: UserExportFilterDTO, fields: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[User]:
+        return self.user_use_case.export_users(export_filter, fields)
 
-    def delete_user(self, user_reference: str) -> bool:
-        return self.user_use_case.delete_user(user_reference)
+    @TraceHelper.traced
+    async def delete_user(self, user_reference: str) -> bool:
+        return await self.user_use_case.delete_user(user_reference)
 
-    def soft_delete_user(self, user_reference: str) -> bool:
-        return self.user_use_case.soft_delete_user(user_reference)
+    @TraceHelper.traced
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        return await self.user_use_case.soft_delete_user(user_reference)
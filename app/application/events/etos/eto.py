@@ -1,9 +1,10 @@
-import json
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 import uuid
 
 from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
+from app.infrastructure.system.tracing.utils.data.trace_data import current_span
 
 
 class Event:
@@ -13,16 +14,28 @@ class Event:
         event_type: str,
         event_user_reference: str,
         event_data: Any,
+        event_reference: Optional[str] = None,
+        event_date: Optional[str] = None,
+        event_source: Optional[str] = None,
+        event_trace_id: Optional[str] = None,
+        event_span_id: Optional[str] = None,
+        event_correlation_id: Optional[str] = None,
     ):
-        self.event_reference = str(uuid.uuid4())
+        # The optional fields are only passed when rebuilding a received event
+        self.event_reference = event_reference or str(uuid.uuid4())
         self.event_name = event_name
         self.event_date = (
-            datetime.now().isoformat()
+            event_date or datetime.now().isoformat()
         )  # Consider using datetime object for internal representation
         self.event_type = event_type
-        self.event_source = Config.App_name
+        self.event_source = event_source or Config.App_name
         self.event_user_reference = event_user_reference
         self.event_data = event_data  # Arbitrary data associated with the event
+        # The trace of the request that raised the event, so subscribers can continue it
+        span = current_span.get()
+        self.event_trace_id = event_trace_id or (span.trace_id if span else None)
+        self.event_span_id = event_span_id or (span.span_id if span else None)
+        self.event_correlation_id = event_correlation_id or (span.correlation_id or None if span else None)
 
     def serialize(self) -> str:
         """Serializes the event to a JSON string."""
@@ -39,13 +52,16 @@ class Event:
                 if isinstance(self.event_data, (dict, list))
                 else str(self.event_data)
             ),
+            "event_trace_id": self.event_trace_id,
+            "event_span_id": self.event_span_id,
+            "event_correlation_id": self.event_correlation_id,
         }
-        return json.dumps(event_dict)
+        return SerializerHelper.dumps(event_dict)
 
     @staticmethod
     def deserialize(data: str):
         """Deserializes a JSON string back into an Event object."""
-        obj = json.loads(data)
+        obj = SerializerHelper.loads(data)
         return Event(
             event_reference=obj["event_reference"],
             event_name=obj["event_name"],
@@ -56,4 +72,8 @@ class Event:
             event_data=obj[
                 "event_data"
             ],  # Further parsing may be required based on expected structure
+            # Absent from events published before tracing
+            event_trace_id=obj.get("event_trace_id"),
+            event_span_id=obj.get("event_span_id"),
+            event_correlation_id=obj.get("event_correlation_id"),
         )
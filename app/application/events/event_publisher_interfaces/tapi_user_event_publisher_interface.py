@@ -1,18 +1,22 @@
 # app/application/events/event_publisher_interface.py
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List
 
 
 class IUserEventPublisher(ABC):
     @abstractmethod
-    def publish_user_created_event(self, event_data: Any):
+    async def publish_user_created_event(self, event_data: Any):
         pass
     
     @abstractmethod
-    def publish_user_updated_event(self, event_data: Any):
+    async def publish_user_created_events(self, events_data: List[Any]):
         pass
 
     @abstractmethod
-    def publish_user_added_to_organisation_event(self, event_data: Any):
+    async def publish_user_updated_event(self, event_data: Any):
+        pass
+
+    @abstractmethod
+    async def publish_user_added_to_organisation_event(self, event_data: Any):
         pass
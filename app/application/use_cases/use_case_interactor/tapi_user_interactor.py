@@ -4,62 +4,94 @@ from datetime import datetime
 from app.application.events.etos.eto import Event
 from app.application.events.event_publisher_interfaces.tapi_user_event_publisher_interface import IUserEventPublisher
 from app.domain.dtos.tapi_user_organisation import UserAddOrganisationDTO, UserRemoveOrganisationDTO
-from app.domain.repository_interfaces.tapi_user_respository_interface import (
-    IUserRepository,
+from app.domain.repository_interfaces.tapi_user_async_repository_interface import (
+    IAsyncUserRepository,
 )
 from app.application.use_cases.use_case_interfaces.tapi_user_interface import (
     IUserUseCase,
 )
 from app.domain.dtos.tapi_user_create import UserCreateDTO
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
 from app.domain.dtos.tapi_user_update import UserUpdateDTO  # Assuming this exists
+from app.domain.models.tapi_outbox_message_model import OutboxMessage, UserEventBuilder
 from app.domain.models.tapi_user_model import User
-from typing import List
+from app.domain.models.tapi_user_page_model import UserPage
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
 
 from app.domain.shared.shared_errors import DomainError, ErrorType
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
 
 
 class UserUseCase(IUserUseCase):
-    def __init__(self, user_repository: IUserRepository,user_event_publisher: IUserEventPublisher):
+    def __init__(self, user_repository: IAsyncUserRepository,user_event_publisher: IUserEventPublisher):
         self.user_repository = user_repository
         self.user_event_publisher = user_event_publisher
 
-    def create_user(self, user_dto: UserCreateDTO) -> str:
-         # Check if a user with the same email already exists
-        existing_user = self.user_repository.get_user_by_email(user_dto.email)
-        #  If the user exists by email
-        if existing_user:
-            # If the user exists, raise a conflict error
-            raise DomainError(
-                ErrorType.ConflictError,
-                f"A user with the email {user_dto.email} already exists.",
-        )
-        # check if the user exists by user reference
-        existing_user = self.user_repository.get_user_by_reference(user_dto.user_reference)
-
-        if existing_user:
-            # If the user exists, raise a conflict error
-            raise DomainError(
-                ErrorType.ConflictError,
-                f"A user with the reference {user_dto.user_reference} already exists.",
-        )
-
+    @TraceHelper.traced
+    async def create_user(self, user_dto: UserCreateDTO) -> str:
+        # Email and reference uniqueness is enforced by unique indexes; a clash
+        # surfaces from the repository as a ConflictError
         #  map dto to user object
         user = User.from_create_dto(user_dto)
-        #  create user
-        user_reference =  self.user_repository.create_user(user)
-        
+
          # Create a user created event
-        user_created_event = Event(
-            "UserCreatedEvent", "UserEvent", user_reference, user_dto.to_json()
-        ).serialize()
+        def user_created_event(user: User) -> str:
+            return Event(
+                "UserCreatedEvent", "UserEvent", user.user_reference, user_dto.to_json()
+            ).serialize()
+
+        #  create user
+        user_reference = await self.user_repository.create_user(
+            user, self._outbox("UserCreatedEvent", user_created_event)
+        )
 
         # publish user created event
-        self.user_event_publisher.publish_user_created_event(user_created_event)
+        await self._publish(self.user_event_publisher.publish_user_created_event, user_created_event, user)
         
         return user_reference
 
 
-    def update_user(self, user_reference: str, user_dto: UserUpdateDTO, current_user_reference: str) -> str:
+    @TraceHelper.traced
+    async def import_users(self, user_dtos: List[UserCreateDTO]) -> List[dict]:
+        users = [User.from_create_dto(user_dto) for user_dto in user_dtos]
+        user_dtos_by_reference = {user_dto.user_reference: user_dto for user_dto in user_dtos}
+
+        def user_created_event(user: User) -> str:
+            return Event(
+                "UserCreatedEvent", "UserEvent", user.user_reference, user_dtos_by_reference[user.user_reference].to_json()
+            ).serialize()
+
+        # Uniqueness is enforced by the unique indexes; clashes come back per record
+        failures = await self.user_repository.create_users(
+            users, self._outbox("UserCreatedEvent", user_created_event)
+        )
+
+        results = []
+        created_users = []
+        for index, user_dto in enumerate(user_dtos):
+            if index in failures:
+                results.append({"user_reference": user_dto.user_reference, "status": "failed", "errors": [failures[index]]})
+                continue
+            results.append({"user_reference": user_dto.user_reference, "status": "created"})
+            created_users.append(users[index])
+
+        # publish the user created events of the batch together
+        if created_users and Config.Event_delivery == "direct":
+            await self.user_event_publisher.publish_user_created_events(
+                [user_created_event(user) for user in created_users]
+            )
+
+        return results
+
+    @TraceHelper.traced
+    async def update_user(
+        self,
+        user_reference: str,
+        user_dto: UserUpdateDTO,
+        current_user_reference: str,
+        expected_version: Optional[int] = None,
+    ) -> str:
         
         # check if is logged in
        
@@ -68,34 +100,40 @@ class UserUseCase(IUserUseCase):
             raise DomainError(
                 ErrorType.UnAuthorized, "You are not authorized to update this user details"
             )
-        # check if user exists
-        user = self.user_repository.get_user_by_reference(user_reference)
-        if not user:
-            # If the user exists, raise a conflict error
-            raise DomainError(
-                ErrorType.NotFound, 
-                f"A user record with the reference {user_reference} does not exist.",
-            )
 
-        user.first_name = user_dto.first_name
-        user.last_name = user_dto.last_name
-        user.mobile_number = user_dto.mobile_number
-        user.updated_at_timestamp = user_dto.updated_at_timestamp
-        user.consent_preferences = user_dto.consent_preferences
-        
-        self.user_repository.update_user(user_reference, user)
-      # Create a user updated event
-        user_updated_event = Event(
-            "UserUpdatedEvent", "UserEvent", user_reference, user.to_json()
-        ).serialize()
+        changes = {
+            "first_name": user_dto.first_name,
+            "last_name": user_dto.last_name,
+            "full_name": f"{user_dto.first_name} {user_dto.last_name}",
+            "mobile_number": user_dto.mobile_number,
+            "consent_preferences": user_dto.consent_preferences,
+            "updated_at_timestamp": user_dto.updated_at_timestamp,
+        }
+      # Create a user updated event from the user as written
+        def user_updated_event(user: User) -> str:
+            return Event(
+                "UserUpdatedEvent", "UserEvent", user_reference, user.to_json()
+            ).serialize()
+
+        # Single guarded round trip; the returned post-image feeds the event
+        user = await self.user_repository.update_user_fields(
+            user_reference, changes, expected_version, self._outbox("UserUpdatedEvent", user_updated_event)
+        )
+        if not user:
+            raise await self._write_failure(user_reference, expected_version)
 
         # publish user updated event
-        self.user_event_publisher.publish_user_updated_event(user_updated_event)
+        await self._publish(self.user_event_publisher.publish_user_updated_event, user_updated_event, user)
 
         return user_reference
 
-    def add_user_to_organisation(
-        self, user_reference: str, user_dto: UserAddOrganisationDTO, current_user_reference: str
+    @TraceHelper.traced
+    async def add_user_to_organisation(
+        self,
+        user_reference: str,
+        user_dto: UserAddOrganisationDTO,
+        current_user_reference: str,
+        expected_version: Optional[int] = None,
     ) -> str:
         
          # check if is logged in
@@ -105,44 +143,48 @@ class UserUseCase(IUserUseCase):
             raise DomainError(
                 ErrorType.UnAuthorized, "You are not authorized to update this user details"
             )
-        
-        #  check if user exists
-        user = self.user_repository.get_user_by_reference(user_reference)
-        if not user:
-            # The target user for the update does not exist
-            raise DomainError(
-                ErrorType.NotFound, 
-                f"A user record with the reference {user_reference} does not exist.",
-            )
 
-        # Check if the user already belongs to the specified organization
-        # by comparing a unique identifier like organisation_name or organisation_id
-        if any(organisation.organisation_name == user_dto.organisation.organisation_name for organisation in user.organisations):
-            # The user already belongs to this organisation
-            raise DomainError(
-                ErrorType.ConflictError, 
-                f"User already belongs to organisation: {user_dto.organisation.organisation_name}.",
-            )
-            
-        # Add the new organisation to the user's list of organisations
-        user.organisations.append(user_dto.organisation)
-        user.updated_at_timestamp = user_dto.updated_at_timestamp
+        organisation = user_dto.organisation_document()
+        organisation_name = organisation.get("organisation_name")
 
-        # Update the user record in the repository
-        self.user_repository.update_user(user_reference, user)
-        
          # Create an event
-        user_updated_event = Event(
-            "UserAddedToOrganisationEvent", "UserEvent", current_user_reference, user.to_json()
-        ).serialize()
+        def user_added_event(user: User) -> str:
+            return Event(
+                "UserAddedToOrganisationEvent", "UserEvent", current_user_reference, user.to_json()
+            ).serialize()
+
+        # Atomically push the organisation; the repository checks membership in the same operation
+        user = await self.user_repository.add_user_organisation(
+            user_reference,
+            organisation,
+            user_dto.updated_at_timestamp,
+            expected_version,
+            self._outbox("UserAddedToOrganisationEvent", user_added_event),
+        )
+        if not user:
+            # The user is missing, at another version, or already belongs to the organisation
+            raise await self._write_failure(
+                user_reference,
+                expected_version,
+                DomainError(
+                    ErrorType.ConflictError,
+                    f"User already belongs to organisation: {organisation_name}.",
+                ),
+            )
 
         # publish user updated event
-        self.user_event_publisher.publish_user_added_to_organisation_event(user_updated_event)
+        await self._publish(self.user_event_publisher.publish_user_added_to_organisation_event, user_added_event, user)
 
         return user_reference
 
-    def remove_user_from_organisation(
-        self, user_reference: str, organisation_remove_dto: UserRemoveOrganisationDTO, current_user_reference: str) -> str:
+    @TraceHelper.traced
+    async def remove_user_from_organisation(
+        self,
+        user_reference: str,
+        organisation_remove_dto: UserRemoveOrganisationDTO,
+        current_user_reference: str,
+        expected_version: Optional[int] = None,
+    ) -> str:
         
           # check if is logged in
        
@@ -151,45 +193,78 @@ class UserUseCase(IUserUseCase):
             raise DomainError(
                 ErrorType.UnAuthorized, "You are not authorized to update this user details"
             )
-        
 
-        user = self.user_repository.get_user_by_reference(user_reference)
-        if not user:
-            # The target user for the update does not exist
-            raise DomainError(
-                ErrorType.NotFound, 
-                f"A user record with the reference {user_reference} does not exist.",
-            )
+          # Create a user updated event
+        def user_removed_event(user: User) -> str:
+            return Event(
+                "UserRemovedFromOrganisationEvent", "UserEvent", current_user_reference, user.to_json()
+            ).serialize()
 
-        # Check if the user belongs to the specified organization
-        organisation = next((org for org in user.organisations if org.organisation_reference == organisation_remove_dto.organisation_reference), None)
-        if not organisation:
-            # The user does not belong to this organisation
-            raise DomainError(
-                ErrorType.ConflictError, 
-                f"User does not belong to the organisation with reference: {organisation_remove_dto.organisation_reference}.",
+        # Atomically pull the organisation; nothing is removed if the user does not belong to it
+        updated_at_timestamp = datetime.now().isoformat()
+        user = await self.user_repository.remove_user_organisation(
+            user_reference,
+            organisation_remove_dto.organisation_reference,
+            updated_at_timestamp,
+            expected_version,
+            # Published on the same channel as additions, like the direct publisher does
+            self._outbox("UserAddedToOrganisationEvent", user_removed_event),
+        )
+        if not user:
+            raise await self._write_failure(
+                user_reference,
+                expected_version,
+                DomainError(
+                    ErrorType.ConflictError,
+                    f"User does not belong to the organisation with reference: {organisation_remove_dto.organisation_reference}.",
+                ),
             )
-            
-        # Remove the specified organisation from the user's list of organisations
-        user.organisations.remove(organisation)
-        user.updated_at_timestamp = datetime.now().isoformat()
-
-        # Update the user record in the repository
-        self.user_repository.update_user(user_reference, user)
-        
-          # Create a user updated event
-        user_updated_event = Event(
-            "UserRemovedFromOrganisationEvent", "UserEvent", current_user_reference, user.to_json()
-        ).serialize()
 
         # publish user updated event
-        self.user_event_publisher.publish_user_added_to_organisation_event(user_updated_event)
+        await self._publish(self.user_event_publisher.publish_user_added_to_organisation_event, user_removed_event, user)
 
         return user_reference
 
-        
-    def get_user_by_reference(self, user_reference: str) -> User:
-        user =  self.user_repository.get_user_by_reference(user_reference)
+    def _outbox(self, channel: str, build_event: Callable[[User], str]) -> Optional[UserEventBuilder]:
+        # With the outbox, the event is stored together with the write and relayed to Redis later
+        if Config.Event_delivery != "outbox":
+            return None
+        return lambda user: [OutboxMessage(channel, build_event(user))]
+
+    async def _publish(self, publish: Callable[[str], Awaitable[None]], build_event: Callable[[User], str], user: User):
+        # Direct delivery publishes straight after the write; with change_stream delivery
+        # the change publisher process emits the event instead
+        if Config.Event_delivery == "direct":
+            await publish(build_event(user))
+
+    async def _write_failure(
+        self, user_reference: str, expected_version: Optional[int], conflict: DomainError = None
+    ) -> DomainError:
+        # A guarded write matched nothing; one read on the primary tells which guard failed
+        user = await self.user_repository.get_user_by_reference(user_reference, use_primary=True)
+        if not user:
+            return DomainError(
+                ErrorType.NotFound,
+                f"A user record with the reference {user_reference} does not exist.",
+            )
+        if expected_version is not None and user.version != expected_version:
+            return DomainError(
+                ErrorType.PreconditionFailed,
+                f"User {user_reference} is at version {user.version}, not the expected version {expected_version}.",
+            )
+        if conflict:
+            return conflict
+        # The user changed between the write and this read
+        return DomainError(
+            ErrorType.PreconditionFailed,
+            f"User {user_reference} was modified concurrently, please retry.",
+        )
+
+    @TraceHelper.traced
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None
+    ) -> User:
+        user = await self.user_repository.get_user_by_reference(user_reference, fields)
         if not user:
             raise DomainError(
                 ErrorType.NotFound, 
@@ -197,14 +272,40 @@ class UserUseCase(IUserUseCase):
             )
         return user
 
-    def get_user_by_email(self, email: str) -> User:
-        return self.user_repository.get_user_by_email(email)
+    @TraceHelper.traced
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        # Drop duplicates while keeping the caller's order
+        user_references = list(dict.fromkeys(user_references))
+        return await self.user_repository.get_users_by_references(user_references, fields)
+
+    @TraceHelper.traced
+    async def get_user_by_email(self, email: str) -> User:
+        return await self.user_repository.get_user_by_email(email)
+
+    @TraceHelper.traced
+    async def get_all_users(
+        self, page: int, per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        return await self.user_repository.get_all_users(page, per_page, fields)
+
+    @TraceHelper.traced
+    async def get_users_by_cursor(
+        self, cursor: Optional[str], per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> UserPage:
+        return await self.user_repository.get_users_by_cursor(cursor, per_page, fields=fields)
 
-    def get_all_users(self, page: int) -> List[User]:
-        return self.user_repository.get_all_users(page)
+    async def export_users(
+        self, export_filter: UserExportFilterDTO, fields: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[User]:
+        async for user in self.user_repository.iter_users(export_filter, Config.Export_batch_size, fields):
+            yield user
 
-    def delete_user(self, user_reference: str) -> bool:
-        return self.user_repository.delete_user(user_reference)
+    @TraceHelper.traced
+    async def delete_user(self, user_reference: str) -> bool:
+        return await self.user_repository.delete_user(user_reference)
 
-    def soft_delete_user(self, user_reference: str) -> bool:
-        return self.user_repository.soft_delete_user(user_reference)
+    @TraceHelper.traced
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        return await self.user_repository.soft_delete_user(user_reference)
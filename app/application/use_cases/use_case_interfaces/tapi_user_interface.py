@@ -1,48 +1,93 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 from app.domain.dtos.tapi_user_create import UserCreateDTO
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
 from app.domain.dtos.tapi_user_organisation import UserAddOrganisationDTO, UserRemoveOrganisationDTO
 from app.domain.dtos.tapi_user_update import UserUpdateDTO  # Assuming this exists
 from app.domain.models.tapi_user_model import User
+from app.domain.models.tapi_user_page_model import UserPage
 
 
 class IUserUseCase(ABC):
     @abstractmethod
-    def create_user(self, user_dto: UserCreateDTO) -> str:
+    async def create_user(self, user_dto: UserCreateDTO) -> str:
         """Create a new user."""
         pass
 
     @abstractmethod
-    def update_user(
-        self, user_reference: str, user_dto: UserUpdateDTO, current_user_reference: str
+    async def import_users(self, user_dtos: List[UserCreateDTO]) -> List[dict]:
+        """
+        Create a batch of users in one bulk write.
+
+        Parameters:
+            user_dtos (List[UserCreateDTO]): The validated users to create.
+
+        Returns:
+            List[dict]: One result per user, in input order, with its reference, status and any errors.
+        """
+        pass
+
+    @abstractmethod
+    async def update_user(
+        self,
+        user_reference: str,
+        user_dto: UserUpdateDTO,
+        current_user_reference: str,
+        expected_version: Optional[int] = None,
     ) -> str:
-        """Update an existing user."""
+        """Update an existing user, optionally only if it is still at the expected version."""
         pass
     
     @abstractmethod
-    def add_user_to_organisation(
-        self, user_reference: str, user_dto: UserAddOrganisationDTO, current_user_reference: str
+    async def add_user_to_organisation(
+        self,
+        user_reference: str,
+        user_dto: UserAddOrganisationDTO,
+        current_user_reference: str,
+        expected_version: Optional[int] = None,
     ) -> str:
-        """Update an existing user."""
+        """Add a user to an organisation, optionally only if it is still at the expected version."""
         pass
 
     @abstractmethod
-    def get_user_by_reference(self, user_reference: str) -> User:
-        """Retrieve a user by its reference."""
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None
+    ) -> User:
+        """Retrieve a user by its reference, optionally loading only the given fields."""
+        pass
+
+    @abstractmethod
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        """
+        Retrieve many users by reference in one lookup.
+
+        Parameters:
+            user_references (List[str]): The references of the users to retrieve.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            Dict[str, User]: The users found, keyed by reference. Missing references are absent rather than an error.
+        """
         pass
 
     @abstractmethod
-    def get_user_by_email(self, email: str) -> User:
+    async def get_user_by_email(self, email: str) -> User:
         """Retrieve a user by its email."""
         pass
 
     @abstractmethod
-    def get_all_users(self, page: int) -> List[User]:
+    async def get_all_users(
+        self, page: int, per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
         """
         Retrieve a paginated list of all users.
 
         Parameters:
             page (int): The page number to retrieve.
+            per_page (int): The number of users per page.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
 
         Returns:
             List[User]: A list of User objects.
@@ -50,7 +95,40 @@ class IUserUseCase(ABC):
         pass
 
     @abstractmethod
-    def delete_user(self, user_reference: str) -> bool:
+    async def get_users_by_cursor(
+        self, cursor: Optional[str], per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> UserPage:
+        """
+        Retrieve a page of users using keyset pagination.
+
+        Parameters:
+            cursor (Optional[str]): The cursor returned with the previous page, or None for the first page.
+            per_page (int): The number of users per page.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            UserPage: The users on the page and the cursor of the next page, if any.
+        """
+        pass
+
+    @abstractmethod
+    def export_users(
+        self, export_filter: UserExportFilterDTO, fields: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[User]:
+        """
+        Stream every user matching the export filter.
+
+        Parameters:
+            export_filter (UserExportFilterDTO): The filters to apply.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            AsyncIterator[User]: The matching users, fetched from the database in batches.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_user(self, user_reference: str) -> bool:
         """
         Delete a user permanently.
 
@@ -63,7 +141,7 @@ class IUserUseCase(ABC):
         pass
 
     @abstractmethod
-    def soft_delete_user(self, user_reference: str) -> bool:
+    async def soft_delete_user(self, user_reference: str) -> bool:
         """
         Soft delete a user.
 
@@ -76,8 +154,12 @@ class IUserUseCase(ABC):
         pass
 
     @abstractmethod
-    def remove_user_from_organisation(
-        self, user_reference: str, organisation_remove_dto: UserRemoveOrganisationDTO, current_user_reference: str
+    async def remove_user_from_organisation(
+        self,
+        user_reference: str,
+        organisation_remove_dto: UserRemoveOrganisationDTO,
+        current_user_reference: str,
+        expected_version: Optional[int] = None,
     ) -> str:
-        """Update an existing user."""
+        """Remove a user from an organisation, optionally only if it is still at the expected version."""
         pass
\ No newline at end of file
@@ -1,4 +1,4 @@
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import datetime
 import app.domain.shared.shared_validation as validator
 
@@ -26,5 +26,10 @@ class UserCreateDTO:
    
 
     def to_json(self):
-        # Converts the UserCreateDTO and its nested objects to a dictionary
-        return asdict(self)
+        # The fields are set in __init__ rather than declared, so asdict would find none
+        return {
+            "user_reference": self.user_reference,
+            "email": self.email,
+            "created_at_timestamp": self.created_at_timestamp,
+            "updated_at_timestamp": self.updated_at_timestamp,
+        }
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.domain.shared.shared_errors import DomainError, ErrorType
+import app.domain.shared.shared_validation as validator
+
+
+@dataclass
+class UserExportFilterDTO:
+    def __init__(
+        self,
+        is_active: Optional[bool] = None,
+        organisation_reference: Optional[str] = None,
+        updated_since: Optional[str] = None,
+    ):
+        if organisation_reference is not None:
+            validator.validate_uuid_format(organisation_reference, "Organisation Reference")
+        if updated_since is not None:
+            try:
+                datetime.fromisoformat(updated_since)
+            except ValueError:
+                raise DomainError(
+                    ErrorType.ValidationError,errors = [{"updated_since":"Updated since must be an ISO 8601 timestamp"}]
+                )
+
+        # Only the filters that are set are applied
+        self.is_active = is_active
+        self.organisation_reference = organisation_reference
+        self.updated_since = updated_since
+
+    def to_json(self):
+        return dict(self.__dict__)
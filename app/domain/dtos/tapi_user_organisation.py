@@ -1,4 +1,4 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 from app.domain.models.tapi_organisation_model import Organisation
 
@@ -17,8 +17,17 @@ class UserAddOrganisationDTO:
     
 
     def to_json(self):
-        # Use asdict to convert all fields, including Optional ones, to a dictionary
-        return asdict(self)
+        # The fields are set in __init__ rather than declared, so asdict would find none
+        return {
+            "organisation": self.organisation_document(),
+            "updated_at_timestamp": self.updated_at_timestamp,
+        }
+
+    def organisation_document(self) -> dict:
+        # The organisation as it is stored in the user's organisations array
+        if callable(getattr(self.organisation, "to_json", None)):
+            return self.organisation.to_json()
+        return dict(self.organisation)
 
 
 @dataclass
@@ -35,7 +44,9 @@ class UserRemoveOrganisationDTO:
     
 
     def to_json(self):
-        # Use asdict to convert all fields, including Optional ones, to a dictionary
-        return asdict(self)
+        return {
+            "organisation_reference": self.organisation_reference,
+            "updated_at_timestamp": self.updated_at_timestamp,
+        }
 
 
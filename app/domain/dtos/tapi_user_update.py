@@ -1,4 +1,4 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 import app.domain.shared.shared_validation as validator
 from app.domain.shared import shared_constants
@@ -35,7 +35,13 @@ class UserUpdateDTO:
     
 
     def to_json(self):
-        # Use asdict to convert all fields, including Optional ones, to a dictionary
-        return asdict(self)
+        return {
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "mobile_number": self.mobile_number,
+            "consent_preferences": self.consent_preferences,
+            "created_at_timestamp": self.created_at_timestamp,
+            "updated_at_timestamp": self.updated_at_timestamp,
+        }
 
 
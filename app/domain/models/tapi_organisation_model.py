@@ -18,5 +18,10 @@ class Organisation:
 
     def to_json(self):
         return {attr: getattr(self, attr) for attr in self.__dict__ if not attr.startswith('_')}
-    
-    
\ No newline at end of file
+
+    @staticmethod
+    def get_field(organisation, field_name: str):
+        # Organisations loaded from Mongo are plain dicts rather than Organisation objects
+        if isinstance(organisation, dict):
+            return organisation.get(field_name)
+        return getattr(organisation, field_name, None)
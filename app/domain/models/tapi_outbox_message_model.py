@@ -0,0 +1,23 @@
+from typing import Any, Callable, List
+
+from app.domain.models.tapi_user_model import User
+
+
+class OutboxMessage:
+    def __init__(
+        self,
+        channel: str,
+        payload: str,
+        message_id: Any = None,
+        attempts: int = 0,
+    ):
+        self.channel = channel
+        # The serialized event, exactly as it will be published
+        self.payload = payload
+        # Assigned by the outbox store once the message is persisted
+        self.message_id = message_id
+        self.attempts = attempts
+
+
+# Builds the messages to store alongside a write from the user as written
+UserEventBuilder = Callable[[User], List[OutboxMessage]]
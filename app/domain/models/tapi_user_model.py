@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 
 from app.domain.dtos.tapi_user_create import UserCreateDTO
@@ -8,35 +8,60 @@ from app.domain.models.tapi_organisation_model import Organisation
 
 
 class User:
+    # Public fields of a user, in serialization order
+    FIELDS = (
+        "user_reference",
+        "first_name",
+        "last_name",
+        "full_name",
+        "mobile_number",
+        "email",
+        "organisations",
+        "is_verified_email",
+        "is_verified_phone",
+        "is_active",
+        "created_at_timestamp",
+        "updated_at_timestamp",
+        "consent_preferences",
+        "version",
+    )
+    # Derived fields and the stored fields they are computed from
+    FIELD_DEPENDENCIES = {"full_name": ("first_name", "last_name")}
+
     def __init__(
         self,
         user_reference: str,
-        first_name: str,
-        last_name: str,
-        mobile_number: str,
-        email: str,
-        organisations: List[Organisation],
-        is_verified_email: bool,
-        is_verified_phone: bool,
-        is_active: bool,
+        first_name: str = "",
+        last_name: str = "",
+        mobile_number: str = "",
+        email: str = "",
+        organisations: List[Organisation] = None,
+        is_verified_email: bool = False,
+        is_verified_phone: bool = False,
+        is_active: bool = True,
         created_at_timestamp: Optional[str] = "",
         updated_at_timestamp: Optional[str] = "",
         consent_preferences: dict = None,
+        version: int = 0,
         **kwargs,  # Accept any additional keyword arguments
     ):
+        # Every field but the reference has a default so that partially
+        # projected documents can still be loaded
         self.user_reference = user_reference
         self.first_name = first_name
         self.last_name = last_name
         self.full_name = f"{self.first_name} {self.last_name}"  # Updated for a more common full name format
         self.mobile_number = mobile_number
         self.email = email
-        self.organisations = organisations
+        self.organisations = organisations or []
         self.is_verified_email = is_verified_email
         self.is_verified_phone = is_verified_phone
         self.is_active = is_active
         self.created_at_timestamp = created_at_timestamp
         self.updated_at_timestamp = updated_at_timestamp
         self.consent_preferences = consent_preferences or {}
+        # Incremented by every write, for optimistic concurrency control
+        self.version = version
 
 
 
@@ -44,27 +69,38 @@ class User:
         if kwargs:
             pass
 
-    def to_json(self):
-        # Basic serialization for top-level, simple attributes
-        data = {
-            attr: getattr(self, attr)
-            for attr in self.__dict__
-            if not attr.startswith("_")
-        }
-
-        # Custom handling for complex attributes like 'address' and 'organisations'
-        if hasattr(self, "address") and callable(
-            getattr(self.address, "serialize", None)
-        ):
-            data["address"] = self.address.serialize()
-        if hasattr(self, "organisations"):
-            data["organisations"] = [
-                company.to_json()
-                for company in self.organisations
-                if callable(getattr(company, "serialize", None))
-            ]
+    def to_json(self, fields: Optional[Iterable[str]] = None):
+        if fields is None:
+            # Full representation, built directly as it is on every response and event
+            return {
+                "user_reference": self.user_reference,
+                "first_name": self.first_name,
+                "last_name": self.last_name,
+                "full_name": self.full_name,
+                "mobile_number": self.mobile_number,
+                "email": self.email,
+                "organisations": self.organisations_json(),
+                "is_verified_email": self.is_verified_email,
+                "is_verified_phone": self.is_verified_phone,
+                "is_active": self.is_active,
+                "created_at_timestamp": self.created_at_timestamp,
+                "updated_at_timestamp": self.updated_at_timestamp,
+                "consent_preferences": self.consent_preferences,
+                "version": self.version,
+            }
 
+        # Sparse fieldset: only the requested fields, in serialization order
+        data = {name: getattr(self, name) for name in self.FIELDS if name in fields}
+        if "organisations" in data:
+            data["organisations"] = self.organisations_json()
         return data
+
+    def organisations_json(self) -> list:
+        # Organisations are Organisation objects when built in-process and plain dicts when loaded from Mongo
+        return [
+            organisation if isinstance(organisation, dict) else organisation.to_json()
+            for organisation in self.organisations
+        ]
     
     @classmethod
     def from_create_dto(cls, dto:UserCreateDTO) -> 'User':
@@ -81,4 +117,5 @@ class User:
             created_at_timestamp=dto.created_at_timestamp,
             updated_at_timestamp=dto.updated_at_timestamp,
             consent_preferences={},
+            version=0,
         )
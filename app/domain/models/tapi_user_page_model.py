@@ -0,0 +1,16 @@
+from typing import Iterable, List, Optional
+
+from app.domain.models.tapi_user_model import User
+
+
+class UserPage:
+    def __init__(self, users: List[User], next_cursor: Optional[str] = None):
+        self.users = users
+        # Opaque token for the page after this one; None when this is the last page
+        self.next_cursor = next_cursor
+
+    def to_json(self, fields: Optional[Iterable[str]] = None):
+        return {
+            "users": [user.to_json(fields) for user in self.users],
+            "next": self.next_cursor,
+        }
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from typing import Any, List
+
+from app.domain.models.tapi_outbox_message_model import OutboxMessage
+
+
+class IOutboxRepository(ABC):
+    @abstractmethod
+    def claim_messages(self, limit: int, lease_seconds: int) -> List[OutboxMessage]:
+        """
+        Lease up to limit messages that are due for delivery, oldest first.
+        A leased message is not handed out again until its lease expires.
+        """
+        pass
+
+    @abstractmethod
+    def delete_messages(self, message_ids: List[Any]) -> int:
+        """Remove delivered messages and return how many were removed."""
+        pass
+
+    @abstractmethod
+    def release_messages(self, messages: List[OutboxMessage], error: str) -> None:
+        """Give up the lease on undelivered messages and schedule their next attempt."""
+        pass
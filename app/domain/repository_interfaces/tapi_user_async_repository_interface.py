@@ -0,0 +1,229 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
+from app.domain.models.tapi_user_model import User
+from app.domain.models.tapi_user_page_model import UserPage
+
+
+class IAsyncUserRepository(ABC):
+    @abstractmethod
+    async def create_user(self, user_data: User, events: Optional[UserEventBuilder] = None) -> str:
+        """
+        Create a new user and return its reference. When events is given, the
+        messages it builds from the user are stored in the outbox with the write.
+        """
+        pass
+
+    @abstractmethod
+    async def create_users(
+        self, users: List[User], events: Optional[UserEventBuilder] = None
+    ) -> Dict[int, str]:
+        """
+        Create many users in one unordered bulk write.
+
+        Parameters:
+            users (List[User]): The users to create.
+            events (Optional[UserEventBuilder]): Builds the outbox messages of each created user.
+
+        Returns:
+            Dict[int, str]: The index of every user that could not be created, mapped to the reason.
+        """
+        pass
+
+    @abstractmethod
+    async def update_user(self, user_reference: str, user_data: User) -> str:
+        """Update an existing user and return its reference."""
+        pass
+
+    @abstractmethod
+    async def update_user_fields(
+        self,
+        user_reference: str,
+        changes: dict,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        """
+        Set the given fields on an existing user and advance its version, in one round trip.
+
+        Parameters:
+            user_reference (str): The reference of the user to update.
+            changes (dict): The fields to set, mapped to their new values.
+            expected_version (Optional[int]): Only update the user if it is still at this version.
+            events (Optional[UserEventBuilder]): Builds the outbox messages from the updated user.
+
+        Returns:
+            Optional[User]: The updated user, or None if no user matched.
+        """
+        pass
+
+    @abstractmethod
+    async def add_user_organisation(
+        self,
+        user_reference: str,
+        organisation: dict,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        """
+        Atomically append an organisation to a user, unless the user already
+        belongs to an organisation with the same name or is not at the expected version.
+
+        Returns:
+            Optional[User]: The updated user, or None if nothing was added.
+        """
+        pass
+
+    @abstractmethod
+    async def remove_user_organisation(
+        self,
+        user_reference: str,
+        organisation_reference: str,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        """
+        Atomically remove an organisation from a user, if the user belongs to it
+        and is at the expected version.
+
+        Returns:
+            Optional[User]: The updated user, or None if nothing was removed.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        """
+        Get a user by reference, optionally loading only the given fields.
+        use_primary forces a fresh read from the primary, for checks made before a write.
+        """
+        pass
+
+    @abstractmethod
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        """
+        Get many users by reference in a single query.
+
+        Parameters:
+            user_references (List[str]): The references of the users to retrieve.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            Dict[str, User]: The users found, keyed by reference. References that do not exist are absent.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> User:
+        """Get a user by  email."""
+        pass
+
+    @abstractmethod
+    async def get_all_users(
+        self, page: int, per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        """
+        Retrieve a paginated list of all users.
+
+        Parameters:
+            page (int): The page number to retrieve.
+            per_page (int): The number of users per page.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            List[User]: A list of User objects representing the users on the specified page.
+        """
+        pass
+
+    @abstractmethod
+    async def get_users_by_query(
+        self, query_params: dict, page: int, per_page: int, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        """
+        Retrieve a paginated list of users based on query parameters.
+
+        Parameters:
+            query_params (dict): A dictionary containing query parameters.
+            page (int): The page number to retrieve.
+            per_page (int): The number of users per page.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            List[User]: A list of User objects representing the users matching the query parameters.
+        """
+        pass
+
+    @abstractmethod
+    async def get_users_by_cursor(
+        self,
+        cursor: Optional[str],
+        per_page: int,
+        query_params: dict = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> UserPage:
+        """
+        Retrieve a page of users using keyset pagination.
+
+        Parameters:
+            cursor (Optional[str]): The opaque cursor returned with the previous page, or None for the first page.
+            per_page (int): The number of users per page.
+            query_params (dict): Optional query parameters to filter users by.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            UserPage: The users on the page and the cursor of the next page, if any.
+        """
+        pass
+
+    @abstractmethod
+    def iter_users(
+        self,
+        export_filter: UserExportFilterDTO,
+        batch_size: int,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[User]:
+        """
+        Iterate over every user matching the export filter without loading them all at once.
+
+        Parameters:
+            export_filter (UserExportFilterDTO): The filters to apply.
+            batch_size (int): The number of users fetched from the database per round trip.
+            fields (Optional[Iterable[str]]): The fields to load, or None for full users.
+
+        Returns:
+            AsyncIterator[User]: The matching users, in insertion order.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_user(self, user_reference: str) -> bool:
+        """
+        Delete a user permanently.
+
+        Parameters:
+            user_reference (str): The reference of the user to delete.
+
+        Returns:
+            bool: True if the user was successfully deleted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        """
+        Soft delete a user.
+
+        Parameters:
+            user_reference (str): The reference of the user to soft delete.
+
+        Returns:
+            bool: True if the user was successfully soft deleted, False otherwise.
+        """
+        pass
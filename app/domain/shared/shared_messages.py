@@ -8,6 +8,7 @@ class ErrorMessage:
 class DatabaseMessage:
     CONNECTION_SUCCESS = "Database connection established successfully"
     CONNECTION_TERMINATED = "Database connection terminated successfully"
+    INDEXES_ENSURED = "Database indexes ensured successfully"
 
 class RedisMessage:
     CONNECTION_SUCCESS = "Redis connection established successfully"
@@ -89,6 +89,14 @@ def validate_uuid_format(value: str, display_name: str = "UUID") -> None:
             ErrorType.ValidationError,errors = [{field_name:f"{display_name} has an invalid UUID format"}]
         )
         
+def validate_fields(fields: list, allowed_fields, display_name: str = "Fields") -> None:
+    unknown = [field for field in fields if field not in allowed_fields]
+    if unknown:
+        field_name = display_name.lower().replace(" ", "_")
+        raise DomainError(
+            ErrorType.ValidationError,errors = [{field_name:f"Unknown field(s): {', '.join(unknown)}"}]
+        )
+
 def validate_non_empty_dict(value: dict, field_name: str = "Dictionary") -> None:
     if not value or not isinstance(value, dict) or len(value) == 0:
         display_name = field_name.replace("_", " ")  # Adjust the field name for display
@@ -0,0 +1,69 @@
+import hashlib
+import math
+from typing import Iterable, List
+
+
+class RedisBloomFilter:
+    """
+    Bloom filter stored as a Redis bitmap so every worker shares one copy.
+    Answers are "definitely absent" or "possibly present"; items cannot be removed.
+    Bit positions come from a stable hash, so any process can query a bitmap built by another.
+    """
+
+    def __init__(self, redis_client, key: str, capacity: int, error_rate: float):
+        self.redis_client = redis_client
+        self.key = key
+        # Optimal bitmap size and hash count for the expected number of items
+        self.size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+
+    def positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        # Double hashing: k positions from two 64-bit halves of one digest
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    async def add(self, items: Iterable[str]):
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for item in items:
+            for position in self.positions(item):
+                pipeline.setbit(self.key, position, 1)
+        await pipeline.execute()
+
+    async def might_contain(self, items: List[str], ready_key: str = None) -> List[bool]:
+        """
+        Checks every item in one round trip. When ready_key is given and missing, the
+        bitmap is not trusted yet and every item is reported as possibly present.
+        """
+        pipeline = self.redis_client.pipeline(transaction=False)
+        if ready_key:
+            pipeline.exists(ready_key)
+        for item in items:
+            for position in self.positions(item):
+                pipeline.getbit(self.key, position)
+        bits = await pipeline.execute()
+        if ready_key and not bits.pop(0):
+            return [True] * len(items)
+        return [
+            all(bits[index * self.hash_count:(index + 1) * self.hash_count])
+            for index in range(len(items))
+        ]
+
+    def new_bitmap(self) -> bytearray:
+        return bytearray(math.ceil(self.size / 8))
+
+    def set_bits(self, bitmap: bytearray, items: Iterable[str]):
+        # Redis numbers bits from the most significant bit of the first byte
+        for item in items:
+            for position in self.positions(item):
+                bitmap[position >> 3] |= 0x80 >> (position & 7)
+
+    async def merge(self, bitmap: bytes):
+        """OR a locally built bitmap into the shared one, keeping bits set concurrently by other workers."""
+        staging_key = f"{self.key}:staging"
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.set(staging_key, bytes(bitmap))
+        pipeline.bitop("OR", self.key, self.key, staging_key)
+        pipeline.delete(staging_key)
+        await pipeline.execute()
@@ -0,0 +1,129 @@
+import asyncio
+import uuid
+from typing import Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from app.infrastructure.cache.local.lru_cache import LRUCache
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
+
+
+class UserCache:
+    """
+    Two-tier cache of JSON-encoded users: a per-worker LRU in front of a Redis tier shared by all workers.
+    Invalidations are broadcast over Redis pub/sub so every worker drops its local copy.
+    Redis failures degrade to a cache miss rather than failing the request.
+    """
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.local = LRUCache(Config.Cache_local_max_size, Config.Cache_local_ttl)
+        # Identifies this worker so it can ignore its own broadcasts
+        self.instance_id = uuid.uuid4().hex
+        # Bumped on every invalidation; a read that started before a bump must not fill the cache
+        self.generation = 0
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.invalidations = 0
+        self.remote_invalidations = 0
+
+    @staticmethod
+    def key(user_reference: str) -> str:
+        return f"{Config.App_name}:user:{user_reference}"
+
+    async def get(self, user_reference: str) -> Optional[dict]:
+        # Both tiers hold the encoded document, so every hit decodes into a private copy
+        # that callers are free to mutate
+        cached = self.local.get(user_reference)
+        if cached is None:
+            try:
+                cached = await self.redis_client.get(self.key(user_reference))
+            except RedisError as e:
+                self.redis_errors += 1
+                log_event("WARNING", f"User cache read failed for {user_reference}: {e}")
+                return None
+            if cached is None:
+                self.redis_misses += 1
+                return None
+            self.redis_hits += 1
+            self.local.set(user_reference, cached)
+        return SerializerHelper.loads(cached)
+
+    async def set(self, user_reference: str, user_data: dict, generation: int):
+        if generation != self.generation:
+            # The user may have changed while it was being read, so the copy could be stale
+            return
+        encoded = SerializerHelper.dumps_bytes(user_data)
+        self.local.set(user_reference, encoded)
+        try:
+            await self.redis_client.set(self.key(user_reference), encoded, ex=Config.Cache_redis_ttl)
+        except RedisError as e:
+            self.redis_errors += 1
+            log_event("WARNING", f"User cache write failed for {user_reference}: {e}")
+
+    async def invalidate(self, user_references: Iterable[str]):
+        user_references = list(user_references)
+        if not user_references:
+            return
+        self.generation += 1
+        self.invalidations += len(user_references)
+        for user_reference in user_references:
+            self.local.delete(user_reference)
+        message = SerializerHelper.dumps({"origin": self.instance_id, "user_references": user_references})
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.delete(*[self.key(user_reference) for user_reference in user_references])
+            pipeline.publish(Config.Cache_invalidation_channel, message)
+            await pipeline.execute()
+        except RedisError as e:
+            self.redis_errors += 1
+            log_event("ERROR", f"User cache invalidation failed for {user_references}: {e}")
+
+    def apply_invalidation(self, data):
+        message = SerializerHelper.loads(data)
+        if message.get("origin") == self.instance_id:
+            return
+        self.generation += 1
+        for user_reference in message.get("user_references", []):
+            self.local.delete(user_reference)
+            self.remote_invalidations += 1
+
+    async def listen_for_invalidations(self):
+        """Background task that applies invalidations broadcast by other workers."""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(Config.Cache_invalidation_channel)
+                log_event("INFO", f"Subscribed to cache invalidations on {Config.Cache_invalidation_channel}")
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        self.apply_invalidation(message["data"])
+                    except ValueError as e:
+                        log_event("WARNING", f"Ignoring malformed cache invalidation: {e}")
+            except asyncio.CancelledError:
+                raise
+            except RedisError as e:
+                log_event("WARNING", f"Cache invalidation listener interrupted: {e}")
+                # Invalidations may have been missed while disconnected
+                self.generation += 1
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "errors": self.redis_errors,
+            },
+            "invalidations": self.invalidations,
+            "remote_invalidations": self.remote_invalidations,
+        }
@@ -0,0 +1,131 @@
+import asyncio
+from typing import Iterable, List
+
+from pymongo.errors import PyMongoError
+from redis.exceptions import RedisError
+
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_user_model import User
+from app.infrastructure.cache.bloom.bloom_filter import RedisBloomFilter
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+class UserExistenceFilter:
+    """
+    Shared Bloom filter over every stored user reference and email, used to answer
+    "definitely no such user" without a database round trip.
+
+    The bitmap lives in Redis, so a new worker reuses it instead of scanning the
+    collection. It is only trusted once the ready marker exists; until then, or
+    whenever Redis fails, every lookup passes through to the database.
+    """
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        key = f"{Config.App_name}:user_filter"
+        # Each user contributes a reference and an email
+        self.bloom = RedisBloomFilter(
+            redis_client, key, Config.User_filter_capacity * 2, Config.User_filter_error_rate
+        )
+        self.ready_key = f"{key}:ready"
+        self.lock_key = f"{key}:lock"
+        # Set when an add failed, so the shared bitmap may be missing a user
+        self.degraded = False
+        self.negatives = 0
+        self.positives = 0
+        self.errors = 0
+
+    @staticmethod
+    def reference_item(user_reference: str) -> str:
+        return f"reference:{user_reference}"
+
+    @staticmethod
+    def email_item(email: str) -> str:
+        return f"email:{email}"
+
+    @staticmethod
+    def user_items(user: User) -> List[str]:
+        items = [UserExistenceFilter.reference_item(user.user_reference)]
+        if user.email:
+            items.append(UserExistenceFilter.email_item(user.email))
+        return items
+
+    async def add_users(self, users: Iterable[User]):
+        items = [item for user in users for item in self.user_items(user)]
+        try:
+            await self.bloom.add(items)
+        except RedisError as e:
+            self.errors += 1
+            self.degraded = True
+            log_event("ERROR", f"Could not add users to the existence filter, it will be rebuilt: {e}")
+            await self.withdraw()
+
+    async def withdraw(self):
+        # Removing the ready marker makes every worker, not just this one, pass lookups through
+        # to the database until the filter is rebuilt
+        try:
+            await self.redis_client.delete(self.ready_key)
+        except RedisError as e:
+            log_event("WARNING", f"Could not withdraw the existence filter, it is withdrawn on the next check: {e}")
+            return
+        self.degraded = False
+
+    async def may_exist(self, items: List[str]) -> List[bool]:
+        if self.degraded:
+            return [True] * len(items)
+        try:
+            answers = await self.bloom.might_contain(items, self.ready_key)
+        except RedisError as e:
+            self.errors += 1
+            log_event("WARNING", f"Existence filter unavailable, falling back to the database: {e}")
+            return [True] * len(items)
+        positives = sum(answers)
+        self.positives += positives
+        self.negatives += len(answers) - positives
+        return answers
+
+    async def rebuild(self, user_repository):
+        # Only one worker rebuilds; the others keep passing lookups through until the marker appears
+        acquired = await self.redis_client.set(
+            self.lock_key, 1, nx=True, ex=Config.User_filter_rebuild_timeout
+        )
+        if not acquired:
+            return
+        try:
+            log_event("INFO", "Rebuilding the user existence filter")
+            bitmap = self.bloom.new_bitmap()
+            count = 0
+            async for user in user_repository.iter_users(
+                UserExportFilterDTO(), Config.Export_batch_size, ["user_reference", "email"]
+            ):
+                self.bloom.set_bits(bitmap, self.user_items(user))
+                count += 1
+            # Merging rather than replacing keeps users added while the scan was running
+            await self.bloom.merge(bitmap)
+            await self.redis_client.set(self.ready_key, count)
+            log_event("INFO", f"User existence filter rebuilt from {count} users")
+        finally:
+            await self.redis_client.delete(self.lock_key)
+
+    async def maintain(self, user_repository):
+        """Background task that (re)builds the filter when it is missing or a write to it was lost."""
+        while True:
+            try:
+                if self.degraded:
+                    await self.withdraw()
+                if not await self.redis_client.exists(self.ready_key):
+                    await self.rebuild(user_repository)
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, PyMongoError) as e:
+                log_event("WARNING", f"Could not rebuild the user existence filter: {e}")
+            await asyncio.sleep(Config.User_filter_check_interval)
+
+    def stats(self) -> dict:
+        return {
+            "degraded": self.degraded,
+            "definite_negatives": self.negatives,
+            "possible_positives": self.positives,
+            "errors": self.errors,
+        }
@@ -0,0 +1,94 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from redis.exceptions import RedisError
+
+from app.infrastructure.messaging.change_stream.utils.helper.change_stream_helper import ChangeStreamHelper
+from app.infrastructure.messaging.redis.utils.helper.publish_helper import PublisherHelper
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+# Raised when the saved resume token has rolled off the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class UserChangePublisher:
+    """
+    Watches the users collection and publishes a user event for every change, whoever made it.
+
+    The resume token is saved after each published batch, so a restart continues where the
+    last run stopped. Delivery is at least once: events published after the last saved token
+    are published again on restart.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self.users = database["users"]
+        self.tokens = database["change_stream_tokens"]
+        self.token_id = f"{Config.App_name}:users"
+        self.published = 0
+
+    async def load_resume_token(self) -> Optional[dict]:
+        document = await self.tokens.find_one({"_id": self.token_id})
+        return document["resume_token"] if document else None
+
+    async def save_resume_token(self, resume_token: dict):
+        await self.tokens.update_one(
+            {"_id": self.token_id}, {"$set": {"resume_token": resume_token}}, upsert=True
+        )
+
+    async def publish(self, events: List[Tuple[str, str]]):
+        for channel, payloads in ChangeStreamHelper.channel_runs(events):
+            await asyncio.to_thread(PublisherHelper.publish_many, channel, payloads)
+        self.published += len(events)
+
+    async def watch(self, resume_token: Optional[dict]):
+        pending = []
+        saved_token = resume_token
+        async with self.users.watch(
+            full_document="updateLookup",
+            resume_after=resume_token,
+            max_await_time_ms=Config.Change_stream_max_await_ms,
+        ) as stream:
+            log_event("INFO", f"Watching the users collection for changes, resuming: {resume_token is not None}")
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None:
+                    event = ChangeStreamHelper.user_event(change)
+                    if event:
+                        pending.append(event)
+                    if len(pending) < Config.Change_stream_batch_size:
+                        continue
+                # Flush when the batch is full or the stream has gone quiet; an idle stream
+                # still advances its token, so a restart does not rescan quiet periods
+                if pending:
+                    await self.publish(pending)
+                    pending = []
+                if stream.resume_token and stream.resume_token != saved_token:
+                    await self.save_resume_token(stream.resume_token)
+                    saved_token = stream.resume_token
+
+    async def run(self):
+        """Watches until cancelled, reopening the stream from the saved token after a failure."""
+        while True:
+            try:
+                await self.watch(await self.load_resume_token())
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code != CHANGE_STREAM_HISTORY_LOST:
+                    log_event("WARNING", f"User change stream interrupted: {e}")
+                else:
+                    log_event("ERROR", f"User change stream history lost, changes since the last run were not published: {e}")
+                    try:
+                        # Start again from the current position
+                        await self.tokens.delete_one({"_id": self.token_id})
+                        continue
+                    except PyMongoError as delete_error:
+                        # The stale token fails the next watch again, and is cleared on that attempt
+                        log_event("WARNING", f"Could not clear the user change stream resume token: {delete_error}")
+            except (PyMongoError, RedisError) as e:
+                log_event("WARNING", f"User change stream interrupted: {e}")
+            await asyncio.sleep(Config.Change_stream_retry_delay)
@@ -0,0 +1,69 @@
+from typing import List, Optional, Tuple
+
+from app.application.events.etos.eto import Event
+from app.domain.models.tapi_user_model import User
+
+
+# Bookkeeping fields that change with every write and say nothing about what changed
+BOOKKEEPING_FIELDS = {"updated_at_timestamp", "version"}
+
+# The fields of the create request, which is what the API sends as the data of a UserCreatedEvent
+CREATED_EVENT_FIELDS = ("user_reference", "email", "created_at_timestamp", "updated_at_timestamp")
+
+
+class ChangeStreamHelper:
+    @staticmethod
+    def changed_fields(change: dict) -> set:
+        """Top-level fields touched by an update, e.g. "organisations" for "organisations.2"."""
+        description = change.get("updateDescription") or {}
+        paths = list(description.get("updatedFields", {})) + list(description.get("removedFields", []))
+        paths += [array["field"] for array in description.get("truncatedArrays", [])]
+        return {path.split(".", 1)[0] for path in paths} - BOOKKEEPING_FIELDS
+
+    @staticmethod
+    def event_names(change: dict) -> Optional[Tuple[str, str]]:
+        """Maps a change to the (channel, event name) the API publishes for the same write."""
+        operation = change["operationType"]
+        if operation == "insert":
+            return "UserCreatedEvent", "UserCreatedEvent"
+        if operation == "replace":
+            return "UserUpdatedEvent", "UserUpdatedEvent"
+        if operation != "update":
+            return None
+        if ChangeStreamHelper.changed_fields(change) == {"organisations"}:
+            # $push reports the appended element by index. $pull truncates the array, with the
+            # elements that moved up reported by index (MongoDB 5.0+), or reports the whole
+            # remaining array on older servers. Both go out on the additions channel, as they do
+            # when published by the API.
+            description = change["updateDescription"]
+            if any(array["field"] == "organisations" for array in description.get("truncatedArrays", [])):
+                return "UserAddedToOrganisationEvent", "UserRemovedFromOrganisationEvent"
+            if any(path.startswith("organisations.") for path in description.get("updatedFields", {})):
+                return "UserAddedToOrganisationEvent", "UserAddedToOrganisationEvent"
+            return "UserAddedToOrganisationEvent", "UserRemovedFromOrganisationEvent"
+        return "UserUpdatedEvent", "UserUpdatedEvent"
+
+    @staticmethod
+    def user_event(change: dict) -> Optional[Tuple[str, str]]:
+        """Builds the (channel, serialized event) for a change, or None if it has nothing to publish."""
+        names = ChangeStreamHelper.event_names(change)
+        document = change.get("fullDocument")
+        if not names or not document:
+            # Deletes carry no document, and an update's document is gone if the user was deleted since
+            return None
+        channel, event_name = names
+        document = {name: value for name, value in document.items() if name in User.FIELDS}
+        user = User(**document)
+        data = user.to_json(CREATED_EVENT_FIELDS) if event_name == "UserCreatedEvent" else user.to_json()
+        return channel, Event(event_name, "UserEvent", user.user_reference, data).serialize()
+
+    @staticmethod
+    def channel_runs(events: List[Tuple[str, str]]) -> List[Tuple[str, List[str]]]:
+        """Groups consecutive events on the same channel, so batches keep the order of the writes."""
+        runs = []
+        for channel, payload in events:
+            if runs and runs[-1][0] == channel:
+                runs[-1][1].append(payload)
+            else:
+                runs.append((channel, [payload]))
+        return runs
@@ -0,0 +1,111 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from app.infrastructure.messaging.redis.utils.helper.publish_helper import PublisherHelper
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+from app.infrastructure.system.metrics.utils.helper.metrics_helper import MetricsHelper
+
+
+STOPPED_MESSAGE = "The event publisher stopped before the events were sent"
+
+
+class RedisBatchPublisher:
+    """
+    Publishes messages on redis.asyncio, coalescing those published within a short window
+    into a single pipeline round trip.
+
+    Callers await their own message being sent, so a Redis failure still reaches them.
+    The queue is bounded: when it is full, publishers wait rather than buffering without limit.
+    """
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=Config.Event_queue_max_size)
+        self.closed = False
+        # Set once the run task has ended, after which nothing reads the queue
+        self.stopped = False
+        self.batches = 0
+        self.published = 0
+        self.errors = 0
+
+    async def publish(self, channel: str, message):
+        await self.publish_many(channel, [message])
+
+    async def publish_many(self, channel: str, messages: List):
+        if self.closed or self.stopped:
+            raise RuntimeError("The event publisher is stopped")
+        sent = asyncio.get_running_loop().create_future()
+        await self.queue.put(([(channel, message) for message in messages], sent))
+        if self.stopped:
+            # Queued after the publisher stopped, e.g. by a caller that waited on a full queue
+            self.fail_queued()
+        await sent
+
+    async def run(self):
+        """Background task that sends queued messages in batches until cancelled."""
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                error = None
+                try:
+                    # Give concurrent requests the window to add their events to the same round trip
+                    await asyncio.sleep(Config.Event_batch_window_ms / 1000)
+                    size = len(batch[0][0])
+                    while size < Config.Event_batch_max_size and not self.queue.empty():
+                        entry = self.queue.get_nowait()
+                        batch.append(entry)
+                        size += len(entry[0])
+                    error = await self.send(batch)
+                except asyncio.CancelledError:
+                    error = RuntimeError(STOPPED_MESSAGE)
+                    raise
+                finally:
+                    self.settle(batch, error)
+        finally:
+            # Fail the messages still waiting, so no caller waits on a stopped publisher
+            self.stopped = True
+            self.fail_queued()
+
+    def fail_queued(self):
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        self.settle(batch, RuntimeError(STOPPED_MESSAGE))
+
+    async def send(self, batch: List[Tuple[List[Tuple[str, object]], asyncio.Future]]) -> Optional[Exception]:
+        """Sends a batch in one round trip, returning the error that stopped it, if any."""
+        count = sum(len(messages) for messages, _ in batch)
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for messages, _ in batch:
+                for channel, message in messages:
+                    PublisherHelper.send(pipeline, channel, message)
+            with MetricsHelper.time_publish("batch"):
+                await pipeline.execute()
+        except Exception as e:
+            # Any failure is handed to the callers of this batch; the next batch is still sent
+            self.errors += 1
+            log_event("ERROR", f"Error publishing a batch of {count} events: {e}")
+            return e
+        self.batches += 1
+        self.published += count
+        return None
+
+    def settle(self, batch: List[Tuple[List[Tuple[str, object]], asyncio.Future]], error: Optional[Exception]):
+        for _, sent in batch:
+            # A caller that gave up waiting leaves a cancelled future behind
+            if not sent.done():
+                if error:
+                    sent.set_exception(error)
+                else:
+                    sent.set_result(None)
+            self.queue.task_done()
+
+    async def close(self):
+        """Stops accepting messages and waits, up to EVENT_CLOSE_TIMEOUT, until everything already queued is sent."""
+        self.closed = True
+        try:
+            await asyncio.wait_for(self.queue.join(), Config.Event_close_timeout)
+        except asyncio.TimeoutError:
+            log_event("WARNING", f"Stopped waiting for {self.queue.qsize()} queued event batches to be sent")
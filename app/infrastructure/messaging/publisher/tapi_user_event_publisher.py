@@ -1,22 +1,27 @@
-from typing import Any
+from typing import Any, List
 from app.application.events.event_publisher_interfaces.tapi_user_event_publisher_interface import (
     IUserEventPublisher,
 )
-from app.infrastructure.messaging.redis.setup.redis_setup import Redis
-from app.infrastructure.messaging.redis.utils.helper.publish_helper import (
-    PublisherHelper,
-)
+from app.infrastructure.messaging.publisher.redis_batch_publisher import RedisBatchPublisher
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
 
 
 class RedisEventPublisher(IUserEventPublisher):
-    def __init__(self, redis: Redis):
-        self.redis_client = redis
+    def __init__(self, batch_publisher: RedisBatchPublisher):
+        self.batch_publisher = batch_publisher
+
+    @TraceHelper.traced
+    async def publish_user_created_event(self, event_data: Any):
+        await self.batch_publisher.publish("UserCreatedEvent", event_data)
 
-    def publish_user_created_event(self, event_data: Any):
-        PublisherHelper.publish("UserCreatedEvent", event_data)
+    @TraceHelper.traced
+    async def publish_user_created_events(self, events_data: List[Any]):
+        await self.batch_publisher.publish_many("UserCreatedEvent", events_data)
 
-    def publish_user_updated_event(self, event_data: Any):
-        PublisherHelper.publish("UserUpdatedEvent", event_data)
+    @TraceHelper.traced
+    async def publish_user_updated_event(self, event_data: Any):
+        await self.batch_publisher.publish("UserUpdatedEvent", event_data)
     
-    def publish_user_added_to_organisation_event(self, event_data: Any):
-        PublisherHelper.publish("UserAddedToOrganisationEvent", event_data)
+    @TraceHelper.traced
+    async def publish_user_added_to_organisation_event(self, event_data: Any):
+        await self.batch_publisher.publish("UserAddedToOrganisationEvent", event_data)
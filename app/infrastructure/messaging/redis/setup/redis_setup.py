@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 
 from app.infrastructure.system.configuration.configuration import Config
 from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
@@ -8,10 +9,25 @@ class Redis:
     client = None
     isConnected = False
 
+    @staticmethod
+    def pool_options():
+        # A blocking pool waits up to the pool timeout for a free connection instead of
+        # opening connections without bound under load. There is no read timeout, as
+        # pub/sub listeners block on reads indefinitely.
+        return {
+            "host": Config.Redis_host,
+            "port": int(Config.Redis_port),
+            "max_connections": Config.Redis_max_connections,
+            "timeout": Config.Redis_pool_timeout,
+            "socket_connect_timeout": Config.Redis_connect_timeout,
+        }
+
     @staticmethod
     def connect():
         if not Redis.client or not Redis.isConnected:
-            Redis.client = redis.StrictRedis(host=Config.Redis_host, port=Config.Redis_port)
+            Redis.client = redis.StrictRedis(
+                connection_pool=redis.BlockingConnectionPool(**Redis.pool_options())
+            )
             try:
                 # Check if the connection is successful
                 Redis.client.ping()
@@ -28,3 +44,31 @@ class Redis:
             Redis.client.close()
             Redis.isConnected = False
             log_event("INFO", "Disconnected from Redis")
+
+
+class AsyncRedis:
+    client = None
+    isConnected = False
+
+    @staticmethod
+    async def connect():
+        if not AsyncRedis.client or not AsyncRedis.isConnected:
+            AsyncRedis.client = redis.asyncio.StrictRedis(
+                connection_pool=redis.asyncio.BlockingConnectionPool(**Redis.pool_options())
+            )
+            try:
+                # Check if the connection is successful
+                await AsyncRedis.client.ping()
+                AsyncRedis.isConnected = True
+                log_event("INFO", "Connected successfully to Redis (asyncio)")
+            except Exception as err:
+                log_event("ERROR", f"Could not connect to Redis (asyncio): {err}")
+                raise err
+        return AsyncRedis.client
+
+    @staticmethod
+    async def disconnect():
+        if AsyncRedis.client and AsyncRedis.isConnected:
+            await AsyncRedis.client.aclose()
+            AsyncRedis.isConnected = False
+            log_event("INFO", "Disconnected from Redis (asyncio)")
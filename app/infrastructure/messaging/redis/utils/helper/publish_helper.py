@@ -1,18 +1,48 @@
 
 
 from app.infrastructure.messaging.redis.setup.redis_setup import Redis
+from app.infrastructure.system.configuration.configuration import Config
 from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+from app.infrastructure.system.metrics.utils.helper.metrics_helper import MetricsHelper
 
 
 class PublisherHelper:
+    @staticmethod
+    def send(redis_client, channel, message):
+        """Queues the message on a pipeline, or sends it when given a client, over the configured transport."""
+        if Config.Event_transport == "streams":
+            # Streams keep messages until consumer groups have read and acknowledged them,
+            # trimmed to roughly the configured length so trimming stays cheap
+            return redis_client.xadd(
+                channel, {"data": message}, maxlen=Config.Event_stream_maxlen, approximate=True
+            )
+        # Pub/sub drops messages when no subscriber is listening
+        return redis_client.publish(channel, message)
+
     @staticmethod
     def publish(channel, message):
         try:
             redis_client = Redis.connect()
-            redis_client.publish(channel, message)
+            with MetricsHelper.time_publish("publish"):
+                PublisherHelper.send(redis_client, channel, message)
             # Use log_event for success logging
             log_event("INFO", f"Message '{message}' published to channel '{channel}'")
         except Exception as e:
             # Use log_event for error logging
             log_event("ERROR", f"Error publishing message to channel '{channel}': {str(e)}")
             raise e
+
+    @staticmethod
+    def publish_many(channel, messages):
+        try:
+            redis_client = Redis.connect()
+            # Send the whole batch in one round trip
+            pipeline = redis_client.pipeline(transaction=False)
+            for message in messages:
+                PublisherHelper.send(pipeline, channel, message)
+            with MetricsHelper.time_publish("publish_many"):
+                pipeline.execute()
+            log_event("INFO", f"{len(messages)} messages published to channel '{channel}'")
+        except Exception as e:
+            log_event("ERROR", f"Error publishing messages to channel '{channel}': {str(e)}")
+            raise e
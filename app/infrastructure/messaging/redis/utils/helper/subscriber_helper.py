@@ -1,17 +1,49 @@
+import os
+import socket
+import time
+
+from redis.exceptions import ResponseError
 
 from app.infrastructure.messaging.redis.setup.redis_setup import Redis
+from app.infrastructure.messaging.subscriber.event_deduplicator import EventDeduplicator
+from app.infrastructure.system.configuration.configuration import Config
 from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
 
 
 class SubscriberHelper:
-    def __init__(self, channels, callback):
+    """
+    Delivers the messages of the given channels to callback(channel, data).
+
+    With the streams transport, subscribers sharing a group split the messages between them,
+    and a message is acknowledged only once the callback returns, so a consumer that was down
+    catches up from where its group left off. Without it, Redis pub/sub is used.
+    Events whose event_reference the group has already handled are skipped (EVENT_DEDUP).
+    """
+
+    def __init__(self, channels, callback, group=None, consumer=None, start_id="$"):
         self.channels = channels
         self.callback = callback
         self.pubsub = None
+        self.redis_client = None
+        # Consumer group settings, only used with the streams transport
+        self.group = group or Config.App_name
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        # Where a newly created group starts reading: "$" for new messages, "0" for the retained history
+        self.start_id = start_id
+        self.listening = False
+        self.next_claim = 0.0
+        self.deduplicator = None
 
     def subscribe(self):
         try:
             redis_client = Redis.connect()
+            self.deduplicator = EventDeduplicator.create(self.group, redis_client)
+            if Config.Event_transport == "streams":
+                self.redis_client = redis_client
+                for channel in self.channels:
+                    self.create_group(channel)
+                log_event("INFO", f"Joined consumer group {self.group} as {self.consumer} on streams: {', '.join(self.channels)}")
+                return
             self.pubsub = redis_client.pubsub()
             self.pubsub.subscribe(self.channels)
             # Log successful subscription
@@ -21,20 +53,145 @@ class SubscriberHelper:
             log_event("ERROR", f"Error subscribing to channels: {e}")
             raise e
 
+    def create_group(self, channel):
+        try:
+            self.redis_client.xgroup_create(channel, self.group, id=self.start_id, mkstream=True)
+        except ResponseError as e:
+            # Another consumer of the group created it first
+            if "BUSYGROUP" not in str(e):
+                raise
+
     def listen(self):
         try:
+            if Config.Event_transport == "streams":
+                self.listen_group()
+                return
             for message in self.pubsub.listen():
                 if message['type'] == 'message':
                     # Log incoming messages, consider logging level and sensitivity of message content
                     log_event("INFO", f"Message received on channel {message['channel']}: {message['data']}")
-                    self.callback(message['channel'], message['data'])
+                    self.handle_message(message['channel'], message['data'])
         except Exception as e:
             # Log error on listening failure
             log_event("ERROR", f"Error listening to messages: {e}")
             raise e
 
+    def listen_group(self):
+        self.listening = True
+        # Messages this consumer read but did not acknowledge before it stopped come first
+        self.consume({channel: "0" for channel in self.channels})
+        while self.listening:
+            self.claim_idle_messages()
+            self.consume({channel: ">" for channel in self.channels}, Config.Event_stream_block_ms)
+
+    def consume(self, streams, block=None):
+        while True:
+            response = self.redis_client.xreadgroup(
+                self.group, self.consumer, streams, count=Config.Event_stream_batch_size, block=block
+            )
+            entries = [(channel, entries) for channel, entries in response or [] if entries]
+            for channel, messages in entries:
+                self.handle(channel, messages)
+            # New messages are read once per call; the pending history is paged through until empty
+            if block is not None or not entries:
+                return
+            streams = {
+                (channel.decode() if isinstance(channel, bytes) else channel): messages[-1][0]
+                for channel, messages in entries
+            }
+
+    def claim_idle_messages(self):
+        # Checked at most twice per idle period
+        if time.monotonic() < self.next_claim:
+            return
+        self.next_claim = time.monotonic() + Config.Event_stream_claim_idle_ms / 2000
+        for channel in self.channels:
+            _, messages, _ = self.redis_client.xautoclaim(
+                channel,
+                self.group,
+                self.consumer,
+                Config.Event_stream_claim_idle_ms,
+                count=Config.Event_stream_batch_size,
+            )
+            if messages:
+                log_event("WARNING", f"Claimed {len(messages)} idle messages on {channel} from stopped consumers")
+                self.handle(channel, messages)
+
+    def handle_message(self, channel, data):
+        reference = EventDeduplicator.event_reference(data) if self.deduplicator else None
+        if self.deduplicator and not self.deduplicator.claim([reference])[0]:
+            log_event("INFO", f"Skipping duplicate event {reference} on channel {channel}")
+            return
+        try:
+            self.callback(channel, data)
+        except Exception:
+            if self.deduplicator:
+                self.deduplicator.release(reference)
+            raise
+        if self.deduplicator:
+            self.deduplicator.confirm([reference])
+
+    def handle(self, channel, messages):
+        acknowledged = []
+        # Entries deleted by trimming while pending come back without fields
+        for message_id, fields in messages:
+            if not fields:
+                acknowledged.append(message_id)
+        messages = [(message_id, fields.get(b"data", fields.get("data"))) for message_id, fields in messages if fields]
+        references = [None] * len(messages)
+        new = [True] * len(messages)
+        handled = set()
+        if self.deduplicator and messages:
+            references = [EventDeduplicator.event_reference(data) for _, data in messages]
+            new = self.deduplicator.claim(references)
+            # A claim that was never confirmed may belong to a consumer that stopped mid-handling,
+            # so only confirmed duplicates are acknowledged; the rest stay pending to be retried
+            duplicates = [reference for reference, is_new in zip(references, new) if not is_new]
+            if duplicates:
+                handled = {
+                    reference
+                    for reference, is_handled in zip(duplicates, self.deduplicator.handled(duplicates))
+                    if is_handled
+                }
+        confirmed = []
+        waiting = []
+        for (message_id, data), reference, is_new in zip(messages, references, new):
+            if not is_new:
+                if reference in handled:
+                    log_event("INFO", f"Skipping duplicate event {reference} on stream {channel}")
+                    acknowledged.append(message_id)
+                else:
+                    waiting.append((message_id, reference))
+                continue
+            log_event("INFO", f"Message received on stream {channel}: {data}")
+            try:
+                self.callback(channel, data)
+            except Exception as e:
+                # Left pending, to be retried by this consumer on restart or claimed by another
+                log_event("ERROR", f"Error handling message {message_id} on stream {channel}: {e}")
+                if self.deduplicator:
+                    self.deduplicator.release(reference)
+                continue
+            acknowledged.append(message_id)
+            confirmed.append(reference)
+        if self.deduplicator:
+            # Confirmed before acknowledging, so a redelivery after a crash in between is still skipped
+            self.deduplicator.confirm(confirmed)
+        for message_id, reference in waiting:
+            # Repeated within this batch and handled just now
+            if reference in confirmed:
+                acknowledged.append(message_id)
+            else:
+                log_event("INFO", f"Event {reference} on stream {channel} is already being handled, leaving it pending")
+        if acknowledged:
+            self.redis_client.xack(channel, self.group, *acknowledged)
+
     def unsubscribe(self):
         try:
+            if Config.Event_transport == "streams":
+                self.listening = False
+                log_event("INFO", f"Leaving consumer group {self.group}")
+                return
             if self.pubsub:
                 self.pubsub.unsubscribe()
                 # Log successful unsubscription
@@ -0,0 +1,59 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List
+
+from pymongo.errors import PyMongoError
+
+from app.domain.models.tapi_outbox_message_model import OutboxMessage
+from app.infrastructure.messaging.redis.utils.helper.publish_helper import PublisherHelper
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+class OutboxRelay:
+    """
+    Publishes the events stored in the outbox to Redis and removes them once delivered.
+
+    Delivery is at least once: a relay that stops between publishing and deleting leaves
+    its lease to expire, and the messages are published again by whichever relay claims them.
+    """
+
+    def __init__(self, outbox_repository):
+        self.outbox_repository = outbox_repository
+        self.published = 0
+        self.failed = 0
+
+    async def relay_batch(self) -> int:
+        messages = await self.outbox_repository.claim_messages(
+            Config.Outbox_batch_size, Config.Outbox_lease_seconds
+        )
+        by_channel: Dict[str, List[OutboxMessage]] = defaultdict(list)
+        for message in messages:
+            by_channel[message.channel].append(message)
+
+        for channel, channel_messages in by_channel.items():
+            try:
+                await asyncio.to_thread(
+                    PublisherHelper.publish_many, channel, [message.payload for message in channel_messages]
+                )
+            except Exception as e:
+                self.failed += len(channel_messages)
+                await self.outbox_repository.release_messages(channel_messages, str(e))
+                continue
+            self.published += len(channel_messages)
+            await self.outbox_repository.delete_messages([message.message_id for message in channel_messages])
+        return len(messages)
+
+    async def run(self):
+        """Background task that drains the outbox, polling while it is empty."""
+        while True:
+            try:
+                relayed = await self.relay_batch()
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                log_event("WARNING", f"Outbox relay interrupted: {e}")
+                relayed = 0
+            # A full batch suggests more is waiting, so only pause when the outbox was drained
+            if relayed < Config.Outbox_batch_size:
+                await asyncio.sleep(Config.Outbox_poll_interval)
@@ -0,0 +1,193 @@
+from typing import List, Optional
+
+from redis.exceptions import RedisError
+
+from app.infrastructure.cache.local.lru_cache import LRUCache
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
+
+# Stored against a reference while its handler runs, and once it has succeeded
+PROCESSING = 0
+HANDLED = 1
+
+
+class EventDeduplicator:
+    """
+    Remembers the event_reference of every event a subscriber has taken on, so redelivered
+    or replayed events are skipped before the handler runs.
+
+    References are claimed in Redis with SET NX, one pipeline per batch, which lets every
+    instance of a subscriber share them. A claim only lasts EVENT_DEDUP_PROCESSING_TTL, so the
+    redelivery of an event whose subscriber crashed mid-handling is handled again; once handling
+    succeeds it is confirmed for EVENT_DEDUP_TTL. Without a Redis client a bounded local LRU is
+    used instead. The scope keeps subscribers apart, so each still gets its own copy of an event.
+    A reference is released when handling fails, so a redelivery is handled again, and Redis
+    errors let events through rather than dropping them.
+    """
+
+    def __init__(self, scope: str, redis_client=None):
+        self.scope = scope
+        self.redis_client = redis_client
+        self.local = None if redis_client else LRUCache(Config.Event_dedup_local_size, Config.Event_dedup_ttl)
+        self.duplicates = 0
+        self.errors = 0
+
+    @staticmethod
+    def create(scope: str, redis_client) -> Optional["EventDeduplicator"]:
+        """The deduplicator selected by EVENT_DEDUP, or None when it is off."""
+        if Config.Event_dedup == "off":
+            return None
+        return EventDeduplicator(scope, redis_client if Config.Event_dedup == "redis" else None)
+
+    @staticmethod
+    def event_reference(data) -> Optional[str]:
+        # Messages that are not events are never treated as duplicates
+        try:
+            event = SerializerHelper.loads(data)
+        except (TypeError, ValueError):
+            return None
+        return event.get("event_reference") if isinstance(event, dict) else None
+
+    def key(self, reference: str) -> str:
+        return f"{Config.App_name}:event_seen:{self.scope}:{reference}"
+
+    def claim(self, references: List[Optional[str]]) -> List[bool]:
+        """Returns, for each reference, whether it is new; new references are recorded."""
+        if self.local is not None:
+            return self.count(self.claim_local(references))
+        pipeline = self.redis_client.pipeline(transaction=False)
+        self.queue_claims(pipeline, references)
+        try:
+            results = pipeline.execute()
+        except RedisError as e:
+            return self.claim_failed(references, e)
+        return self.count(self.claimed(references, results))
+
+    async def claim_async(self, references: List[Optional[str]]) -> List[bool]:
+        if self.local is not None:
+            return self.count(self.claim_local(references))
+        pipeline = self.redis_client.pipeline(transaction=False)
+        self.queue_claims(pipeline, references)
+        try:
+            results = await pipeline.execute()
+        except RedisError as e:
+            return self.claim_failed(references, e)
+        return self.count(self.claimed(references, results))
+
+    def release(self, reference: Optional[str]):
+        if reference is None:
+            return
+        if self.local is not None:
+            self.local.delete(reference)
+            return
+        try:
+            self.redis_client.delete(self.key(reference))
+        except RedisError as e:
+            self.errors += 1
+            log_event("WARNING", f"Could not release event {reference}: {e}")
+
+    async def release_async(self, reference: Optional[str]):
+        if reference is None:
+            return
+        if self.local is not None:
+            self.local.delete(reference)
+            return
+        try:
+            await self.redis_client.delete(self.key(reference))
+        except RedisError as e:
+            self.errors += 1
+            log_event("WARNING", f"Could not release event {reference}: {e}")
+
+    def confirm(self, references: List[Optional[str]]):
+        """Records successfully handled references for the full deduplication window."""
+        references = [reference for reference in references if reference is not None]
+        if not references:
+            return
+        if self.local is not None:
+            self.confirm_local(references)
+            return
+        pipeline = self.redis_client.pipeline(transaction=False)
+        self.queue_confirmations(pipeline, references)
+        try:
+            pipeline.execute()
+        except RedisError as e:
+            self.confirm_failed(references, e)
+
+    async def confirm_async(self, references: List[Optional[str]]):
+        references = [reference for reference in references if reference is not None]
+        if not references:
+            return
+        if self.local is not None:
+            self.confirm_local(references)
+            return
+        pipeline = self.redis_client.pipeline(transaction=False)
+        self.queue_confirmations(pipeline, references)
+        try:
+            await pipeline.execute()
+        except RedisError as e:
+            self.confirm_failed(references, e)
+
+    def handled(self, references: List[Optional[str]]) -> List[bool]:
+        """Whether each reference was confirmed, rather than only claimed by a handler still running or lost."""
+        if self.local is not None:
+            return [reference is not None and self.local.get(reference) == HANDLED for reference in references]
+        keys = [self.key(reference) for reference in references if reference is not None]
+        try:
+            values = iter(self.redis_client.mget(keys) if keys else [])
+        except RedisError as e:
+            self.errors += 1
+            log_event("WARNING", f"Could not check {len(keys)} duplicate events: {e}")
+            return [False] * len(references)
+        return [reference is not None and self.is_handled(next(values)) for reference in references]
+
+    @staticmethod
+    def is_handled(value) -> bool:
+        return value is not None and int(value) == HANDLED
+
+    def claim_local(self, references: List[Optional[str]]) -> List[bool]:
+        new = []
+        for reference in references:
+            if reference is None:
+                new.append(True)
+            elif self.local.get(reference) is not None:
+                new.append(False)
+            else:
+                self.local.set(reference, PROCESSING)
+                new.append(True)
+        return new
+
+    def confirm_local(self, references: List[str]):
+        for reference in references:
+            self.local.set(reference, HANDLED)
+
+    def queue_claims(self, pipeline, references: List[Optional[str]]):
+        for reference in references:
+            if reference is not None:
+                pipeline.set(self.key(reference), PROCESSING, nx=True, ex=Config.Event_dedup_processing_ttl)
+
+    def queue_confirmations(self, pipeline, references: List[str]):
+        for reference in references:
+            pipeline.set(self.key(reference), HANDLED, ex=Config.Event_dedup_ttl)
+
+    @staticmethod
+    def claimed(references: List[Optional[str]], results: List) -> List[bool]:
+        results = iter(results)
+        return [True if reference is None else bool(next(results)) for reference in references]
+
+    def claim_failed(self, references: List[Optional[str]], error: RedisError) -> List[bool]:
+        self.errors += 1
+        log_event("WARNING", f"Event deduplication unavailable, handling {len(references)} events unchecked: {error}")
+        return [True] * len(references)
+
+    def confirm_failed(self, references: List[str], error: RedisError):
+        # The claims expire after the processing TTL, so a later redelivery is handled again
+        self.errors += 1
+        log_event("WARNING", f"Could not confirm {len(references)} handled events: {error}")
+
+    def count(self, new: List[bool]) -> List[bool]:
+        self.duplicates += new.count(False)
+        return new
+
+    def stats(self) -> dict:
+        return {"duplicates": self.duplicates, "errors": self.errors}
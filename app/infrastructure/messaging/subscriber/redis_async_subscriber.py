@@ -0,0 +1,198 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.infrastructure.messaging.subscriber.event_deduplicator import EventDeduplicator
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+Handler = Callable[[str, bytes], Awaitable[None]]
+
+# Characters that make a registration a pattern subscription
+PATTERN_CHARACTERS = set("*?[")
+
+
+class LatencyStats:
+    def __init__(self):
+        self.handled = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float):
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def latency_json(self, calls: int) -> dict:
+        return {
+            "average_ms": round(self.total_seconds / calls * 1000, 3) if calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
+
+    def to_json(self) -> dict:
+        return {
+            "handled": self.handled,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            **self.latency_json(self.handled + self.failed + self.timed_out),
+        }
+
+
+class RedisAsyncSubscriber:
+    """
+    Reads Redis pub/sub on the event loop and runs the registered handlers on a bounded pool
+    of worker tasks, so a slow handler only holds up its own worker.
+
+    Handlers are registered per channel or glob pattern and are given a time limit.
+    When every worker is busy and the queue is full, reading pauses and Redis buffers the backlog.
+    With a deduplicator, events a subscription has already taken on are dropped before they are queued.
+    """
+
+    def __init__(self, redis_client, deduplicator: Optional[EventDeduplicator] = None):
+        self.redis_client = redis_client
+        self.deduplicator = deduplicator
+        # Handlers and their time limits, by channel or pattern
+        self.handlers: Dict[str, List[Tuple[Handler, float]]] = {}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=Config.Subscriber_queue_size)
+        self.stats_by_subscription: Dict[str, LatencyStats] = {}
+        # Time messages spend queued before a worker picks them up, which is what grows under load
+        self.queue_wait = LatencyStats()
+        self.queue_wait_count = 0
+        self.received = 0
+        self.unhandled = 0
+        self.max_queue_depth = 0
+
+    def register(self, subscription: str, handler: Handler, timeout: Optional[float] = None):
+        """Adds a handler for a channel, or for every channel matching a glob pattern. Register before run."""
+        self.handlers.setdefault(subscription, []).append((handler, timeout or Config.Subscriber_handler_timeout))
+        self.stats_by_subscription.setdefault(subscription, LatencyStats())
+
+    @staticmethod
+    def is_pattern(subscription: str) -> bool:
+        return bool(PATTERN_CHARACTERS & set(subscription))
+
+    async def run(self):
+        """Reads messages and dispatches them to the workers until cancelled."""
+        workers = [asyncio.create_task(self.work()) for _ in range(Config.Subscriber_workers)]
+        try:
+            while True:
+                try:
+                    await self.read()
+                except RedisError as e:
+                    log_event("WARNING", f"Subscriber connection interrupted, reconnecting: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def read(self):
+        channels = [subscription for subscription in self.handlers if not self.is_pattern(subscription)]
+        patterns = [subscription for subscription in self.handlers if self.is_pattern(subscription)]
+        pubsub = self.redis_client.pubsub()
+        try:
+            if channels:
+                await pubsub.subscribe(*channels)
+            if patterns:
+                await pubsub.psubscribe(*patterns)
+            log_event("INFO", f"Subscribed to {', '.join(channels + patterns)}")
+            while True:
+                # Block for one message, then take whatever else has already arrived as a batch
+                batch = [await pubsub.get_message(timeout=None)]
+                while len(batch) < Config.Subscriber_batch_size:
+                    message = await pubsub.get_message(timeout=0)
+                    if message is None:
+                        break
+                    batch.append(message)
+                await self.enqueue([message for message in batch if message and message["type"] in ("message", "pmessage")])
+        finally:
+            await pubsub.aclose()
+
+    async def enqueue(self, messages: List[dict]):
+        self.received += len(messages)
+        references = [None] * len(messages)
+        if self.deduplicator and messages:
+            # Keyed per subscription, since a channel also matched by a pattern arrives once for each
+            references = [self.dedup_reference(message) for message in messages]
+            new = await self.deduplicator.claim_async(references)
+            messages = [message for message, is_new in zip(messages, new) if is_new]
+            references = [reference for reference, is_new in zip(references, new) if is_new]
+        for message, reference in zip(messages, references):
+            # Waits while the queue is full, which stops reading until a worker frees up
+            await self.queue.put((message, reference, time.monotonic()))
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    async def work(self):
+        while True:
+            message, reference, queued_at = await self.queue.get()
+            try:
+                succeeded = await self.dispatch(message, queued_at)
+                if self.deduplicator:
+                    if succeeded:
+                        await self.deduplicator.confirm_async([reference])
+                    else:
+                        # Let a redelivery of the event be handled again
+                        await self.deduplicator.release_async(reference)
+            finally:
+                self.queue.task_done()
+
+    async def dispatch(self, message: dict, queued_at: float) -> bool:
+        """Runs the handlers of a message and returns whether they all succeeded."""
+        channel, subscription = self.route(message)
+        self.queue_wait_count += 1
+        self.queue_wait.record(time.monotonic() - queued_at)
+        handlers = self.handlers.get(subscription, [])
+        if not handlers:
+            self.unhandled += 1
+            return True
+        stats = self.stats_by_subscription[subscription]
+        succeeded = True
+        for handler, timeout in handlers:
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(handler(channel, message["data"]), timeout)
+                stats.handled += 1
+            except asyncio.TimeoutError:
+                succeeded = False
+                stats.timed_out += 1
+                log_event("ERROR", f"Handler {getattr(handler, '__name__', handler)} timed out on channel {channel}")
+            except Exception as e:
+                succeeded = False
+                stats.failed += 1
+                log_event("ERROR", f"Handler {getattr(handler, '__name__', handler)} failed on channel {channel}: {e}")
+            stats.record(time.monotonic() - started)
+        return succeeded
+
+    @staticmethod
+    def route(message: dict) -> Tuple[str, str]:
+        """The channel of a message and the subscription it was delivered for."""
+        channel = message["channel"].decode() if isinstance(message["channel"], bytes) else message["channel"]
+        # A channel that is also matched by a registered pattern arrives once per subscription
+        if message["type"] == "pmessage":
+            pattern = message["pattern"]
+            return channel, pattern.decode() if isinstance(pattern, bytes) else pattern
+        return channel, channel
+
+    @staticmethod
+    def dedup_reference(message: dict) -> Optional[str]:
+        reference = EventDeduplicator.event_reference(message["data"])
+        if reference is None:
+            return None
+        return f"{RedisAsyncSubscriber.route(message)[1]}:{reference}"
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "received": self.received,
+            "unhandled": self.unhandled,
+            "queue_wait": self.queue_wait.latency_json(self.queue_wait_count),
+            "deduplication": self.deduplicator.stats() if self.deduplicator else None,
+            "handlers": {
+                subscription: stats.to_json() for subscription, stats in self.stats_by_subscription.items()
+            },
+        }
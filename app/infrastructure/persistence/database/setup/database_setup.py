@@ -1,4 +1,7 @@
 
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 
 from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
@@ -7,11 +10,32 @@ from app.infrastructure.system.configuration.configuration import Config
 class Database:
     client = None
     isConnected = False
+    # Process that created the client; a client inherited across fork must not be reused
+    pid = None
+
+    @staticmethod
+    def client_options():
+        options = {
+            "maxPoolSize": Config.Db_max_pool_size,
+            "minPoolSize": Config.Db_min_pool_size,
+            "waitQueueTimeoutMS": Config.Db_wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": Config.Db_server_selection_timeout_ms,
+            "connectTimeoutMS": Config.Db_connect_timeout_ms,
+            "socketTimeoutMS": Config.Db_socket_timeout_ms,
+        }
+        if Config.Db_compressors:
+            options["compressors"] = Config.Db_compressors
+        return options
 
     @staticmethod
     def connect():
+        if Database.pid != os.getpid():
+            # Each worker process builds its own pool
+            Database.client = None
+            Database.isConnected = False
         if not Database.client or not Database.isConnected:
-            Database.client = MongoClient(Config.Db_url)
+            Database.client = MongoClient(Config.Db_url, **Database.client_options())
+            Database.pid = os.getpid()
             try:
                 # In pymongo, calling client.db triggers the connection
                 Database.isConnected = True
@@ -23,7 +47,36 @@ class Database:
 
     @staticmethod
     def disconnect():
-        if Database.client and Database.isConnected:
+        if Database.client and Database.isConnected and Database.pid == os.getpid():
             Database.client.close()
             Database.isConnected = False
-            log_event("INFO", "Disconnected from MongoDB")
\ No newline at end of file
+            log_event("INFO", "Disconnected from MongoDB")
+
+class AsyncDatabase:
+    client = None
+    isConnected = False
+    pid = None
+
+    @staticmethod
+    def connect():
+        if AsyncDatabase.pid != os.getpid():
+            AsyncDatabase.client = None
+            AsyncDatabase.isConnected = False
+        if not AsyncDatabase.client or not AsyncDatabase.isConnected:
+            # Motor binds to the running event loop, so this must be called from within it
+            AsyncDatabase.client = AsyncIOMotorClient(Config.Db_url, **Database.client_options())
+            AsyncDatabase.pid = os.getpid()
+            try:
+                AsyncDatabase.isConnected = True
+                log_event("INFO", "Connected successfully to MongoDB (async)")
+            except Exception as err:
+                log_event("ERROR", f"Could not connect to MongoDB (async): {err}")
+                raise err
+        return AsyncDatabase.client[Config.Db]
+
+    @staticmethod
+    def disconnect():
+        if AsyncDatabase.client and AsyncDatabase.isConnected and AsyncDatabase.pid == os.getpid():
+            AsyncDatabase.client.close()
+            AsyncDatabase.isConnected = False
+            log_event("INFO", "Disconnected from MongoDB (async)")
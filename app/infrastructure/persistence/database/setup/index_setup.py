@@ -0,0 +1,43 @@
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, IndexModel
+
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+# Indexes backing every query issued by the user repositories.
+# The unique indexes are also what create_user relies on for conflict detection.
+USER_INDEXES = [
+    IndexModel([("user_reference", ASCENDING)], name="user_reference_unique", unique=True),
+    IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    # Export filters
+    IndexModel([("is_active", ASCENDING)], name="is_active"),
+    IndexModel([("organisations.organisation_reference", ASCENDING)], name="organisation_reference"),
+    IndexModel([("updated_at_timestamp", ASCENDING)], name="updated_at_timestamp"),
+]
+
+# Backs the relay's scan for messages that are due
+OUTBOX_INDEXES = [
+    IndexModel([("available_at", ASCENDING)], name="available_at"),
+]
+
+
+class IndexManager:
+    @staticmethod
+    async def ensure_indexes(database):
+        try:
+            created = await IndexManager._create_indexes(database["users"], USER_INDEXES)
+            log_event("INFO", f"Indexes ensured on users collection: {', '.join(created)}")
+            outbox_created = await IndexManager._create_indexes(database["outbox"], OUTBOX_INDEXES)
+            log_event("INFO", f"Indexes ensured on outbox collection: {', '.join(outbox_created)}")
+            return created + outbox_created
+        except Exception as err:
+            log_event("ERROR", f"Could not ensure indexes: {err}")
+            raise err
+
+    @staticmethod
+    async def _create_indexes(collection, indexes):
+        if isinstance(collection, AsyncIOMotorCollection):
+            return await collection.create_indexes(indexes)
+        return await asyncio.to_thread(collection.create_indexes, indexes)
@@ -0,0 +1,121 @@
+from typing import Dict, Iterable, List, Optional
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_user_model import User
+from app.domain.shared.shared_errors import DomainError, ErrorType
+from app.infrastructure.system.configuration.configuration import Config
+
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+class DatabaseHelper:
+    @staticmethod
+    def duplicate_user_message(key_pattern: dict, user: User) -> str:
+        if "email" in key_pattern:
+            return f"A user with the email {user.email} already exists."
+        if "user_reference" in key_pattern:
+            return f"A user with the reference {user.user_reference} already exists."
+        return f"User {user.user_reference} conflicts with an existing user."
+
+    @staticmethod
+    def duplicate_user_error(error: DuplicateKeyError, user: User) -> DomainError:
+        """Maps a unique index violation on the users collection to a ConflictError."""
+        key_pattern = (error.details or {}).get("keyPattern", {})
+        return DomainError(ErrorType.ConflictError, DatabaseHelper.duplicate_user_message(key_pattern, user))
+
+    @staticmethod
+    def bulk_write_failures(error: BulkWriteError, users: List[User]) -> Dict[int, str]:
+        """Maps the write errors of an unordered insert_many to the index of each failed user."""
+        failures = {}
+        for write_error in error.details.get("writeErrors", []):
+            index = write_error["index"]
+            if write_error.get("code") == DUPLICATE_KEY_ERROR_CODE:
+                failures[index] = DatabaseHelper.duplicate_user_message(
+                    write_error.get("keyPattern", {}), users[index]
+                )
+            else:
+                failures[index] = write_error.get("errmsg", "Could not create user.")
+        return failures
+
+    @staticmethod
+    def conflict_query(users: List[User]) -> dict:
+        """Matches the stored users that share a reference or an email with any of the given users."""
+        return {
+            "$or": [
+                {"user_reference": {"$in": [user.user_reference for user in users]}},
+                {"email": {"$in": [user.email for user in users]}},
+            ]
+        }
+
+    @staticmethod
+    def conflict_failures(users: List[User], existing: List[dict]) -> Dict[int, str]:
+        """Maps the users that clash with the stored users found by conflict_query to the index of each."""
+        references = {document.get("user_reference") for document in existing}
+        emails = {document.get("email") for document in existing}
+        failures = {}
+        for index, user in enumerate(users):
+            if user.user_reference in references:
+                failures[index] = DatabaseHelper.duplicate_user_message({"user_reference": 1}, user)
+            elif user.email in emails:
+                failures[index] = DatabaseHelper.duplicate_user_message({"email": 1}, user)
+        return failures
+
+    @staticmethod
+    def user_filter(user_reference: str, expected_version: Optional[int] = None) -> dict:
+        """Matches a user, and only at the expected version when one is given."""
+        query = {"user_reference": user_reference}
+        if expected_version is not None:
+            # Users stored before versioning have no version field and count as version 0
+            query["version"] = {"$in": [0, None]} if expected_version == 0 else expected_version
+        return query
+
+    @staticmethod
+    def user_projection(fields: Optional[Iterable[str]]) -> Optional[dict]:
+        """
+        Builds a Mongo projection for a sparse fieldset. The reference is always
+        projected so partial documents can be loaded as Users, and derived fields
+        pull in the stored fields they are computed from.
+        """
+        if fields is None:
+            return None
+        # The version is always needed to answer conditional requests
+        projection = {"user_reference": 1, "version": 1}
+        for field in fields:
+            for stored_field in User.FIELD_DEPENDENCIES.get(field, (field,)):
+                projection[stored_field] = 1
+        return projection
+
+    @staticmethod
+    def export_query(export_filter: UserExportFilterDTO) -> dict:
+        query = {}
+        if export_filter.is_active is not None:
+            query["is_active"] = export_filter.is_active
+        if export_filter.organisation_reference is not None:
+            query["organisations.organisation_reference"] = export_filter.organisation_reference
+        if export_filter.updated_since is not None:
+            # Timestamps are stored as ISO 8601 strings, which sort chronologically
+            query["updated_at_timestamp"] = {"$gte": export_filter.updated_since}
+        return query
+
+    @staticmethod
+    def read_preference():
+        """Read preference for queries that may be served by a replica set secondary."""
+        mode = READ_PREFERENCES.get(Config.Db_read_preference)
+        if mode is None:
+            raise ValueError(f"Unsupported read preference: {Config.Db_read_preference}")
+        if mode is Primary:
+            # Max staleness is not allowed together with the primary
+            return Primary()
+        return mode(max_staleness=Config.Db_max_staleness_seconds)
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from app.domain.models.tapi_outbox_message_model import OutboxMessage
+from app.infrastructure.system.configuration.configuration import Config
+
+
+class OutboxHelper:
+    @staticmethod
+    def documents(messages: List[OutboxMessage]) -> List[dict]:
+        now = datetime.utcnow()
+        return [
+            {
+                "channel": message.channel,
+                "payload": message.payload,
+                "attempts": 0,
+                "created_at": now,
+                "available_at": now,
+                "lease_token": None,
+                "lease_expires_at": None,
+            }
+            for message in messages
+        ]
+
+    @staticmethod
+    def message(document: dict) -> OutboxMessage:
+        return OutboxMessage(
+            document["channel"], document["payload"], document["_id"], document.get("attempts", 0)
+        )
+
+    @staticmethod
+    def claimable_query(now: datetime) -> dict:
+        # Due, and either never leased or leased by a relay that did not finish in time
+        return {
+            "available_at": {"$lte": now},
+            "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lte": now}}],
+        }
+
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """Exponential backoff, capped so a long Redis outage is retried promptly once it ends."""
+        return timedelta(seconds=min(2 ** attempts, Config.Outbox_max_retry_delay))
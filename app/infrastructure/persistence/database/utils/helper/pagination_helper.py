@@ -0,0 +1,41 @@
+import base64
+import binascii
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.domain.shared.shared_errors import DomainError, ErrorType
+
+
+class PaginationHelper:
+    @staticmethod
+    def encode_cursor(object_id: ObjectId) -> str:
+        """Encodes the _id of the last document on a page as an opaque, URL-safe token."""
+        return base64.urlsafe_b64encode(object_id.binary).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> ObjectId:
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            return ObjectId(base64.urlsafe_b64decode(cursor + padding))
+        except (binascii.Error, InvalidId, TypeError, ValueError):
+            raise DomainError(ErrorType.BadRequestError, "Invalid pagination cursor.")
+
+    @staticmethod
+    def keyset_query(query_params: Optional[dict], cursor: Optional[str]) -> dict:
+        """Builds a query that resumes strictly after the document the cursor points at."""
+        query = dict(query_params or {})
+        if cursor:
+            query["_id"] = {"$gt": PaginationHelper.decode_cursor(cursor)}
+        return query
+
+    @staticmethod
+    def next_cursor(documents: list, per_page: int) -> Optional[str]:
+        """
+        Pages are fetched with one extra document as a look-ahead; if it is present
+        there is another page, which starts after the last document returned here.
+        """
+        if len(documents) <= per_page:
+            return None
+        return PaginationHelper.encode_cursor(documents[per_page - 1]["_id"])
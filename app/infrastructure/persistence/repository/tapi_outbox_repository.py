@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, List
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.collection import Collection
+from pymongo.database import Database as MongoDatabase
+from pymongo.errors import PyMongoError
+
+from app.domain.models.tapi_outbox_message_model import OutboxMessage
+from app.domain.repository_interfaces.tapi_outbox_repository_interface import (
+    IOutboxRepository,
+)
+from app.infrastructure.persistence.database.utils.helper.outbox_helper import OutboxHelper
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+class OutboxRepository(IOutboxRepository):
+    def __init__(self, db_client: MongoDatabase):
+        self.collection: Collection = db_client["outbox"]
+
+    def claim_messages(self, limit: int, lease_seconds: int) -> List[OutboxMessage]:
+        try:
+            now = datetime.utcnow()
+            claimable = OutboxHelper.claimable_query(now)
+            candidates = self.collection.find(claimable, {"_id": 1}).sort("_id", ASCENDING).limit(limit)
+            message_ids = [document["_id"] for document in candidates]
+            if not message_ids:
+                return []
+            # Re-checking the claimable condition makes the lease atomic per message,
+            # so concurrent relays never share one; the token identifies this claim
+            lease_token = uuid.uuid4().hex
+            self.collection.update_many(
+                {"_id": {"$in": message_ids}, **claimable},
+                {"$set": {"lease_token": lease_token, "lease_expires_at": now + timedelta(seconds=lease_seconds)}},
+            )
+            claimed = self.collection.find({"lease_token": lease_token}).sort("_id", ASCENDING)
+            return [OutboxHelper.message(document) for document in claimed]
+        except PyMongoError as e:
+            log_event("ERROR", f"Error claiming outbox messages: {e}")
+            raise e
+
+    def delete_messages(self, message_ids: List[Any]) -> int:
+        try:
+            result = self.collection.delete_many({"_id": {"$in": message_ids}})
+            return result.deleted_count
+        except PyMongoError as e:
+            log_event("ERROR", f"Error deleting outbox messages: {e}")
+            raise e
+
+    def release_messages(self, messages: List[OutboxMessage], error: str) -> None:
+        try:
+            now = datetime.utcnow()
+            self.collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": message.message_id},
+                        {
+                            "$set": {
+                                "available_at": now + OutboxHelper.retry_delay(message.attempts + 1),
+                                "lease_token": None,
+                                "lease_expires_at": None,
+                                "last_error": error,
+                            },
+                            "$inc": {"attempts": 1},
+                        },
+                    )
+                    for message in messages
+                ],
+                ordered=False,
+            )
+        except PyMongoError as e:
+            log_event("ERROR", f"Error releasing outbox messages: {e}")
+            raise e
@@ -0,0 +1,24 @@
+import asyncio
+from typing import Any, List
+
+from app.domain.models.tapi_outbox_message_model import OutboxMessage
+from app.domain.repository_interfaces.tapi_outbox_async_repository_interface import (
+    IAsyncOutboxRepository,
+)
+from app.infrastructure.persistence.repository.tapi_outbox_repository import OutboxRepository
+
+
+class ThreadedOutboxRepository(IAsyncOutboxRepository):
+    """Runs the synchronous pymongo OutboxRepository in the default thread pool."""
+
+    def __init__(self, outbox_repository: OutboxRepository):
+        self.outbox_repository = outbox_repository
+
+    async def claim_messages(self, limit: int, lease_seconds: int) -> List[OutboxMessage]:
+        return await asyncio.to_thread(self.outbox_repository.claim_messages, limit, lease_seconds)
+
+    async def delete_messages(self, message_ids: List[Any]) -> int:
+        return await asyncio.to_thread(self.outbox_repository.delete_messages, message_ids)
+
+    async def release_messages(self, messages: List[OutboxMessage], error: str) -> None:
+        return await asyncio.to_thread(self.outbox_repository.release_messages, messages, error)
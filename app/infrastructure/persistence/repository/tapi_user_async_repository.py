@@ -0,0 +1,405 @@
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from app.domain.repository_interfaces.tapi_user_async_repository_interface import (
+    IAsyncUserRepository,
+)
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
+from app.domain.models.tapi_user_model import User
+from app.domain.models.tapi_user_page_model import UserPage
+from app.domain.shared.shared_errors import DomainError
+
+from app.infrastructure.persistence.database.utils.helper.database_helper import DatabaseHelper
+from app.infrastructure.persistence.database.utils.helper.outbox_helper import OutboxHelper
+from app.infrastructure.persistence.database.utils.helper.pagination_helper import PaginationHelper
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
+
+
+# The fields a new user can clash with an existing one on
+CONFLICT_PROJECTION = {"user_reference": 1, "email": 1}
+
+
+class AsyncUserRepository(IAsyncUserRepository):
+    def __init__(self, db_client: AsyncIOMotorDatabase):
+        self.collection: AsyncIOMotorCollection = db_client["users"]
+        # Handle for list and lookup queries, which may be routed to secondaries
+        self.read_collection = self.collection.with_options(read_preference=DatabaseHelper.read_preference())
+        # Events stored alongside user writes, drained to Redis by the outbox relay
+        self.outbox = db_client["outbox"]
+
+    @TraceHelper.traced
+    async def create_user(self, user: User, events: Optional[UserEventBuilder] = None) -> str:
+        async def write(session):
+            await self.collection.insert_one(user.__dict__, session=session)
+            return user
+
+        try:
+            await self._write(write, events)
+            log_event("INFO", f"User {user.user_reference} created successfully.")
+            return str(user.user_reference)
+        except DuplicateKeyError as e:
+            log_event("WARNING", f"User {user.user_reference} already exists: {e}")
+            raise DatabaseHelper.duplicate_user_error(e, user)
+        except PyMongoError as e:
+            log_event("ERROR", f"Error adding user: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def create_users(
+        self, users: List[User], events: Optional[UserEventBuilder] = None
+    ) -> Dict[int, str]:
+        if not users:
+            return {}
+        if events:
+            return await self._create_users_with_events(users, events)
+        failures = {}
+        try:
+            # Unordered, so one conflicting record does not stop the rest of the batch
+            await self.collection.insert_many([user.__dict__ for user in users], ordered=False)
+            log_event("INFO", f"{len(users)} users created successfully.")
+        except BulkWriteError as e:
+            failures = DatabaseHelper.bulk_write_failures(e, users)
+            log_event("WARNING", f"{len(users) - len(failures)} of {len(users)} users created, {len(failures)} failed.")
+        except PyMongoError as e:
+            log_event("ERROR", f"Error adding users: {e}")
+            raise e
+        return failures
+
+    @TraceHelper.traced
+    async def update_user(self, user_reference: str, user_data: User) -> str:
+        try:
+            # The version is only ever advanced by the database
+            document = {field: value for field, value in user_data.__dict__.items() if field != "version"}
+            await self.collection.update_one(
+                {"user_reference": user_reference}, {"$set": document, "$inc": {"version": 1}}
+            )
+            log_event("INFO", f"User {user_reference} updated successfully.")
+            return user_reference
+        except PyMongoError as e:
+            log_event("ERROR", f"Error updating user: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def update_user_fields(
+        self,
+        user_reference: str,
+        changes: dict,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        async def write(session):
+            user_data = await self.collection.find_one_and_update(
+                DatabaseHelper.user_filter(user_reference, expected_version),
+                {"$set": changes, "$inc": {"version": 1}},
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+            return User(**user_data) if user_data else None
+
+        try:
+            user = await self._write(write, events)
+            if user:
+                log_event("INFO", f"User {user_reference} fields updated successfully: {', '.join(changes)}.")
+            return user
+        except PyMongoError as e:
+            log_event("ERROR", f"Error updating user: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def add_user_organisation(
+        self,
+        user_reference: str,
+        organisation: dict,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        # The $ne guard makes the membership check and the push a single atomic operation
+        query = DatabaseHelper.user_filter(user_reference, expected_version)
+        query["organisations.organisation_name"] = {"$ne": organisation.get("organisation_name")}
+
+        async def write(session):
+            user_data = await self.collection.find_one_and_update(
+                query,
+                {
+                    "$push": {"organisations": organisation},
+                    "$set": {"updated_at_timestamp": updated_at_timestamp},
+                    "$inc": {"version": 1},
+                },
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+            return User(**user_data) if user_data else None
+
+        try:
+            user = await self._write(write, events)
+            if user:
+                log_event("INFO", f"User {user_reference} added to organisation successfully.")
+            return user
+        except PyMongoError as e:
+            log_event("ERROR", f"Error adding user to organisation: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def remove_user_organisation(
+        self,
+        user_reference: str,
+        organisation_reference: str,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        query = DatabaseHelper.user_filter(user_reference, expected_version)
+        query["organisations"] = {"$elemMatch": {"organisation_reference": organisation_reference}}
+
+        async def write(session):
+            user_data = await self.collection.find_one_and_update(
+                query,
+                {
+                    "$pull": {"organisations": {"organisation_reference": organisation_reference}},
+                    "$set": {"updated_at_timestamp": updated_at_timestamp},
+                    "$inc": {"version": 1},
+                },
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+            return User(**user_data) if user_data else None
+
+        try:
+            user = await self._write(write, events)
+            if user:
+                log_event("INFO", f"User {user_reference} removed from organisation successfully.")
+            return user
+        except PyMongoError as e:
+            log_event("ERROR", f"Error removing user from organisation: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        collection = self.collection if use_primary else self.read_collection
+        try:
+            user_data = await collection.find_one(
+                {"user_reference": user_reference}, DatabaseHelper.user_projection(fields)
+            )
+            if user_data:
+                log_event("DEBUG", f"User with reference: {user_reference} retrieved successfully.")
+                return User(**user_data)
+            else:
+                log_event("WARNING", f"User with reference: {user_reference} not found.")
+                return None
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving user: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        try:
+            documents_cursor = self.read_collection.find(
+                {"user_reference": {"$in": user_references}}, DatabaseHelper.user_projection(fields)
+            )
+            users = {
+                user_data["user_reference"]: User(**user_data)
+                async for user_data in documents_cursor
+            }
+            log_event("DEBUG", f"{len(users)} of {len(user_references)} users retrieved by reference successfully.")
+            return users
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving users by reference: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def get_user_by_email(self, email: str) -> User:
+        try:
+            user_data = await self.read_collection.find_one({"email": email})
+            if user_data:
+                log_event("DEBUG", f"User with email: {email} retrieved successfully.")
+                return User(**user_data)
+            else:
+                log_event("WARNING", f"User with email: {email} not found.")
+                return None
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving user: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def get_all_users(
+        self, page: int, per_page: int = Config.Page_size, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        try:
+            cursor = self.read_collection.find({}, DatabaseHelper.user_projection(fields)).skip((page - 1) * per_page).limit(per_page)
+            users = await cursor.to_list(length=per_page)
+            log_event("DEBUG", "Users retrieved successfully.")
+            return [User(**user_data) for user_data in users]
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving users: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def get_users_by_query(
+        self,
+        query_params: dict,
+        page: int,
+        per_page: int = Config.Page_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[User]:
+        try:
+            cursor = (
+                self.read_collection.find(query_params, DatabaseHelper.user_projection(fields))
+                .skip((page - 1) * per_page)
+                .limit(per_page)
+            )
+            users = await cursor.to_list(length=per_page)
+            log_event("DEBUG", "Users retrieved by query successfully.")
+            return [User(**user_data) for user_data in users]
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving users by query: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def get_users_by_cursor(
+        self,
+        cursor: Optional[str],
+        per_page: int = Config.Page_size,
+        query_params: dict = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> UserPage:
+        try:
+            documents_cursor = (
+                self.read_collection.find(
+                    PaginationHelper.keyset_query(query_params, cursor),
+                    DatabaseHelper.user_projection(fields),
+                )
+                .sort("_id", ASCENDING)
+                .limit(per_page + 1)
+            )
+            documents = await documents_cursor.to_list(length=per_page + 1)
+            log_event("DEBUG", "Users retrieved by cursor successfully.")
+            return UserPage(
+                [User(**user_data) for user_data in documents[:per_page]],
+                PaginationHelper.next_cursor(documents, per_page),
+            )
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving users by cursor: {e}")
+            raise e
+
+    async def iter_users(
+        self,
+        export_filter: UserExportFilterDTO,
+        batch_size: int = Config.Export_batch_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[User]:
+        try:
+            documents = (
+                self.read_collection.find(
+                    DatabaseHelper.export_query(export_filter), DatabaseHelper.user_projection(fields)
+                )
+                .sort("_id", ASCENDING)
+                .batch_size(batch_size)
+            )
+            async for user_data in documents:
+                yield User(**user_data)
+            log_event("DEBUG", "Users exported successfully.")
+        except PyMongoError as e:
+            log_event("ERROR", f"Error exporting users: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def delete_user(self, user_reference: str) -> bool:
+        try:
+            result = await self.collection.delete_one({"user_reference": user_reference})
+            if result.deleted_count > 0:
+                log_event("INFO", f"User {user_reference} deleted successfully.")
+            return result.deleted_count > 0
+        except PyMongoError as e:
+            log_event("ERROR", f"Error deleting user: {e}")
+            raise e
+
+    @TraceHelper.traced
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        try:
+            result = await self.collection.update_one(
+                {"user_reference": user_reference}, {"$set": {"is_active": False}, "$inc": {"version": 1}}
+            )
+            if result.modified_count > 0:
+                log_event("INFO", f"User {user_reference} soft deleted successfully.")
+            return result.modified_count > 0
+        except PyMongoError as e:
+            log_event("ERROR", f"Error soft deleting user: {e}")
+            raise e
+
+    async def _write(self, write, events: Optional[UserEventBuilder] = None):
+        """
+        Runs a write returning the written user, or None when nothing matched, and stores
+        the events built from that user in the outbox, in the same transaction.
+        """
+        if events is None:
+            return await write(None)
+
+        async def transaction(session):
+            user = await write(session)
+            await self._store_events([user] if user else [], events, session)
+            return user
+
+        async with await self.collection.database.client.start_session() as session:
+            return await session.with_transaction(transaction)
+
+    async def _create_users_with_events(self, users: List[User], events: UserEventBuilder) -> Dict[int, str]:
+        """
+        Creates a batch and stores its events in one transaction. A conflicting record aborts the
+        whole transaction, so users that already exist are left out up front, and conflicts that
+        only show on insert, within the batch or with concurrent writes, are left out of one retry.
+        """
+        try:
+            existing = await self.collection.find(DatabaseHelper.conflict_query(users), CONFLICT_PROJECTION).to_list(None)
+            failures = DatabaseHelper.conflict_failures(users, existing)
+            # Indexes into users of the records still to be written
+            pending = [index for index in range(len(users)) if index not in failures]
+            for _ in range(2):
+                if not pending:
+                    break
+                batch = [users[index] for index in pending]
+                try:
+                    await self._insert_with_events(batch, events)
+                    pending = []
+                except BulkWriteError as e:
+                    batch_failures = DatabaseHelper.bulk_write_failures(e, batch)
+                    failures.update({pending[index]: message for index, message in batch_failures.items()})
+                    pending = [user_index for index, user_index in enumerate(pending) if index not in batch_failures]
+        except PyMongoError as e:
+            log_event("ERROR", f"Error adding users: {e}")
+            raise e
+        # Still conflicting after the retry: written user by user, each with its own events
+        for index in pending:
+            try:
+                await self.create_user(users[index], events)
+            except DomainError as e:
+                failures[index] = str(e)
+            except PyMongoError as e:
+                failures[index] = f"Could not create user - {e}"
+        if failures:
+            log_event("WARNING", f"{len(users) - len(failures)} of {len(users)} users created, {len(failures)} failed.")
+        else:
+            log_event("INFO", f"{len(users)} users created successfully.")
+        return failures
+
+    async def _insert_with_events(self, users: List[User], events: UserEventBuilder):
+        async def transaction(session):
+            await self.collection.insert_many([user.__dict__ for user in users], session=session)
+            await self._store_events(users, events, session)
+
+        async with await self.collection.database.client.start_session() as session:
+            await session.with_transaction(transaction)
+
+    async def _store_events(self, users: List[User], events: UserEventBuilder, session):
+        messages = [message for user in users for message in events(user)]
+        if messages:
+            await self.outbox.insert_many(OutboxHelper.documents(messages), session=session)
@@ -0,0 +1,99 @@
+from typing import Iterable, Optional
+
+from app.domain.repository_interfaces.tapi_user_async_repository_interface import (
+    IAsyncUserRepository,
+)
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
+from app.domain.models.tapi_user_model import User
+from app.infrastructure.cache.user.user_cache import UserCache
+from app.infrastructure.persistence.repository.tapi_user_repository_decorator import UserRepositoryDecorator
+
+
+class CachedUserRepository(UserRepositoryDecorator):
+    """
+    Read-through cache for single-user lookups. Whole users are cached, so any
+    sparse fieldset can be served from the same entry; every mutation of a user
+    invalidates it across all workers.
+    """
+
+    def __init__(self, user_repository: IAsyncUserRepository, user_cache: UserCache):
+        super().__init__(user_repository)
+        self.user_cache = user_cache
+
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        # Reads made before a write skip the cache so they never act on a stale copy
+        if not use_primary:
+            user_data = await self.user_cache.get(user_reference)
+            if user_data is not None:
+                return User(**user_data)
+        generation = self.user_cache.generation
+        # Filled from the primary: a secondary may still hold the copy from before an update,
+        # which would otherwise be served from Redis for the whole TTL
+        user = await self.user_repository.get_user_by_reference(user_reference, use_primary=True)
+        if user:
+            await self.user_cache.set(user_reference, user.to_json(), generation)
+        return user
+
+    async def update_user(self, user_reference: str, user_data: User) -> str:
+        try:
+            return await self.user_repository.update_user(user_reference, user_data)
+        finally:
+            await self.user_cache.invalidate([user_reference])
+
+    async def update_user_fields(
+        self,
+        user_reference: str,
+        changes: dict,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        try:
+            return await self.user_repository.update_user_fields(
+                user_reference, changes, expected_version, events
+            )
+        finally:
+            await self.user_cache.invalidate([user_reference])
+
+    async def add_user_organisation(
+        self,
+        user_reference: str,
+        organisation: dict,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        try:
+            return await self.user_repository.add_user_organisation(
+                user_reference, organisation, updated_at_timestamp, expected_version, events
+            )
+        finally:
+            await self.user_cache.invalidate([user_reference])
+
+    async def remove_user_organisation(
+        self,
+        user_reference: str,
+        organisation_reference: str,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        try:
+            return await self.user_repository.remove_user_organisation(
+                user_reference, organisation_reference, updated_at_timestamp, expected_version, events
+            )
+        finally:
+            await self.user_cache.invalidate([user_reference])
+
+    async def delete_user(self, user_reference: str) -> bool:
+        try:
+            return await self.user_repository.delete_user(user_reference)
+        finally:
+            await self.user_cache.invalidate([user_reference])
+
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        try:
+            return await self.user_repository.soft_delete_user(user_reference)
+        finally:
+            await self.user_cache.invalidate([user_reference])
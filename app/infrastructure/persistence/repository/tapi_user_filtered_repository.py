@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List, Optional
+
+from app.domain.repository_interfaces.tapi_user_async_repository_interface import (
+    IAsyncUserRepository,
+)
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
+from app.domain.models.tapi_user_model import User
+from app.infrastructure.cache.user.user_existence_filter import UserExistenceFilter
+from app.infrastructure.persistence.repository.tapi_user_repository_decorator import UserRepositoryDecorator
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+class FilteredUserRepository(UserRepositoryDecorator):
+    """
+    Answers lookups for users that definitely do not exist from the existence
+    filter, without touching the cache or the database.
+    """
+
+    def __init__(self, user_repository: IAsyncUserRepository, user_filter: UserExistenceFilter):
+        super().__init__(user_repository)
+        self.user_filter = user_filter
+
+    async def create_user(self, user: User, events: Optional[UserEventBuilder] = None) -> str:
+        # Recorded before the insert, so a concurrent lookup is never told the new user is absent;
+        # after it, a lookup landing between the insert and the add would get a false 404.
+        # A failed insert only leaves a harmless false positive.
+        await self.user_filter.add_users([user])
+        return await self.user_repository.create_user(user, events)
+
+    async def create_users(
+        self, users: List[User], events: Optional[UserEventBuilder] = None
+    ) -> Dict[int, str]:
+        await self.user_filter.add_users(users)
+        return await self.user_repository.create_users(users, events)
+
+    async def update_user(self, user_reference: str, user_data: User) -> str:
+        # A full replacement may carry a new email
+        await self.user_filter.add_users([user_data])
+        return await self.user_repository.update_user(user_reference, user_data)
+
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        # The filter has no false negatives, so it is safe for primary reads too
+        [may_exist] = await self.user_filter.may_exist([UserExistenceFilter.reference_item(user_reference)])
+        if not may_exist:
+            log_event("WARNING", f"User with reference: {user_reference} not found.")
+            return None
+        return await self.user_repository.get_user_by_reference(user_reference, fields, use_primary)
+
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        answers = await self.user_filter.may_exist(
+            [UserExistenceFilter.reference_item(user_reference) for user_reference in user_references]
+        )
+        candidates = [user_reference for user_reference, may_exist in zip(user_references, answers) if may_exist]
+        if not candidates:
+            return {}
+        return await self.user_repository.get_users_by_references(candidates, fields)
+
+    async def get_user_by_email(self, email: str) -> User:
+        [may_exist] = await self.user_filter.may_exist([UserExistenceFilter.email_item(email)])
+        if not may_exist:
+            log_event("WARNING", f"User with email: {email} not found.")
+            return None
+        return await self.user_repository.get_user_by_email(email)
@@ -1,32 +1,77 @@
-from typing import List
-from pymongo import MongoClient
+from typing import Dict, Iterable, Iterator, List, Optional
+from pymongo import ASCENDING, ReturnDocument, MongoClient
 from app.domain.repository_interfaces.tapi_user_respository_interface import (
     IUserRepository,
 )
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
 from app.domain.models.tapi_user_model import User
+from app.domain.models.tapi_user_page_model import UserPage
+from app.domain.shared.shared_errors import DomainError
 from pymongo.collection import Collection
-from pymongo.errors import PyMongoError
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
+from app.infrastructure.persistence.database.utils.helper.database_helper import DatabaseHelper
+from app.infrastructure.persistence.database.utils.helper.outbox_helper import OutboxHelper
+from app.infrastructure.persistence.database.utils.helper.pagination_helper import PaginationHelper
+from app.infrastructure.system.configuration.configuration import Config
 from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
 
 
+# The fields a new user can clash with an existing one on
+CONFLICT_PROJECTION = {"user_reference": 1, "email": 1}
+
+
 class UserRepository(IUserRepository):
     def __init__(self, db_client: MongoClient):
         self.collection: Collection = db_client["users"]
+        # Handle for list and lookup queries, which may be routed to secondaries
+        self.read_collection = self.collection.with_options(read_preference=DatabaseHelper.read_preference())
+        # Events stored alongside user writes, drained to Redis by the outbox relay
+        self.outbox = db_client["outbox"]
+
+    def create_user(self, user: User, events: Optional[UserEventBuilder] = None) -> str:
+        def write(session):
+            self.collection.insert_one(user.__dict__, session=session)
+            return user
 
-    def create_user(self, user: User) -> str:
         try:
-            self.collection.insert_one(user.__dict__)
+            self._write(write, events)
             log_event("INFO", f"User {user.user_reference} created successfully.")
             return str(user.user_reference)
+        except DuplicateKeyError as e:
+            log_event("WARNING", f"User {user.user_reference} already exists: {e}")
+            raise DatabaseHelper.duplicate_user_error(e, user)
         except PyMongoError as e:
             log_event("ERROR", f"Error adding user: {e}")
             raise e
 
+    def create_users(
+        self, users: List[User], events: Optional[UserEventBuilder] = None
+    ) -> Dict[int, str]:
+        if not users:
+            return {}
+        if events:
+            return self._create_users_with_events(users, events)
+        failures = {}
+        try:
+            # Unordered, so one conflicting record does not stop the rest of the batch
+            self.collection.insert_many([user.__dict__ for user in users], ordered=False)
+            log_event("INFO", f"{len(users)} users created successfully.")
+        except BulkWriteError as e:
+            failures = DatabaseHelper.bulk_write_failures(e, users)
+            log_event("WARNING", f"{len(users) - len(failures)} of {len(users)} users created, {len(failures)} failed.")
+        except PyMongoError as e:
+            log_event("ERROR", f"Error adding users: {e}")
+            raise e
+        return failures
+
     def update_user(self, user_reference: str, user_data: User) -> str:
         try:
+            # The version is only ever advanced by the database
+            document = {field: value for field, value in user_data.__dict__.items() if field != "version"}
             self.collection.update_one(
-                {"user_reference": user_reference}, {"$set": user_data.__dict__}
+                {"user_reference": user_reference}, {"$set": document, "$inc": {"version": 1}}
             )
             log_event("INFO", f"User {user_reference} updated successfully.")
             return user_reference
@@ -34,11 +79,108 @@ class UserRepository(IUserRepository):
             log_event("ERROR", f"Error updating user: {e}")
             raise e
 
-    def get_user_by_reference(self, user_reference: str) -> User:
+    def update_user_fields(
+        self,
+        user_reference: str,
+        changes: dict,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        def write(session):
+            user_data = self.collection.find_one_and_update(
+                DatabaseHelper.user_filter(user_reference, expected_version),
+                {"$set": changes, "$inc": {"version": 1}},
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+            return User(**user_data) if user_data else None
+
+        try:
+            user = self._write(write, events)
+            if user:
+                log_event("INFO", f"User {user_reference} fields updated successfully: {', '.join(changes)}.")
+            return user
+        except PyMongoError as e:
+            log_event("ERROR", f"Error updating user: {e}")
+            raise e
+
+    def add_user_organisation(
+        self,
+        user_reference: str,
+        organisation: dict,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        # The $ne guard makes the membership check and the push a single atomic operation
+        query = DatabaseHelper.user_filter(user_reference, expected_version)
+        query["organisations.organisation_name"] = {"$ne": organisation.get("organisation_name")}
+
+        def write(session):
+            user_data = self.collection.find_one_and_update(
+                query,
+                {
+                    "$push": {"organisations": organisation},
+                    "$set": {"updated_at_timestamp": updated_at_timestamp},
+                    "$inc": {"version": 1},
+                },
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+            return User(**user_data) if user_data else None
+
+        try:
+            user = self._write(write, events)
+            if user:
+                log_event("INFO", f"User {user_reference} added to organisation successfully.")
+            return user
+        except PyMongoError as e:
+            log_event("ERROR", f"Error adding user to organisation: {e}")
+            raise e
+
+    def remove_user_organisation(
+        self,
+        user_reference: str,
+        organisation_reference: str,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        query = DatabaseHelper.user_filter(user_reference, expected_version)
+        query["organisations"] = {"$elemMatch": {"organisation_reference": organisation_reference}}
+
+        def write(session):
+            user_data = self.collection.find_one_and_update(
+                query,
+                {
+                    "$pull": {"organisations": {"organisation_reference": organisation_reference}},
+                    "$set": {"updated_at_timestamp": updated_at_timestamp},
+                    "$inc": {"version": 1},
+                },
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+            return User(**user_data) if user_data else None
+
+        try:
+            user = self._write(write, events)
+            if user:
+                log_event("INFO", f"User {user_reference} removed from organisation successfully.")
+            return user
+        except PyMongoError as e:
+            log_event("ERROR", f"Error removing user from organisation: {e}")
+            raise e
+
+    def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        collection = self.collection if use_primary else self.read_collection
         try:
-            user_data = self.collection.find_one({"user_reference": user_reference})
+            user_data = collection.find_one(
+                {"user_reference": user_reference}, DatabaseHelper.user_projection(fields)
+            )
             if user_data:
-                log_event("INFO", f"User with reference: {user_reference} retrieved successfully.")
+                log_event("DEBUG", f"User with reference: {user_reference} retrieved successfully.")
                 return User(**user_data)
             else:
                 log_event("WARNING", f"User with reference: {user_reference} not found.")
@@ -47,11 +189,25 @@ class UserRepository(IUserRepository):
             log_event("ERROR", f"Error retrieving user: {e}")
             raise e
         
+    def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        try:
+            documents = self.read_collection.find(
+                {"user_reference": {"$in": user_references}}, DatabaseHelper.user_projection(fields)
+            )
+            users = {user_data["user_reference"]: User(**user_data) for user_data in documents}
+            log_event("DEBUG", f"{len(users)} of {len(user_references)} users retrieved by reference successfully.")
+            return users
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving users by reference: {e}")
+            raise e
+
     def get_user_by_email(self, email: str) -> User:
         try:
-            user_data = self.collection.find_one({"email": email})
+            user_data = self.read_collection.find_one({"email": email})
             if user_data:
-                log_event("INFO", f"User with email: {email} retrieved successfully.")
+                log_event("DEBUG", f"User with email: {email} retrieved successfully.")
                 return User(**user_data)
             else:
                 log_event("WARNING", f"User with email: {email} not found.")
@@ -60,30 +216,84 @@ class UserRepository(IUserRepository):
             log_event("ERROR", f"Error retrieving user: {e}")
             raise e
 
-    def get_all_users(self, page: int, per_page: int = 10) -> List[User]:
+    def get_all_users(
+        self, page: int, per_page: int = Config.Page_size, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
         try:
-            users = self.collection.find().skip((page - 1) * per_page).limit(per_page)
-            log_event("INFO", "Users retrieved successfully.")
+            users = self.read_collection.find({}, DatabaseHelper.user_projection(fields)).skip((page - 1) * per_page).limit(per_page)
+            log_event("DEBUG", "Users retrieved successfully.")
             return [User(**user_data) for user_data in users]
         except PyMongoError as e:
             log_event("ERROR", f"Error retrieving users: {e}")
             raise e
 
     def get_users_by_query(
-        self, query_params: dict, page: int, per_page: int = 10
+        self,
+        query_params: dict,
+        page: int,
+        per_page: int = Config.Page_size,
+        fields: Optional[Iterable[str]] = None,
     ) -> List[User]:
         try:
             users = (
-                self.collection.find(query_params)
+                self.read_collection.find(query_params, DatabaseHelper.user_projection(fields))
                 .skip((page - 1) * per_page)
                 .limit(per_page)
             )
-            log_event("INFO", "Users retrieved by query successfully.")
+            log_event("DEBUG", "Users retrieved by query successfully.")
             return [User(**user_data) for user_data in users]
         except PyMongoError as e:
             log_event("ERROR", f"Error retrieving users by query: {e}")
             raise e
 
+    def get_users_by_cursor(
+        self,
+        cursor: Optional[str],
+        per_page: int = Config.Page_size,
+        query_params: dict = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> UserPage:
+        try:
+            documents = list(
+                self.read_collection.find(
+                    PaginationHelper.keyset_query(query_params, cursor),
+                    DatabaseHelper.user_projection(fields),
+                )
+                .sort("_id", ASCENDING)
+                .limit(per_page + 1)
+            )
+            log_event("DEBUG", "Users retrieved by cursor successfully.")
+            return UserPage(
+                [User(**user_data) for user_data in documents[:per_page]],
+                PaginationHelper.next_cursor(documents, per_page),
+            )
+        except PyMongoError as e:
+            log_event("ERROR", f"Error retrieving users by cursor: {e}")
+            raise e
+
+    def iter_users(
+        self,
+        export_filter: UserExportFilterDTO,
+        batch_size: int = Config.Export_batch_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[User]:
+        try:
+            documents = (
+                self.read_collection.find(
+                    DatabaseHelper.export_query(export_filter), DatabaseHelper.user_projection(fields)
+                )
+                .sort("_id", ASCENDING)
+                .batch_size(batch_size)
+            )
+            # Closed on exit, so an export stopped early releases its server-side cursor
+            with documents:
+                for user_data in documents:
+                    yield User(**user_data)
+            log_event("DEBUG", "Users exported successfully.")
+        except PyMongoError as e:
+            log_event("ERROR", f"Error exporting users: {e}")
+            raise e
+
     def delete_user(self, user_reference: str) -> bool:
         try:
             result = self.collection.delete_one({"user_reference": user_reference})
@@ -97,7 +307,7 @@ class UserRepository(IUserRepository):
     def soft_delete_user(self, user_reference: str) -> bool:
         try:
             result = self.collection.update_one(
-                {"user_reference": user_reference}, {"$set": {"is_active": False}}
+                {"user_reference": user_reference}, {"$set": {"is_active": False}, "$inc": {"version": 1}}
             )
             if result.modified_count > 0:
                 log_event("INFO", f"User {user_reference} soft deleted successfully.")
@@ -105,3 +315,71 @@ class UserRepository(IUserRepository):
         except PyMongoError as e:
             log_event("ERROR", f"Error soft deleting user: {e}")
             raise e
+
+    def _write(self, write, events: Optional[UserEventBuilder] = None):
+        """
+        Runs a write returning the written user, or None when nothing matched, and stores
+        the events built from that user in the outbox, in the same transaction.
+        """
+        if events is None:
+            return write(None)
+
+        def transaction(session):
+            user = write(session)
+            self._store_events([user] if user else [], events, session)
+            return user
+
+        with self.collection.database.client.start_session() as session:
+            return session.with_transaction(transaction)
+
+    def _create_users_with_events(self, users: List[User], events: UserEventBuilder) -> Dict[int, str]:
+        """
+        Creates a batch and stores its events in one transaction. A conflicting record aborts the
+        whole transaction, so users that already exist are left out up front, and conflicts that
+        only show on insert, within the batch or with concurrent writes, are left out of one retry.
+        """
+        try:
+            existing = list(self.collection.find(DatabaseHelper.conflict_query(users), CONFLICT_PROJECTION))
+            failures = DatabaseHelper.conflict_failures(users, existing)
+            # Indexes into users of the records still to be written
+            pending = [index for index in range(len(users)) if index not in failures]
+            for _ in range(2):
+                if not pending:
+                    break
+                batch = [users[index] for index in pending]
+                try:
+                    self._insert_with_events(batch, events)
+                    pending = []
+                except BulkWriteError as e:
+                    batch_failures = DatabaseHelper.bulk_write_failures(e, batch)
+                    failures.update({pending[index]: message for index, message in batch_failures.items()})
+                    pending = [user_index for index, user_index in enumerate(pending) if index not in batch_failures]
+        except PyMongoError as e:
+            log_event("ERROR", f"Error adding users: {e}")
+            raise e
+        # Still conflicting after the retry: written user by user, each with its own events
+        for index in pending:
+            try:
+                self.create_user(users[index], events)
+            except DomainError as e:
+                failures[index] = str(e)
+            except PyMongoError as e:
+                failures[index] = f"Could not create user - {e}"
+        if failures:
+            log_event("WARNING", f"{len(users) - len(failures)} of {len(users)} users created, {len(failures)} failed.")
+        else:
+            log_event("INFO", f"{len(users)} users created successfully.")
+        return failures
+
+    def _insert_with_events(self, users: List[User], events: UserEventBuilder):
+        def transaction(session):
+            self.collection.insert_many([user.__dict__ for user in users], session=session)
+            self._store_events(users, events, session)
+
+        with self.collection.database.client.start_session() as session:
+            session.with_transaction(transaction)
+
+    def _store_events(self, users: List[User], events: UserEventBuilder, session):
+        messages = [message for user in users for message in events(user)]
+        if messages:
+            self.outbox.insert_many(OutboxHelper.documents(messages), session=session)
@@ -0,0 +1,114 @@
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from app.domain.repository_interfaces.tapi_user_async_repository_interface import (
+    IAsyncUserRepository,
+)
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
+from app.domain.models.tapi_user_model import User
+from app.domain.models.tapi_user_page_model import UserPage
+from app.infrastructure.system.configuration.configuration import Config
+
+
+class UserRepositoryDecorator(IAsyncUserRepository):
+    """
+    Forwards every call to the wrapped repository. Layers such as caching
+    subclass it and override only the methods they change.
+    """
+
+    def __init__(self, user_repository: IAsyncUserRepository):
+        self.user_repository = user_repository
+
+    async def create_user(self, user: User, events: Optional[UserEventBuilder] = None) -> str:
+        return await self.user_repository.create_user(user, events)
+
+    async def create_users(
+        self, users: List[User], events: Optional[UserEventBuilder] = None
+    ) -> Dict[int, str]:
+        return await self.user_repository.create_users(users, events)
+
+    async def update_user(self, user_reference: str, user_data: User) -> str:
+        return await self.user_repository.update_user(user_reference, user_data)
+
+    async def update_user_fields(
+        self,
+        user_reference: str,
+        changes: dict,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        return await self.user_repository.update_user_fields(user_reference, changes, expected_version, events)
+
+    async def add_user_organisation(
+        self,
+        user_reference: str,
+        organisation: dict,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        return await self.user_repository.add_user_organisation(
+            user_reference, organisation, updated_at_timestamp, expected_version, events
+        )
+
+    async def remove_user_organisation(
+        self,
+        user_reference: str,
+        organisation_reference: str,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        return await self.user_repository.remove_user_organisation(
+            user_reference, organisation_reference, updated_at_timestamp, expected_version, events
+        )
+
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        return await self.user_repository.get_user_by_reference(user_reference, fields, use_primary)
+
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        return await self.user_repository.get_users_by_references(user_references, fields)
+
+    async def get_user_by_email(self, email: str) -> User:
+        return await self.user_repository.get_user_by_email(email)
+
+    async def get_all_users(
+        self, page: int, per_page: int = Config.Page_size, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        return await self.user_repository.get_all_users(page, per_page, fields)
+
+    async def get_users_by_query(
+        self,
+        query_params: dict,
+        page: int,
+        per_page: int = Config.Page_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[User]:
+        return await self.user_repository.get_users_by_query(query_params, page, per_page, fields)
+
+    async def get_users_by_cursor(
+        self,
+        cursor: Optional[str],
+        per_page: int = Config.Page_size,
+        query_params: dict = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> UserPage:
+        return await self.user_repository.get_users_by_cursor(cursor, per_page, query_params, fields)
+
+    def iter_users(
+        self,
+        export_filter: UserExportFilterDTO,
+        batch_size: int = Config.Export_batch_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[User]:
+        return self.user_repository.iter_users(export_filter, batch_size, fields)
+
+    async def delete_user(self, user_reference: str) -> bool:
+        return await self.user_repository.delete_user(user_reference)
+
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        return await self.user_repository.soft_delete_user(user_reference)
@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from app.domain.repository_interfaces.tapi_user_async_repository_interface import (
+    IAsyncUserRepository,
+)
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
+from app.domain.models.tapi_user_model import User
+from app.domain.models.tapi_user_page_model import UserPage
+from app.infrastructure.persistence.repository.tapi_user_repository import UserRepository
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
+
+
+class ThreadedUserRepository(IAsyncUserRepository):
+    """
+    Fallback async repository that runs the synchronous pymongo UserRepository
+    in the default thread pool, so blocking calls stay off the event loop.
+    """
+
+    def __init__(self, user_repository: UserRepository):
+        self.user_repository = user_repository
+
+    @TraceHelper.traced
+    async def create_user(self, user: User, events: Optional[UserEventBuilder] = None) -> str:
+        return await asyncio.to_thread(self.user_repository.create_user, user, events)
+
+    @TraceHelper.traced
+    async def create_users(
+        self, users: List[User], events: Optional[UserEventBuilder] = None
+    ) -> Dict[int, str]:
+        return await asyncio.to_thread(self.user_repository.create_users, users, events)
+
+    @TraceHelper.traced
+    async def update_user(self, user_reference: str, user_data: User) -> str:
+        return await asyncio.to_thread(self.user_repository.update_user, user_reference, user_data)
+
+    @TraceHelper.traced
+    async def update_user_fields(
+        self,
+        user_reference: str,
+        changes: dict,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        return await asyncio.to_thread(
+            self.user_repository.update_user_fields, user_reference, changes, expected_version, events
+        )
+
+    @TraceHelper.traced
+    async def add_user_organisation(
+        self,
+        user_reference: str,
+        organisation: dict,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        return await asyncio.to_thread(
+            self.user_repository.add_user_organisation,
+            user_reference,
+            organisation,
+            updated_at_timestamp,
+            expected_version,
+            events,
+        )
+
+    @TraceHelper.traced
+    async def remove_user_organisation(
+        self,
+        user_reference: str,
+        organisation_reference: str,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        return await asyncio.to_thread(
+            self.user_repository.remove_user_organisation,
+            user_reference,
+            organisation_reference,
+            updated_at_timestamp,
+            expected_version,
+            events,
+        )
+
+    @TraceHelper.traced
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        return await asyncio.to_thread(
+            self.user_repository.get_user_by_reference, user_reference, fields, use_primary
+        )
+
+    @TraceHelper.traced
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        return await asyncio.to_thread(self.user_repository.get_users_by_references, user_references, fields)
+
+    @TraceHelper.traced
+    async def get_user_by_email(self, email: str) -> User:
+        return await asyncio.to_thread(self.user_repository.get_user_by_email, email)
+
+    @TraceHelper.traced
+    async def get_all_users(
+        self, page: int, per_page: int = Config.Page_size, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        return await asyncio.to_thread(self.user_repository.get_all_users, page, per_page, fields)
+
+    @TraceHelper.traced
+    async def get_users_by_query(
+        self,
+        query_params: dict,
+        page: int,
+        per_page: int = Config.Page_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[User]:
+        return await asyncio.to_thread(
+            self.user_repository.get_users_by_query, query_params, page, per_page, fields
+        )
+
+    @TraceHelper.traced
+    async def get_users_by_cursor(
+        self,
+        cursor: Optional[str],
+        per_page: int = Config.Page_size,
+        query_params: dict = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> UserPage:
+        return await asyncio.to_thread(
+            self.user_repository.get_users_by_cursor, cursor, per_page, query_params, fields
+        )
+
+    async def iter_users(
+        self,
+        export_filter: UserExportFilterDTO,
+        batch_size: int = Config.Export_batch_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[User]:
+        users = self.user_repository.iter_users(export_filter, batch_size, fields)
+        try:
+            while True:
+                # Pull a whole batch per thread hop rather than one user at a time
+                batch = await asyncio.to_thread(lambda: list(itertools.islice(users, batch_size)))
+                if not batch:
+                    break
+                for user in batch:
+                    yield user
+        finally:
+            # An export the client abandoned closes the cursor now, rather than holding
+            # a pooled connection until garbage collection
+            await asyncio.to_thread(users.close)
+
+    @TraceHelper.traced
+    async def delete_user(self, user_reference: str) -> bool:
+        return await asyncio.to_thread(self.user_repository.delete_user, user_reference)
+
+    @TraceHelper.traced
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        return await asyncio.to_thread(self.user_repository.soft_delete_user, user_reference)
@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Optional
+
+from app.domain.models.tapi_outbox_message_model import UserEventBuilder
+from app.domain.models.tapi_user_model import User
+from app.domain.models.tapi_user_page_model import UserPage
+from app.infrastructure.persistence.repository.tapi_user_repository_decorator import UserRepositoryDecorator
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.metrics.utils.helper.metrics_helper import MetricsHelper
+
+
+class TimedUserRepository(UserRepositoryDecorator):
+    """
+    Records the latency of every call into the database repository, by method.
+    Exports are left untimed, since their duration follows the size of the export.
+    """
+
+    async def create_user(self, user: User, events: Optional[UserEventBuilder] = None) -> str:
+        with MetricsHelper.time_database("create_user"):
+            return await self.user_repository.create_user(user, events)
+
+    async def create_users(
+        self, users: List[User], events: Optional[UserEventBuilder] = None
+    ) -> Dict[int, str]:
+        with MetricsHelper.time_database("create_users"):
+            return await self.user_repository.create_users(users, events)
+
+    async def update_user(self, user_reference: str, user_data: User) -> str:
+        with MetricsHelper.time_database("update_user"):
+            return await self.user_repository.update_user(user_reference, user_data)
+
+    async def update_user_fields(
+        self,
+        user_reference: str,
+        changes: dict,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        with MetricsHelper.time_database("update_user_fields"):
+            return await self.user_repository.update_user_fields(user_reference, changes, expected_version, events)
+
+    async def add_user_organisation(
+        self,
+        user_reference: str,
+        organisation: dict,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        with MetricsHelper.time_database("add_user_organisation"):
+            return await self.user_repository.add_user_organisation(
+                user_reference, organisation, updated_at_timestamp, expected_version, events
+            )
+
+    async def remove_user_organisation(
+        self,
+        user_reference: str,
+        organisation_reference: str,
+        updated_at_timestamp: str,
+        expected_version: Optional[int] = None,
+        events: Optional[UserEventBuilder] = None,
+    ) -> Optional[User]:
+        with MetricsHelper.time_database("remove_user_organisation"):
+            return await self.user_repository.remove_user_organisation(
+                user_reference, organisation_reference, updated_at_timestamp, expected_version, events
+            )
+
+    async def get_user_by_reference(
+        self, user_reference: str, fields: Optional[Iterable[str]] = None, use_primary: bool = False
+    ) -> User:
+        with MetricsHelper.time_database("get_user_by_reference"):
+            return await self.user_repository.get_user_by_reference(user_reference, fields, use_primary)
+
+    async def get_users_by_references(
+        self, user_references: List[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, User]:
+        with MetricsHelper.time_database("get_users_by_references"):
+            return await self.user_repository.get_users_by_references(user_references, fields)
+
+    async def get_user_by_email(self, email: str) -> User:
+        with MetricsHelper.time_database("get_user_by_email"):
+            return await self.user_repository.get_user_by_email(email)
+
+    async def get_all_users(
+        self, page: int, per_page: int = Config.Page_size, fields: Optional[Iterable[str]] = None
+    ) -> List[User]:
+        with MetricsHelper.time_database("get_all_users"):
+            return await self.user_repository.get_all_users(page, per_page, fields)
+
+    async def get_users_by_query(
+        self,
+        query_params: dict,
+        page: int,
+        per_page: int = Config.Page_size,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[User]:
+        with MetricsHelper.time_database("get_users_by_query"):
+            return await self.user_repository.get_users_by_query(query_params, page, per_page, fields)
+
+    async def get_users_by_cursor(
+        self,
+        cursor: Optional[str],
+        per_page: int = Config.Page_size,
+        query_params: dict = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> UserPage:
+        with MetricsHelper.time_database("get_users_by_cursor"):
+            return await self.user_repository.get_users_by_cursor(cursor, per_page, query_params, fields)
+
+    async def delete_user(self, user_reference: str) -> bool:
+        with MetricsHelper.time_database("delete_user"):
+            return await self.user_repository.delete_user(user_reference)
+
+    async def soft_delete_user(self, user_reference: str) -> bool:
+        with MetricsHelper.time_database("soft_delete_user"):
+            return await self.user_repository.soft_delete_user(user_reference)
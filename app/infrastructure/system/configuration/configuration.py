@@ -11,13 +11,100 @@ class Config:
     Name = os.getenv("NAME", "tapi-user-service")
     Log_file = os.getenv("LOG_FILE", "tapi-user-service.log")
     Log_dir = os.getenv("LOG_DIR", "logs")
+    Log_level = os.getenv("LOG_LEVEL", "INFO")
+    # Records wait in this queue for the writer thread; when it is full they are dropped and counted
+    Log_queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    Log_flush_interval = float(os.getenv("LOG_FLUSH_INTERVAL", "1"))
+    # Share of requests whose bodies are logged, overridden per route handler as handler=rate pairs
+    Log_body_sample_rate = float(os.getenv("LOG_BODY_SAMPLE_RATE", "0.1"))
+    Log_body_sample_rates = os.getenv("LOG_BODY_SAMPLE_RATES", "get_all_users=0.01,lookup_users=0.01,export_users=0")
+    Log_body_on_error = os.getenv("LOG_BODY_ON_ERROR", "true").lower() == "true"
+    Log_body_max_bytes = int(os.getenv("LOG_BODY_MAX_BYTES", "1024"))
+    Log_headers = os.getenv("LOG_HEADERS", "Content-Type,Content-Length,User-Agent,X-Correlation-ID,X-Forwarded-For,X-User-Reference")
+    Log_redact_fields = os.getenv("LOG_REDACT_FIELDS", "email,mobile_number,first_name,last_name,full_name")
+    Metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Every worker writes its metrics to files here, which /metrics adds up; cleared when the service starts
+    Metrics_dir = os.getenv("METRICS_DIR", "metrics")
+    Metrics_loop_lag_interval = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+    # Spans are written as OTLP JSON to TRACE_FILE in LOG_DIR, or posted to an OTLP/HTTP collector: file | otlp | off
+    Trace_exporter = os.getenv("TRACE_EXPORTER", "file")
+    Trace_file = os.getenv("TRACE_FILE", "tapi-user-service-traces.jsonl")
+    Trace_otlp_endpoint = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    Trace_otlp_timeout = float(os.getenv("TRACE_OTLP_TIMEOUT", "5"))
+    # Share of new traces that are exported; callers sending a traceparent header decide for their own
+    Trace_sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    Trace_queue_size = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+    Trace_batch_size = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+    Json_serializer = os.getenv("JSON_SERIALIZER", "auto")  # auto | orjson | stdlib
     Launch_url = os.getenv("LAUNCH_URL", "swagger")
     App_name = os.getenv("APP_NAME", "tapi-user-service")
     Db_Type = os.getenv("DB_TYPE", "mongodb")
     Db_url = os.getenv("DB_URL", "mongodb://localhost:27017/tapi")
     Db = os.getenv("DB", "tapi")
+    Db_driver = os.getenv("DB_DRIVER", "motor")  # motor | pymongo
+    # Connection pool settings, applied per worker; they take precedence over the same options in DB_URL
+    Db_max_pool_size = int(os.getenv("DB_MAX_POOL_SIZE", "100"))
+    Db_min_pool_size = int(os.getenv("DB_MIN_POOL_SIZE", "0"))
+    Db_wait_queue_timeout_ms = int(os.getenv("DB_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    Db_server_selection_timeout_ms = int(os.getenv("DB_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+    Db_connect_timeout_ms = int(os.getenv("DB_CONNECT_TIMEOUT_MS", "10000"))
+    Db_socket_timeout_ms = int(os.getenv("DB_SOCKET_TIMEOUT_MS", "10000"))
+    Db_compressors = os.getenv("DB_COMPRESSORS", "zlib")  # comma separated: zstd, snappy, zlib
+    # Read preference for list and lookup queries; writes and read-before-write checks always use the primary
+    Db_read_preference = os.getenv("DB_READ_PREFERENCE", "primary")  # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    Db_max_staleness_seconds = int(os.getenv("DB_MAX_STALENESS_SECONDS", "-1"))  # -1 for no limit, otherwise at least 90
+    Page_size = int(os.getenv("PAGE_SIZE", "10"))
+    Max_page_size = int(os.getenv("MAX_PAGE_SIZE", "100"))
+    Max_lookup_references = int(os.getenv("MAX_LOOKUP_REFERENCES", "500"))
+    Export_batch_size = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    Bulk_import_chunk_size = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+    Bulk_import_max_record_bytes = int(os.getenv("BULK_IMPORT_MAX_RECORD_BYTES", "65536"))
+    Db_transactions = os.getenv("DB_TRANSACTIONS", "false").lower() == "true"  # requires a replica set; required by the outbox
+    Event_delivery = os.getenv("EVENT_DELIVERY", "direct")  # direct | outbox | change_stream
+    Outbox_batch_size = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+    Outbox_poll_interval = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+    Outbox_lease_seconds = int(os.getenv("OUTBOX_LEASE_SECONDS", "30"))
+    Outbox_max_retry_delay = int(os.getenv("OUTBOX_MAX_RETRY_DELAY", "60"))
+    # Used by tapi_user_change_publisher when EVENT_DELIVERY=change_stream
+    Change_stream_batch_size = int(os.getenv("CHANGE_STREAM_BATCH_SIZE", "100"))
+    Change_stream_max_await_ms = int(os.getenv("CHANGE_STREAM_MAX_AWAIT_MS", "1000"))
+    Change_stream_retry_delay = float(os.getenv("CHANGE_STREAM_RETRY_DELAY", "5"))
     Redis_host = os.getenv("REDIS_HOST", "localhost")
     Redis_port = os.getenv("REDIS_PORT", "6379")
+    Redis_max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    Redis_pool_timeout = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+    Redis_connect_timeout = float(os.getenv("REDIS_CONNECT_TIMEOUT", "5"))
+    # Events published within the window are sent in one pipeline round trip
+    Event_batch_window_ms = float(os.getenv("EVENT_BATCH_WINDOW_MS", "2"))
+    Event_batch_max_size = int(os.getenv("EVENT_BATCH_MAX_SIZE", "100"))
+    Event_queue_max_size = int(os.getenv("EVENT_QUEUE_MAX_SIZE", "10000"))
+    Event_close_timeout = float(os.getenv("EVENT_CLOSE_TIMEOUT", "5"))  # seconds to send queued events on shutdown
+    Event_transport = os.getenv("EVENT_TRANSPORT", "pubsub")  # pubsub | streams
+    Event_stream_maxlen = int(os.getenv("EVENT_STREAM_MAXLEN", "100000"))
+    Event_stream_batch_size = int(os.getenv("EVENT_STREAM_BATCH_SIZE", "100"))
+    Event_stream_block_ms = int(os.getenv("EVENT_STREAM_BLOCK_MS", "5000"))
+    # Pending messages idle for longer are taken over from consumers that stopped
+    Event_stream_claim_idle_ms = int(os.getenv("EVENT_STREAM_CLAIM_IDLE_MS", "60000"))
+    Subscriber_workers = int(os.getenv("SUBSCRIBER_WORKERS", "10"))
+    Subscriber_queue_size = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "1000"))
+    Subscriber_handler_timeout = float(os.getenv("SUBSCRIBER_HANDLER_TIMEOUT", "30"))
+    Subscriber_batch_size = int(os.getenv("SUBSCRIBER_BATCH_SIZE", "100"))
+    # Skip events whose event_reference was already handled: redis | local | off
+    Event_dedup = os.getenv("EVENT_DEDUP", "redis")
+    Event_dedup_ttl = int(os.getenv("EVENT_DEDUP_TTL", "86400"))
+    # How long a claim lasts while its handler runs; keep it above SUBSCRIBER_HANDLER_TIMEOUT
+    Event_dedup_processing_ttl = int(os.getenv("EVENT_DEDUP_PROCESSING_TTL", "60"))
+    Event_dedup_local_size = int(os.getenv("EVENT_DEDUP_LOCAL_SIZE", "100000"))
+    Cache_enabled = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    Cache_local_max_size = int(os.getenv("CACHE_LOCAL_MAX_SIZE", "10000"))
+    Cache_local_ttl = float(os.getenv("CACHE_LOCAL_TTL", "5"))
+    Cache_redis_ttl = int(os.getenv("CACHE_REDIS_TTL", "300"))
+    Cache_invalidation_channel = os.getenv("CACHE_INVALIDATION_CHANNEL", "UserCacheInvalidation")
+    User_filter_enabled = os.getenv("USER_FILTER_ENABLED", "true").lower() == "true"
+    User_filter_capacity = int(os.getenv("USER_FILTER_CAPACITY", "1000000"))
+    User_filter_error_rate = float(os.getenv("USER_FILTER_ERROR_RATE", "0.01"))
+    User_filter_check_interval = int(os.getenv("USER_FILTER_CHECK_INTERVAL", "60"))
+    User_filter_rebuild_timeout = int(os.getenv("USER_FILTER_REBUILD_TIMEOUT", "600"))
     Vault_url = os.getenv("VAULT_URL", "http://localhost:8200")
     Vault_token = os.getenv("VAULT_TOKEN", "")
     Vault_path = os.getenv("VAULT_PATH", "")
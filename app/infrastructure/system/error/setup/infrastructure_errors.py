@@ -1,6 +1,6 @@
-import json
 from sanic import HTTPResponse
 from app.domain.shared.shared_errors import CustomError, DomainError, ErrorType
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
 import uuid
 from datetime import datetime
 
@@ -35,6 +35,6 @@ class InfrastructureError:
         }
         return HTTPResponse(
             status=self.status_code,
-            body=json.dumps(error_details),
+            body=SerializerHelper.dumps_bytes(error_details),
             content_type="application/json"
         )
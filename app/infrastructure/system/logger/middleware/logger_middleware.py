@@ -1,4 +1,3 @@
-import json
 import logging
 import time
 from sanic import Request
@@ -14,15 +13,13 @@ def create_header(response, key, value):
     if key not in response.headers:
         response.headers[key] = value
 
-def truncate_response(response):
-    return response[:300]
-
 async def log_middleware(request: Request, response: HTTPResponse):
     if "/swagger" not in request.path:  # Exclude Swagger paths
         log_data = prepare_log_data(request, response)
-        log_message = json.dumps(log_data)
-        logger.info(log_message)
-        create_header(response, "Content-Type", "application/json")
+        # Serialized by the log writer thread
+        logger.log(logging.getLevelName(log_data["level"]), log_data)
+        # Keep the content type of streamed NDJSON and other non-JSON responses
+        create_header(response, "Content-Type", response.content_type or "application/json")
         create_header(response, "X-Correlation-ID", log_data.get("correlation_id", ""))
 
 async def request_middleware(request: Request):
@@ -30,4 +27,6 @@ async def request_middleware(request: Request):
         request.ctx.start_time = time.time()
 
 # Call the register_logger function to set up the logger
-logger_config.register_logger(Config.Log_dir,Config.Log_file)
+logger_config.register_logger(
+    Config.Log_dir, Config.Log_file, Config.Log_level, Config.Log_queue_size, Config.Log_flush_interval
+)
@@ -1,28 +1,182 @@
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Optional
+
+from app.infrastructure.system.logger.utils.data.logger_data import resolve_log_data
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
+
+
+class JsonFormatter(logging.Formatter):
+    # Log data is queued as a dict and only serialized on the writer thread
+    def format(self, record: logging.LogRecord) -> str:
+        if isinstance(record.msg, dict):
+            return SerializerHelper.dumps(resolve_log_data(record.msg))
+        return super().format(record)
+
+
+class BufferedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Writes through the file buffer and only flushes it to disk every flush interval."""
+
+    def __init__(self, *args, flush_interval: float = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush_interval = flush_interval
+        self.next_flush = time.monotonic() + flush_interval
+
+    def flush(self):
+        # Called after every record by StreamHandler.emit
+        if time.monotonic() >= self.next_flush:
+            self.flush_now()
+
+    def flush_now(self):
+        super().flush()
+        self.next_flush = time.monotonic() + self.flush_interval
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queues records for the writer thread, dropping and counting them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the writer thread; QueueHandler would format here, on the caller's thread
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if _pipeline.stopped:
+            # Records logged during shutdown, after the writer thread stopped, are written directly
+            _pipeline.file_handler.handle(record)
+            return
+        # A worker forked from the process that registered the logger has no writer thread yet
+        if _pipeline.pid != os.getpid():
+            _pipeline.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FlushingQueueListener(QueueListener):
+    """Flushes the file when the queue goes idle, and reports records dropped on overflow."""
+
+    def __init__(self, log_queue, queue_handler: DroppingQueueHandler, *handlers, flush_interval: float = 1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self.flush_interval = flush_interval
+        self.reported_dropped = 0
+
+    def enqueue_sentinel(self):
+        # Waits for room, unlike records, so stopping never fails on a full queue
+        self.queue.put(self._sentinel)
+
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.flush_interval)
+            except queue.Empty:
+                self.flush()
+
+    def handle(self, record: logging.LogRecord):
+        super().handle(record)
+        if self.queue_handler.dropped != self.reported_dropped:
+            self.report_dropped()
+
+    def report_dropped(self):
+        dropped = self.queue_handler.dropped - self.reported_dropped
+        self.reported_dropped = self.queue_handler.dropped
+        record = logging.LogRecord(
+            "appLogger", logging.WARNING, __file__, 0,
+            {"level": "WARNING", "message": f"{dropped} log records dropped, the log queue was full"}, None, None,
+        )
+        super().handle(record)
+
+    def flush(self):
+        for handler in self.handlers:
+            if isinstance(handler, BufferedTimedRotatingFileHandler):
+                handler.flush_now()
+            else:
+                handler.flush()
+
+
+class LogPipeline:
+    """
+    appLogger hands records to a bounded queue; a writer thread formats them and appends them
+    to the rotating log file, so disk latency and rotation stay off the event loop.
+    """
+
+    def __init__(self):
+        self.queue_handler: Optional[DroppingQueueHandler] = None
+        self.file_handler: Optional[BufferedTimedRotatingFileHandler] = None
+        self.listener: Optional[FlushingQueueListener] = None
+        self.flush_interval = 1.0
+        self.pid = None
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            # The queue and thread inherited through fork are unusable, so start fresh
+            self.queue_handler.queue = queue.Queue(self.queue_handler.queue.maxsize)
+            self.listener = FlushingQueueListener(
+                self.queue_handler.queue, self.queue_handler, self.file_handler, flush_interval=self.flush_interval
+            )
+            self.listener.start()
+            self.pid = os.getpid()
+
+    def stop(self):
+        """Writes out every queued record and flushes the file."""
+        with self.lock:
+            if self.listener and self.pid == os.getpid():
+                self.listener.stop()
+                self.listener.flush()
+                self.listener = None
+                self.file_handler.flush_interval = 0
+                self.stopped = True
+
+
+_pipeline = LogPipeline()
 
 
 def create_log_folder(log_dir):
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
-def register_logger(log_dir,log_file,level:logging = logging.DEBUG):
+def register_logger(log_dir, log_file, level: str = "INFO", queue_size: int = 10000, flush_interval: float = 1.0):
     create_log_folder(log_dir)
-    
+
     log_file = os.path.join(log_dir, log_file)
-    
-    handler = TimedRotatingFileHandler(
+
+    handler = BufferedTimedRotatingFileHandler(
         filename=log_file,
         when='midnight',
         interval=1,
         backupCount=30,
-        encoding='utf-8'
+        encoding='utf-8',
+        flush_interval=flush_interval,
     )
-    
-    formatter = logging.Formatter('%(message)s')
-    handler.setFormatter(formatter)
-    
+    handler.setFormatter(JsonFormatter('%(message)s'))
+
+    _pipeline.file_handler = handler
+    _pipeline.queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    _pipeline.flush_interval = flush_interval
+    _pipeline.start()
+
     logger = logging.getLogger('appLogger')
-    logger.addHandler(handler)
-    logger.setLevel(level)  # Setting the log level as required
+    logger.addHandler(_pipeline.queue_handler)
+    logger.setLevel(level.upper())  # Setting the log level as required
+
+def stop_logger():
+    _pipeline.stop()
+
+def log_stats() -> dict:
+    return {"dropped": _pipeline.queue_handler.dropped if _pipeline.queue_handler else 0}
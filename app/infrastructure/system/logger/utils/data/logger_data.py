@@ -1,5 +1,5 @@
-
 import socket
+import sys
 import time
 import traceback
 from typing import Optional
@@ -9,56 +9,112 @@ from sanic import Request
 from sanic.response import HTTPResponse
 from app.domain.shared.shared_utils import get_server_ip
 from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.log_capture_helper import LogCaptureHelper
+from app.infrastructure.system.tracing.utils.data.trace_data import current_span
+
+
+# Resolved once at startup rather than for every log record
+SERVER_HOST = socket.gethostname()
+SERVER_IP = get_server_ip()
+
+
+class Lazy:
+    """
+    A log field that is only formatted when the record is written, on the log writer thread.
+    Its arguments must be copies taken on the event loop, never the request or response.
+    """
+
+    __slots__ = ("function", "args")
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def __call__(self):
+        return self.function(*self.args)
+
+    def __repr__(self):
+        return repr(self())
+
 
+def resolve_log_data(log_data: dict) -> dict:
+    return {key: value() if isinstance(value, Lazy) else value for key, value in log_data.items()}
 
-def prepare_log_data(request: Optional[Request] = None, response: Optional[HTTPResponse] = None, 
+
+def format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def new_log_id() -> str:
+    return str(uuid.uuid4())
+
+
+def format_exception(error: traceback.TracebackException) -> str:
+    return "".join(error.format())
+
+
+def prepare_log_data(request: Optional[Request] = None, response: Optional[HTTPResponse] = None,
                      level: str = "INFO", message: str = "", extra_data: dict = None) -> dict:
     if response and response.status >= 400:
         level = "ERROR"
-    
+
     # Determine the current time as the end time for calculating response time
     end_time = time.time()
 
-    # Default start time - only used if no request context is available
-    # For non-HTTP operations, this results in a minimal, but non-zero, response time
-    default_start_time = end_time - 0.001  # Default to 1 millisecond before end_time
-
-    # Calculate response time based on available context
-    response_time = str(end_time - (request.ctx.start_time if request and hasattr(request.ctx, 'start_time') else default_start_time))
+    # Without a request context, a minimal but non-zero response time of 1 millisecond is reported
+    request_duration = end_time - request.ctx.start_time if request and hasattr(request.ctx, 'start_time') else 0
+    response_time = str(request_duration if request else 0.001)
 
+    # Bodies are logged for sampled requests and errors only (LogCaptureHelper)
+    capture_bodies = bool(request) and LogCaptureHelper.capture_bodies(request, level)
+    request_body = (
+        Lazy(LogCaptureHelper.body, *LogCaptureHelper.body_sample(request.body))
+        if capture_bodies and request.body else ""
+    )
+    response_body = (
+        Lazy(LogCaptureHelper.body, *LogCaptureHelper.body_sample(response.body))
+        if capture_bodies and response and response.body else ""
+    )
+    span = current_span.get()
 
-    # Basic log data structure
+    # Basic log data structure; Lazy fields are formatted when the record is written
     log_data = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": Lazy(format_timestamp, end_time),
         "level": level,
         "method": request.method if request else "EVENT",
         "status_code": str(response.status) if response else "000",
-        "path": str(request.url) if request else "127.0.0.1",
+        "path": LogCaptureHelper.path(request) if request else "127.0.0.1",
         "forwarded_for": request.headers.get("X-Forwarded-For", "") if request else "",
-        "response_time": str(time.time() - request.ctx.start_time) if request else response_time,
+        "response_time": response_time,
         "version": "1",
         "correlation_id": request.headers.get("X-Correlation-ID", "") if request else "",
         "app_name": Config.App_name,
-        "application_host": request.host if request else socket.gethostname(),
-        "ip": request.ip if request else get_server_ip(),
-        "computerName": socket.gethostname(),
-        "logId": str(uuid.uuid4()),
+        "application_host": request.host if request else SERVER_HOST,
+        "ip": request.ip if request else SERVER_IP,
+        "computerName": SERVER_HOST,
+        "logId": Lazy(new_log_id),
+        "trace_id": span.trace_id if span else "",
+        "span_id": span.span_id if span else "",
         "message": message,
         # Additional details can be filled with provided or default values
-        "requestHeaders": dict(request.headers) if request else {},
-        "requestQuery": request.query_args if request else {},
-        "requestBody": request.body.decode("utf-8") if request and request.body else "",
-        "responseHeaders": dict(response.headers) if response else {},
-        "responseBody": response.body.decode("utf-8") if response and response.body else "",
-        "requestDuration": time.time() - request.ctx.start_time if request else 0,
+        "requestHeaders": LogCaptureHelper.headers(request.headers) if request else {},
+        "requestQuery": LogCaptureHelper.query(request.query_args) if request else {},
+        "requestBody": request_body,
+        "responseHeaders": LogCaptureHelper.headers(response.headers) if response else {},
+        "responseBody": response_body,
+        "requestDuration": request_duration,
         "error": "",
-        "stack": "", 
+        "stack": "",
     }
 
-    # If level is ERROR, include error details and stack trace
+    # If level is ERROR, include error details, and the stack trace when an exception is being handled
     if level == "ERROR":
-        log_data["error"] = log_data["responseBody"]
-        log_data["stack"] = traceback.format_exc()
+        log_data["error"] = response_body
+        error = sys.exc_info()[1]
+        if error is not None:
+            # The stack is summarised now, so the record keeps no frames, and formatted later
+            summary = traceback.TracebackException.from_exception(error, lookup_lines=False)
+            log_data["stack"] = Lazy(format_exception, summary)
 
     # Include any additional data provided
     if extra_data:
@@ -0,0 +1,87 @@
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sanic import Request
+
+from app.infrastructure.system.configuration.configuration import Config
+
+
+REDACTED = "***"
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _sample_rates(value: str) -> Dict[str, float]:
+    # "get_all_users=0.01,export_users=0": handler name and the share of its requests whose bodies are logged
+    rates = {}
+    for item in _split(value):
+        handler, _, rate = item.partition("=")
+        rates[handler.strip()] = float(rate)
+    return rates
+
+
+def _redaction_pattern(fields: List[str]) -> Optional[re.Pattern]:
+    if not fields:
+        return None
+    # A JSON key and its value; a string value cut off by truncation runs to the end of the body
+    return re.compile(
+        r'("(?:%s)"\s*:\s*)("[^"\\]*(?:\\.[^"\\]*)*(?:"|$)|[^\s,}\]]+)' % "|".join(re.escape(field) for field in fields)
+    )
+
+
+class LogCaptureHelper:
+    """
+    Decides how much of a request and its response goes into the log.
+
+    Bodies are logged for a sampled share of requests, set per route handler, and always for
+    errors. They are cut to LOG_BODY_MAX_BYTES. Only allowlisted headers are kept, and the values
+    of PII fields are redacted from bodies and query parameters.
+    """
+
+    sample_rate = Config.Log_body_sample_rate
+    sample_rates = _sample_rates(Config.Log_body_sample_rates)
+    header_allowlist = _split(Config.Log_headers)
+    redact_fields = set(_split(Config.Log_redact_fields))
+    redaction_pattern = _redaction_pattern(_split(Config.Log_redact_fields))
+
+    @staticmethod
+    def capture_bodies(request: Request, level: str) -> bool:
+        if level == "ERROR" and Config.Log_body_on_error:
+            return True
+        handler = (request.name or "").rsplit(".", 1)[-1]
+        rate = LogCaptureHelper.sample_rates.get(handler, LogCaptureHelper.sample_rate)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    @staticmethod
+    def headers(headers) -> dict:
+        return {name: headers[name] for name in LogCaptureHelper.header_allowlist if name in headers}
+
+    @staticmethod
+    def body_sample(body: bytes) -> Tuple[bytes, int]:
+        """The part of a body that is logged, copied so the record does not hold on to the body, and its full size."""
+        return bytes(body[:Config.Log_body_max_bytes]), len(body)
+
+    @staticmethod
+    def body(sample: bytes, size: int) -> str:
+        text = sample.decode("utf-8", errors="replace")
+        if LogCaptureHelper.redaction_pattern:
+            text = LogCaptureHelper.redaction_pattern.sub(r'\1"%s"' % REDACTED, text)
+        if size > Config.Log_body_max_bytes:
+            text += f"... [truncated, {size} bytes]"
+        return text
+
+    @staticmethod
+    def query(query_args: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        return [
+            (name, REDACTED if name in LogCaptureHelper.redact_fields else value) for name, value in query_args
+        ]
+
+    @staticmethod
+    def path(request: Request) -> str:
+        # The query string goes to requestQuery, redacted, when it holds PII
+        if any(name in LogCaptureHelper.redact_fields for name, _ in request.query_args):
+            return request.url.split("?", 1)[0]
+        return request.url
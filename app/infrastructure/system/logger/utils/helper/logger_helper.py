@@ -1,4 +1,3 @@
-import json
 import logging
 from typing import Optional
 from sanic import Request
@@ -7,6 +6,10 @@ from app.infrastructure.system.logger.utils.data.logger_data import prepare_log_
 logger = logging.getLogger('appLogger')
 
 def log_event(level: str, message: str, request: Optional[Request] = None, extra_data: dict = None):
+    level_number = logging.getLevelName(level.upper())
+    # Skip building the record entirely for levels that are filtered out
+    if not logger.isEnabledFor(level_number):
+        return
     log_data = prepare_log_data(request, level=level, message=message, extra_data=extra_data)
-    log_message = json.dumps(log_data)
-    logger.log(logging.getLevelName(level.upper()), log_message)
+    # Serialized by the log writer thread
+    logger.log(level_number, log_data)
@@ -0,0 +1,30 @@
+import time
+from sanic import Request
+from sanic.response import HTTPResponse
+import app.infrastructure.system.metrics.setup.metrics_setup as metrics
+from app.infrastructure.system.metrics.utils.helper.metrics_helper import MetricsHelper
+
+
+async def metrics_request_middleware(request: Request):
+    request.ctx.metrics_start_time = time.perf_counter()
+    metrics.http_requests_in_flight.inc()
+
+async def metrics_response_middleware(request: Request, response: HTTPResponse):
+    started = getattr(request.ctx, "metrics_start_time", None)
+    if started is None:
+        return
+    # Counted once, even if another middleware returns a different response
+    request.ctx.metrics_start_time = None
+    status = str(response.status)
+    stream_callbacks = getattr(request.ctx, "stream_callbacks", None)
+    if stream_callbacks is not None:
+        # A streamed response has only started, so it is timed to when the handler finishes
+        stream_callbacks.append(lambda: observe_request(request, started, status))
+    else:
+        observe_request(request, started, status)
+
+def observe_request(request: Request, started: float, status: str):
+    metrics.http_requests_in_flight.dec()
+    metrics.http_request_duration.labels(
+        MetricsHelper.route_name(request), request.method, status
+    ).observe(time.perf_counter() - started)
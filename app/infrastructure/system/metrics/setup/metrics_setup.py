@@ -0,0 +1,85 @@
+import glob
+import os
+
+from app.infrastructure.system.configuration.configuration import Config
+
+# prometheus_client chooses between in-memory and file-backed values when it is imported,
+# so the directory shared by the Sanic workers has to be set first
+if Config.Metrics_enabled:
+    os.makedirs(Config.Metrics_dir, exist_ok=True)
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.abspath(Config.Metrics_dir))
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Buckets in seconds, from sub-millisecond cache and database hits up to timeouts
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time taken to handle HTTP requests, by route handler, method and status.",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled.",
+    multiprocess_mode="livesum",
+)
+database_operation_duration = Histogram(
+    "database_operation_duration_seconds",
+    "Time taken by user repository database calls, by repository method.",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+redis_publish_duration = Histogram(
+    "redis_publish_duration_seconds",
+    "Time taken to send events to Redis, per round trip, by publisher.",
+    ["publisher"],
+    buckets=LATENCY_BUCKETS,
+)
+redis_publish_errors = Counter(
+    "redis_publish_errors",
+    "Round trips to Redis that failed to send events, by publisher.",
+    ["publisher"],
+)
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a timer, sampled every METRICS_LOOP_LAG_INTERVAL.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+def is_multiprocess() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def clear_metrics():
+    """Removes the files left by the workers of a previous run. Call once, before workers start."""
+    if is_multiprocess():
+        for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+            os.remove(path)
+
+
+def mark_worker_stopped():
+    # Drops the live gauges of this worker from the totals
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def collect_metrics() -> bytes:
+    """The metrics of every worker, in the Prometheus text format."""
+    if not is_multiprocess():
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
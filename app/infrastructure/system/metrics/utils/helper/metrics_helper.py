@@ -0,0 +1,46 @@
+import asyncio
+import time
+from contextlib import contextmanager
+
+from sanic import Request
+
+from app.infrastructure.system.configuration.configuration import Config
+import app.infrastructure.system.metrics.setup.metrics_setup as metrics
+
+
+class MetricsHelper:
+    @staticmethod
+    def route_name(request: Request) -> str:
+        # Handler names keep the label set small; requests that matched no route share one label
+        return (request.name or "unmatched").rsplit(".", 1)[-1]
+
+    @staticmethod
+    @contextmanager
+    def time_database(method: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics.database_operation_duration.labels(method).observe(time.perf_counter() - started)
+
+    @staticmethod
+    @contextmanager
+    def time_publish(publisher: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            metrics.redis_publish_errors.labels(publisher).inc()
+            raise
+        finally:
+            metrics.redis_publish_duration.labels(publisher).observe(time.perf_counter() - started)
+
+    @staticmethod
+    async def monitor_loop_lag():
+        """Background task recording how much later than scheduled the event loop resumes a sleep."""
+        loop = asyncio.get_running_loop()
+        interval = Config.Metrics_loop_lag_interval
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            metrics.event_loop_lag.observe(max(loop.time() - started - interval, 0))
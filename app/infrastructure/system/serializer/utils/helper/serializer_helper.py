@@ -0,0 +1,60 @@
+import json
+from typing import Any
+
+from app.infrastructure.system.configuration.configuration import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any):
+    # Error details built from a plain message hold a set, and log extras may hold arbitrary objects
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _orjson_dumps_bytes(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _orjson_dumps(obj: Any) -> str:
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, default=_default, separators=(",", ":"))
+
+
+def _stdlib_dumps_bytes(obj: Any) -> bytes:
+    return _stdlib_dumps(obj).encode()
+
+
+def _backend() -> str:
+    if Config.Json_serializer == "stdlib":
+        return "stdlib"
+    if orjson is None:
+        if Config.Json_serializer == "orjson":
+            raise ImportError("JSON_SERIALIZER is orjson but orjson is not installed")
+        return "stdlib"
+    return "orjson"
+
+
+class SerializerHelper:
+    """
+    The JSON encoder shared by responses, events, error responses and logs: orjson when it
+    is installed, the standard library otherwise. Both write compact JSON and encode sets as lists.
+    """
+
+    backend = _backend()
+
+    if backend == "orjson":
+        dumps = staticmethod(_orjson_dumps)
+        dumps_bytes = staticmethod(_orjson_dumps_bytes)
+        loads = staticmethod(orjson.loads)
+    else:
+        dumps = staticmethod(_stdlib_dumps)
+        dumps_bytes = staticmethod(_stdlib_dumps_bytes)
+        loads = staticmethod(json.loads)
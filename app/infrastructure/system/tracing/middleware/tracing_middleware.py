@@ -0,0 +1,30 @@
+from sanic import Request
+from sanic.response import HTTPResponse
+from app.infrastructure.system.tracing.utils.data.trace_data import Span, current_span
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
+
+
+async def tracing_request_middleware(request: Request):
+    span = TraceHelper.start_request(request)
+    request.ctx.trace_span = span
+    # The controller, use case, repository and publisher spans of the request become its children
+    request.ctx.trace_token = current_span.set(span)
+
+async def tracing_response_middleware(request: Request, response: HTTPResponse):
+    span = getattr(request.ctx, "trace_span", None)
+    if span is None:
+        return
+    # Ended once, even if another middleware returns a different response
+    request.ctx.trace_span = None
+    response.headers["traceparent"] = f"00-{span.trace_id}-{span.span_id}-{'01' if span.sampled else '00'}"
+    status = response.status
+    stream_callbacks = getattr(request.ctx, "stream_callbacks", None)
+    if stream_callbacks is not None:
+        # A streamed response has only started; the handler still runs under the request span
+        stream_callbacks.append(lambda: end_request_trace(request, span, status))
+    else:
+        end_request_trace(request, span, status)
+
+def end_request_trace(request: Request, span: Span, status: int):
+    current_span.reset(request.ctx.trace_token)
+    TraceHelper.end_request(span, status)
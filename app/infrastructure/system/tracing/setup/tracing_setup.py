@@ -0,0 +1,126 @@
+import os
+import queue
+import threading
+from typing import List, Optional
+
+import requests
+
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
+from app.infrastructure.system.tracing.utils.data.trace_data import Span
+
+
+class SpanExporter:
+    """
+    Hands finished spans to a writer thread, which sends them in batches as OTLP JSON:
+    appended to a JSON lines file (TRACE_EXPORTER=file) or posted to an OTLP/HTTP
+    collector (TRACE_EXPORTER=otlp). Spans are dropped and counted when the queue is full.
+    """
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(Config.Trace_queue_size)
+        self.thread: Optional[threading.Thread] = None
+        self.file = None
+        self.pid = None
+        self.stopped = False
+        self.lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def export(self, span: Span):
+        if self.stopped:
+            return
+        # Started per process, so forked workers get their own writer thread
+        if self.pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(Config.Trace_queue_size)
+            if Config.Trace_exporter == "file":
+                os.makedirs(Config.Log_dir, exist_ok=True)
+                self.file = open(os.path.join(Config.Log_dir, Config.Trace_file), "a", encoding="utf-8")
+            self.thread = threading.Thread(target=self.run, name="span-exporter", daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+
+    def run(self):
+        while True:
+            # Whatever else has queued up by the time a span arrives goes out with it
+            span = self.queue.get()
+            stopping = span is None
+            batch = [] if stopping else [span]
+            while not stopping and len(batch) < Config.Trace_batch_size:
+                try:
+                    span = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                else:
+                    batch.append(span)
+            if batch:
+                self.write(batch)
+            if stopping:
+                return
+
+    def write(self, spans: List[Span]):
+        body = SerializerHelper.dumps(self.to_otlp(spans))
+        try:
+            if Config.Trace_exporter == "otlp":
+                response = requests.post(
+                    Config.Trace_otlp_endpoint,
+                    data=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=Config.Trace_otlp_timeout,
+                )
+                response.raise_for_status()
+            else:
+                self.file.write(body + "\n")
+                self.file.flush()
+            self.exported += len(spans)
+        except (OSError, requests.RequestException) as e:
+            self.errors += 1
+            log_event("WARNING", f"Could not export {len(spans)} trace spans: {e}")
+
+    @staticmethod
+    def to_otlp(spans: List[Span]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": Config.App_name}}]},
+                "scopeSpans": [{"scope": {"name": Config.App_name}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }
+
+    def stop(self):
+        """Exports every queued span and stops the writer thread."""
+        with self.lock:
+            if self.thread and self.pid == os.getpid():
+                self.queue.put(None)
+                self.thread.join()
+                self.thread = None
+                self.stopped = True
+                if self.file:
+                    self.file.close()
+                    self.file = None
+                log_event(
+                    "INFO", f"Exported {self.exported} trace spans; {self.dropped} dropped, {self.errors} failed exports"
+                )
+
+
+_exporter = SpanExporter()
+
+
+def export_span(span: Span):
+    _exporter.export(span)
+
+def stop_tracing():
+    _exporter.stop()
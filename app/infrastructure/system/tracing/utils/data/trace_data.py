@@ -0,0 +1,80 @@
+import random
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+def new_trace_id() -> str:
+    return "%032x" % random.getrandbits(128)
+
+
+def new_span_id() -> str:
+    return "%016x" % random.getrandbits(64)
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        # OTLP JSON encodes 64 bit integers as strings
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Span:
+    """A timed operation within a trace. Children take the trace, sampling and correlation ID of their parent."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id", "sampled", "correlation_id",
+        "kind", "attributes", "start_time", "end_time", "status", "status_message",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], sampled: bool,
+                 correlation_id: str = "", kind: int = SPAN_KIND_INTERNAL, attributes: dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.correlation_id = correlation_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def fail(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = str(error)
+        self.attributes["exception.type"] = type(error).__name__
+
+    def end(self):
+        self.end_time = time.time_ns()
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+# The span of the code running in the current task or thread
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
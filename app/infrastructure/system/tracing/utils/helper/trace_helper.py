@@ -0,0 +1,109 @@
+import inspect
+import random
+import re
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional, Tuple
+
+from sanic import Request
+
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.tracing.setup.tracing_setup import export_span
+from app.infrastructure.system.tracing.utils.data.trace_data import (
+    SPAN_KIND_INTERNAL,
+    SPAN_KIND_SERVER,
+    STATUS_ERROR,
+    Span,
+    current_span,
+    new_trace_id,
+)
+
+# W3C trace context: version, trace ID, parent span ID and flags
+TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class TraceHelper:
+    enabled = Config.Trace_exporter != "off"
+
+    @staticmethod
+    def sampled() -> bool:
+        return random.random() < Config.Trace_sample_rate
+
+    @staticmethod
+    @contextmanager
+    def start_span(name: str, attributes: dict = None, kind: int = SPAN_KIND_INTERNAL):
+        """Times the enclosed code as a child of the current span, or as a new trace when there is none."""
+        parent = current_span.get()
+        if parent:
+            span = Span(name, parent.trace_id, parent.span_id, parent.sampled, parent.correlation_id, kind, attributes)
+        else:
+            span = Span(name, new_trace_id(), None, TraceHelper.sampled(), kind=kind, attributes=attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            current_span.reset(token)
+            span.end()
+            if span.sampled:
+                export_span(span)
+
+    @staticmethod
+    def traced(function):
+        """Runs a coroutine method in a span named after its class and method."""
+        if not TraceHelper.enabled or not inspect.iscoroutinefunction(function):
+            return function
+        name = function.__qualname__
+
+        @wraps(function)
+        async def traced_function(*args, **kwargs):
+            parent = current_span.get()
+            # Spans of a trace that is not sampled are never exported, so none are made
+            if parent is not None and not parent.sampled:
+                return await function(*args, **kwargs)
+            with TraceHelper.start_span(name):
+                return await function(*args, **kwargs)
+
+        return traced_function
+
+    @staticmethod
+    def request_trace(request: Request, correlation_id: str) -> Tuple[str, Optional[str], bool]:
+        """The trace ID, parent span ID and sampling decision for an incoming request."""
+        # Continue the trace of a caller that sends W3C trace context
+        match = TRACEPARENT.match(request.headers.get("traceparent", ""))
+        if match:
+            return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+        # A correlation ID in UUID or trace ID form is the trace ID, so traces can be found by it
+        candidate = correlation_id.replace("-", "").lower()
+        trace_id = candidate if TRACE_ID.match(candidate) and candidate.strip("0") else new_trace_id()
+        return trace_id, None, TraceHelper.sampled()
+
+    @staticmethod
+    def start_request(request: Request) -> Span:
+        correlation_id = request.headers.get("X-Correlation-ID", "")
+        trace_id, parent_span_id, sampled = TraceHelper.request_trace(request, correlation_id)
+        route = f"/{request.route.path}" if request.route else "unmatched"
+        span = Span(
+            f"{request.method} {route}",
+            trace_id,
+            parent_span_id,
+            sampled,
+            correlation_id,
+            SPAN_KIND_SERVER,
+            {"http.method": request.method, "http.route": route, "http.target": request.path},
+        )
+        if correlation_id:
+            span.attributes["correlation_id"] = correlation_id
+        return span
+
+    @staticmethod
+    def end_request(span: Span, status: int):
+        span.attributes["http.status_code"] = status
+        if status >= 500:
+            span.status = STATUS_ERROR
+        span.end()
+        if span.sampled:
+            export_span(span)
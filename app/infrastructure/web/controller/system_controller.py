@@ -0,0 +1,54 @@
+from sanic import HTTPResponse, Request
+from sanic.response import json, raw
+from sanic_ext import openapi
+
+from app.infrastructure.cache.user.user_cache import UserCache
+from app.infrastructure.cache.user.user_existence_filter import UserExistenceFilter
+import app.infrastructure.system.metrics.setup.metrics_setup as metrics
+
+
+class SystemController:
+    def __init__(self, user_cache: UserCache = None, user_filter: UserExistenceFilter = None):
+        self.user_cache = user_cache
+        self.user_filter = user_filter
+
+    @openapi.summary("User cache statistics")
+    @openapi.description(
+        "Returns the hit, miss and eviction counters of this worker's user cache, "
+        "and how many lookups the user existence filter answered without the database. "
+        "Counters are per worker and reset on restart."
+    )
+    @openapi.response(
+        200,
+        {
+            "application/json": {
+                "example": {
+                    "enabled": True,
+                    "local": {"size": 120, "max_size": 10000, "hits": 950, "misses": 50, "evictions": 0, "expirations": 12},
+                    "redis": {"hits": 40, "misses": 10, "errors": 0},
+                    "invalidations": 3,
+                    "remote_invalidations": 7,
+                    "existence_filter": {"enabled": True, "degraded": False, "definite_negatives": 25, "possible_positives": 1000, "errors": 0},
+                }
+            }
+        },
+        description="Cache statistics for the worker that served the request.",
+    )
+    async def cache_stats(self, request: Request) -> HTTPResponse:
+        stats = {"enabled": False}
+        if self.user_cache:
+            stats = {"enabled": True, **self.user_cache.stats()}
+        stats["existence_filter"] = {"enabled": False}
+        if self.user_filter:
+            stats["existence_filter"] = {"enabled": True, **self.user_filter.stats()}
+        return json(stats, status=200)
+
+    @openapi.summary("Prometheus metrics")
+    @openapi.description(
+        "Request latency by route and status, in-flight requests, database latency by repository method, "
+        "Redis publish latency and event loop lag, in the Prometheus text format. "
+        "Totals cover every worker of this instance."
+    )
+    @openapi.response(200, {"text/plain": str}, description="Metrics in the Prometheus text exposition format.")
+    async def metrics(self, request: Request) -> HTTPResponse:
+        return raw(metrics.collect_metrics(), status=200, content_type=metrics.CONTENT_TYPE_LATEST)
@@ -14,6 +14,10 @@ from sanic_ext import openapi
 from app.infrastructure.system.error.setup.infrastructure_errors import (
     InfrastructureError,
 )
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.web.utils.helper.ndjson_helper import FLUSH_BYTES, NdjsonHelper
+from app.infrastructure.web.utils.helper.request_helper import RequestHelper
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
 
 
 class UserController:
@@ -77,6 +81,7 @@ class UserController:
     )
     @openapi.tag("Users")
     @openapi.operation("create_user")
+    @TraceHelper.traced
     async def create_user(self, request: Request) -> HTTPResponse:
         """
         Sanic endpoint to create a new user.
@@ -96,7 +101,7 @@ class UserController:
 
             # Assuming the request JSON directly maps to UserCreateDTO's structure.
             user_dto = UserCreateDTO(**data)
-            user_ref_id = self.user_application_service.create_user(
+            user_ref_id = await self.user_application_service.create_user(
                 user_dto
             )
             return json({"user_reference": user_ref_id}, status=201)
@@ -111,6 +116,77 @@ class UserController:
                 ErrorType.InternalError, f"Unexpected error - {str(e)}"
             ).to_response()
 
+    @openapi.summary("Bulk import users")
+    @openapi.description(
+        "Creates users from a streamed NDJSON body, one `{\"user_reference\": ..., \"email\": ...}` object per line. "
+        "Records are validated like `POST /users` and written in chunks. The response is streamed NDJSON with one "
+        "result per record, keyed by its line number, followed by a summary line."
+    )
+    @openapi.body(
+        {
+            "application/x-ndjson": {
+                "example": '{"user_reference": "123e4567-e89b-12d3-a456-426614174000", "email": "mike.doe@example.com"}\n'
+                '{"user_reference": "0b6d7c3e-8f38-4d47-9a38-1c2d8f3b7e11", "email": "jane.doe@example.com"}\n'
+            }
+        },
+        description="The users to create, one JSON object per line.",
+        required=True,
+    )
+    @openapi.response(
+        200,
+        {
+            "application/x-ndjson": {
+                "example": '{"line": 1, "user_reference": "123e4567-e89b-12d3-a456-426614174000", "status": "created"}\n'
+                '{"line": 2, "user_reference": "0b6d7c3e-8f38-4d47-9a38-1c2d8f3b7e11", "status": "failed", "errors": ["A user with the email jane.doe@example.com already exists."]}\n'
+                '{"summary": {"received": 2, "created": 1, "failed": 1}}\n'
+            }
+        },
+        description="Per-record import results followed by a summary.",
+    )
+    @openapi.tag("Users")
+    @openapi.operation("import_users")
+    @TraceHelper.traced
+    async def import_users(self, request: Request) -> HTTPResponse:
+        response = await request.respond(content_type="application/x-ndjson", status=200)
+        summary = {"received": 0, "created": 0, "failed": 0}
+        batch = []  # (line number, UserCreateDTO) pairs awaiting a bulk write
+
+        try:
+            async for line_number, record in NdjsonHelper.read_records(
+                request, Config.Bulk_import_max_record_bytes
+            ):
+                summary["received"] += 1
+                try:
+                    data = NdjsonHelper.parse_record(record, Config.Bulk_import_max_record_bytes)
+                    validator.validate(data)
+                    batch.append((line_number, UserCreateDTO(**data)))
+                except (DomainError, TypeError) as error:
+                    errors = NdjsonHelper.error_details(error) if isinstance(error, DomainError) else [f"Invalid record - {str(error)}"]
+                    summary["failed"] += 1
+                    await response.send(NdjsonHelper.encode({"line": line_number, "status": "failed", "errors": errors}))
+
+                if len(batch) >= Config.Bulk_import_chunk_size:
+                    await self._import_batch(batch, response, summary)
+                    batch = []
+
+            await self._import_batch(batch, response, summary)
+        except Exception as e:
+            # The status line has already been sent, so report the failure in the stream
+            await response.send(
+                NdjsonHelper.encode({"status": "aborted", "errors": [f"Unexpected error - {str(e)}"]})
+            )
+
+        await response.send(NdjsonHelper.encode({"summary": summary}))
+        await response.eof()
+
+    async def _import_batch(self, batch, response, summary):
+        if not batch:
+            return
+        results = await self.user_application_service.import_users([user_dto for _, user_dto in batch])
+        for (line_number, _), result in zip(batch, results):
+            summary[result["status"]] += 1
+            await response.send(NdjsonHelper.encode({"line": line_number, **result}))
+
     @openapi.summary("Update an existing user")
     @openapi.description(
         "Updates user details for the user with the specified user reference. All fields are optional, but at least one must be provided."
@@ -178,8 +254,25 @@ class UserController:
         },
         description="Internal server error.",
     )
+    @openapi.parameter("If-Match", str, location="header", description="Only apply the change if the user is still at this version, as returned in the `ETag` header, e.g. `\"3\"`.")
+    @openapi.response(
+        412,
+        {
+            "application/json": {
+                "example": {
+                    "error_reference": "unique-error-id-24680",
+                    "error_type": "PRECONDITION_FAILED",
+                    "errors": {"message": ["User 123e4567-e89b-12d3-a456-426614174000 is at version 4, not the expected version 3."]},
+                    "status_code": 412,
+                    "timestamp": "2024-03-25T10:30:00.000Z",
+                }
+            }
+        },
+        description="The user was modified since the version given in `If-Match`.",
+    )
     @openapi.tag("Users")
     @openapi.operation("update_user")
+    @TraceHelper.traced
     async def update_user(self, request: Request, user_reference: str) -> HTTPResponse:
         try:
             current_user_reference = request.headers.get("X-User-Reference")
@@ -193,8 +286,9 @@ class UserController:
             validator.validate(data)
 
             user_dto = UserUpdateDTO(**data)
-            user_ref_id = self.user_application_service.update_user(
-                user_reference, user_dto, current_user_reference
+            user_ref_id = await self.user_application_service.update_user(
+                user_reference, user_dto, current_user_reference,
+                RequestHelper.get_expected_version(request),
             )
             return json({"user_reference": user_ref_id}, status=200)
 
@@ -264,8 +358,25 @@ class UserController:
         },
         description="Internal server error.",
     )
+    @openapi.parameter("If-Match", str, location="header", description="Only apply the change if the user is still at this version, as returned in the `ETag` header, e.g. `\"3\"`.")
+    @openapi.response(
+        412,
+        {
+            "application/json": {
+                "example": {
+                    "error_reference": "unique-error-id-24680",
+                    "error_type": "PRECONDITION_FAILED",
+                    "errors": {"message": ["User 123e4567-e89b-12d3-a456-426614174000 is at version 4, not the expected version 3."]},
+                    "status_code": 412,
+                    "timestamp": "2024-03-25T10:30:00.000Z",
+                }
+            }
+        },
+        description="The user was modified since the version given in `If-Match`.",
+    )
     @openapi.tag("Users")
     @openapi.operation("add_user_to_organisation")
+    @TraceHelper.traced
     async def add_user_to_organisation(self, request: Request, user_reference: str) -> HTTPResponse:
         try:
             current_user_reference = request.headers.get("X-User-Reference")
@@ -279,8 +390,9 @@ class UserController:
             validator.validate(data)
 
             user_organisation_dto = UserAddOrganisationDTO(**data)
-            user_ref_id = self.user_application_service.add_user_to_organisation(
-                user_reference, user_organisation_dto, current_user_reference
+            user_ref_id = await self.user_application_service.add_user_to_organisation(
+                user_reference, user_organisation_dto, current_user_reference,
+                RequestHelper.get_expected_version(request),
             )
             return json({"user_reference": user_ref_id}, status=200)
 
@@ -349,8 +461,25 @@ class UserController:
         },
         description="Internal server error.",
     )
+    @openapi.parameter("If-Match", str, location="header", description="Only apply the change if the user is still at this version, as returned in the `ETag` header, e.g. `\"3\"`.")
+    @openapi.response(
+        412,
+        {
+            "application/json": {
+                "example": {
+                    "error_reference": "unique-error-id-24680",
+                    "error_type": "PRECONDITION_FAILED",
+                    "errors": {"message": ["User 123e4567-e89b-12d3-a456-426614174000 is at version 4, not the expected version 3."]},
+                    "status_code": 412,
+                    "timestamp": "2024-03-25T10:30:00.000Z",
+                }
+            }
+        },
+        description="The user was modified since the version given in `If-Match`.",
+    )
     @openapi.tag("Users")
     @openapi.operation("remove_user_from_organisation")
+    @TraceHelper.traced
     async def remove_user_from_organisation(self, request: Request, user_reference: str) -> HTTPResponse:
         try:
             current_user_reference = request.headers.get("X-User-Reference")
@@ -364,8 +493,9 @@ class UserController:
             validator.validate(data)
 
             user_organisation_dto = UserRemoveOrganisationDTO(**data)
-            user_ref_id = self.user_application_service.remove_user_from_organisation(
-                user_reference, user_organisation_dto, current_user_reference
+            user_ref_id = await self.user_application_service.remove_user_from_organisation(
+                user_reference, user_organisation_dto, current_user_reference,
+                RequestHelper.get_expected_version(request),
             )
             return json({"user_reference": user_ref_id}, status=200)
 
@@ -387,6 +517,7 @@ class UserController:
     )
     @openapi.tag("Users")
     @openapi.operation("get_user_by_reference")
+    @openapi.parameter("fields", str, location="query", description="Comma separated list of fields to return, e.g. `first_name,email`. Defaults to all fields.")
     @openapi.response(
         200,
         {
@@ -450,12 +581,16 @@ class UserController:
         },
         description="Internal server error.",
     )
+    @TraceHelper.traced
     async def get_user_by_reference(
         self, request: Request, user_reference: str
     ) -> HTTPResponse:
         try:
-            user = self.user_application_service.get_user_by_reference(user_reference)
-            return json(user.to_json(), status=200)
+            fields = RequestHelper.get_fields(request)
+            user = await self.user_application_service.get_user_by_reference(user_reference, fields)
+            return json(
+                user.to_json(fields), status=200, headers=RequestHelper.version_headers(user)
+            )
         except DomainError as domain_error:
             # Handle domain-specific errors with proper HTTP response
             return InfrastructureError.from_domain_error(domain_error).to_response()
@@ -471,6 +606,7 @@ class UserController:
     @openapi.tag("Users")
     @openapi.operation("get_current_user_by_reference")
     @openapi.parameter("X-User-Reference", str, location="header", description="The unique reference ID of the current user.", required=True)
+    @openapi.parameter("fields", str, location="query", description="Comma separated list of fields to return, e.g. `first_name,email`. Defaults to all fields.")
     @openapi.response(
         200,
         {
@@ -534,6 +670,7 @@ class UserController:
         },
         description="Internal server error.",
     )
+    @TraceHelper.traced
     async def get_current_user(self, request: Request) -> HTTPResponse:
         try:
             current_user_reference = request.headers.get("X-User-Reference")
@@ -542,10 +679,91 @@ class UserController:
                     ErrorType.NotFound, "No current user"
                 ).to_response()
 
-            user = self.user_application_service.get_user_by_reference(
-                current_user_reference
+            fields = RequestHelper.get_fields(request)
+            user = await self.user_application_service.get_user_by_reference(
+                current_user_reference, fields
+            )
+            return json(
+                user.to_json(fields), status=200, headers=RequestHelper.version_headers(user)
+            )
+        except DomainError as domain_error:
+            # Handle domain-specific errors with proper HTTP response
+            return InfrastructureError.from_domain_error(domain_error).to_response()
+
+        except Exception as e:
+            # Catch-all for any other unexpected errors
+            return InfrastructureError(
+                ErrorType.InternalError, f"Unexpected error - {str(e)}"
+            ).to_response()
+
+    @openapi.summary("Look up many users")
+    @openapi.description(
+        "Retrieves the users with the given reference IDs in a single request. "
+        "References that do not exist are listed under `missing` rather than failing the request."
+    )
+    @openapi.tag("Users")
+    @openapi.operation("lookup_users")
+    @openapi.parameter("fields", str, location="query", description="Comma separated list of fields to return, e.g. `first_name,email`. Defaults to all fields.")
+    @openapi.body(
+        {
+            "application/json": {
+                "example": {
+                    "user_references": [
+                        "01ef9f9c-6671-406f-a388-93c9d1c7ca78",
+                        "123e4567-e89b-12d3-a456-426614174000"
+                    ]
+                }
+            }
+        },
+        description="The reference IDs of the users to retrieve.",
+        required=True,
+    )
+    @openapi.response(
+        200,
+        {
+            "application/json": {
+                "example": {
+                    "users": {
+                        "01ef9f9c-6671-406f-a388-93c9d1c7ca78": {
+                            "user_reference": "01ef9f9c-6671-406f-a388-93c9d1c7ca78",
+                            "full_name": "Felix Dowin",
+                            "email": "felix.doe@example.com"
+                        }
+                    },
+                    "missing": ["123e4567-e89b-12d3-a456-426614174000"]
+                }
+            }
+        },
+        description="The users found, keyed by reference, and the references that were not found.",
+    )
+    @openapi.response(
+        400,
+        {
+            "application/json": {
+                "example": {
+                    "error_reference": "unique-error-id-67890",
+                    "error_type": "BAD_REQUEST_ERROR",
+                    "errors": {"message": ["user_references must be a non-empty list."]},
+                    "status_code": 400,
+                    "timestamp": "2024-03-25T10:30:00.000Z",
+                }
+            }
+        },
+        description="The request body is invalid.",
+    )
+    @TraceHelper.traced
+    async def lookup_users(self, request: Request) -> HTTPResponse:
+        try:
+            fields = RequestHelper.get_fields(request)
+            user_references = RequestHelper.get_user_references(request)
+            users = await self.user_application_service.get_users_by_references(user_references, fields)
+            return json(
+                {
+                    "users": {user_reference: user.to_json(fields) for user_reference, user in users.items()},
+                    "missing": [user_reference for user_reference in dict.fromkeys(user_references) if user_reference not in users],
+                },
+                status=200,
             )
-            return json(user.to_json(), status=200)
         except DomainError as domain_error:
             # Handle domain-specific errors with proper HTTP response
             return InfrastructureError.from_domain_error(domain_error).to_response()
@@ -558,10 +776,16 @@ class UserController:
 
     @openapi.summary("List all users")
     @openapi.description(
-        "Returns a list of all users, paginated by the specified page number."
+        "Returns a list of all users, paginated by the specified page number. "
+        "With `pagination=cursor` the page number is ignored and the listing is keyset paginated: "
+        "the response carries the users and a `next` token to pass back as `cursor` for the following page."
     )
     @openapi.tag("Users")
     @openapi.operation("get_all_users")
+    @openapi.parameter("pagination", str, location="query", description="Pagination mode, either `offset` (default) or `cursor`.")
+    @openapi.parameter("cursor", str, location="query", description="The `next` token of the previous page when using cursor pagination.")
+    @openapi.parameter("per_page", int, location="query", description="The number of users per page.")
+    @openapi.parameter("fields", str, location="query", description="Comma separated list of fields to return, e.g. `first_name,email`. Defaults to all fields.")
     @openapi.response(
         200,
         {
@@ -612,10 +836,19 @@ class UserController:
         },
         description="Internal server error.",
     )
+    @TraceHelper.traced
     async def get_all_users(self, request: Request, page: int) -> HTTPResponse:
         try:
-            users = self.user_application_service.get_all_users(page)
-            users_json = [user.to_json() for user in users]
+            per_page = RequestHelper.get_page_size(request)
+            fields = RequestHelper.get_fields(request)
+            if request.args.get("pagination") == "cursor":
+                user_page = await self.user_application_service.get_users_by_cursor(
+                    request.args.get("cursor"), per_page, fields
+                )
+                return json(user_page.to_json(fields), status=200)
+
+            users = await self.user_application_service.get_all_users(page, per_page, fields)
+            users_json = [user.to_json(fields) for user in users]
             return json(users_json, status=200)
         except DomainError as domain_error:
             # Handle domain-specific errors with proper HTTP response
@@ -627,6 +860,56 @@ class UserController:
                 ErrorType.InternalError, f"Unexpected error - {str(e)}"
             ).to_response()
 
+    @openapi.summary("Export users")
+    @openapi.description(
+        "Streams every user matching the optional filters as NDJSON, one user per line. "
+        "Users are read from the database in batches, so memory use does not grow with the size of the export."
+    )
+    @openapi.tag("Users")
+    @openapi.operation("export_users")
+    @openapi.parameter("active", str, location="query", description="`true` to export only active users, `false` for only inactive ones.")
+    @openapi.parameter("organisation", str, location="query", description="Only export members of the organisation with this reference.")
+    @openapi.parameter("updated_since", str, location="query", description="Only export users updated at or after this ISO 8601 timestamp.")
+    @openapi.parameter("fields", str, location="query", description="Comma separated list of fields to return, e.g. `first_name,email`. Defaults to all fields.")
+    @openapi.response(
+        200,
+        {
+            "application/x-ndjson": {
+                "example": '{"user_reference": "01ef9f9c-6671-406f-a388-93c9d1c7ca78", "email": "felix.doe@example.com"}\n'
+            }
+        },
+        description="The matching users, one JSON object per line.",
+    )
+    @TraceHelper.traced
+    async def export_users(self, request: Request) -> HTTPResponse:
+        try:
+            fields = RequestHelper.get_fields(request)
+            export_filter = RequestHelper.get_export_filter(request)
+        except DomainError as domain_error:
+            # Handle domain-specific errors with proper HTTP response
+            return InfrastructureError.from_domain_error(domain_error).to_response()
+
+        response = await request.respond(content_type="application/x-ndjson", status=200)
+        buffer = []
+        buffered_bytes = 0
+        try:
+            async for user in self.user_application_service.export_users(export_filter, fields):
+                line = NdjsonHelper.encode(user.to_json(fields))
+                buffer.append(line)
+                buffered_bytes += len(line)
+                if buffered_bytes >= FLUSH_BYTES:
+                    await response.send("".join(buffer))
+                    buffer = []
+                    buffered_bytes = 0
+            if buffer:
+                await response.send("".join(buffer))
+        except Exception as e:
+            # The status line has already been sent, so report the failure in the stream
+            await response.send(
+                NdjsonHelper.encode({"status": "aborted", "errors": [f"Unexpected error - {str(e)}"]})
+            )
+        await response.eof()
+
     @openapi.summary("Delete a user")
     @openapi.description("Deletes a specific user by their unique reference ID.")
     @openapi.tag("Users")
@@ -670,9 +953,10 @@ class UserController:
         },
         description="Internal server error.",
     )
+    @TraceHelper.traced
     async def delete_user(self, request: Request, user_reference: str) -> HTTPResponse:
         try:
-            result = self.user_application_service.delete_user(user_reference)
+            result = await self.user_application_service.delete_user(user_reference)
             if result:
                 return json({"message": "User deleted successfully"}, status=200)
             else:
@@ -1,11 +1,30 @@
 from sanic import Sanic
+from app.infrastructure.system.configuration.configuration import Config
 from app.infrastructure.system.logger.middleware.logger_middleware import (
     log_middleware,
     request_middleware,
 )
+from app.infrastructure.system.metrics.middleware.metrics_middleware import (
+    metrics_request_middleware,
+    metrics_response_middleware,
+)
+from app.infrastructure.system.tracing.middleware.tracing_middleware import (
+    tracing_request_middleware,
+    tracing_response_middleware,
+)
+from app.infrastructure.system.tracing.utils.helper.trace_helper import TraceHelper
 
 
 def setup_middleware(app: Sanic):
     """Registers middleware functions with the Sanic app."""
+    if Config.Metrics_enabled:
+        app.request_middleware.append(metrics_request_middleware)
+        # Response middleware runs in reverse order of registration, so this runs last
+        # and the measured time includes logging the request
+        app.response_middleware.append(metrics_response_middleware)
+    if TraceHelper.enabled:
+        app.request_middleware.append(tracing_request_middleware)
+        # Runs after log_middleware, so request log records carry the trace ID
+        app.response_middleware.append(tracing_response_middleware)
     app.request_middleware.append(request_middleware)
     app.response_middleware.append(log_middleware)
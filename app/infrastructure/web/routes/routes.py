@@ -1,9 +1,50 @@
+from functools import wraps
+
 from sanic import Sanic
 
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.web.controller.system_controller import SystemController
 from app.infrastructure.web.controller.tapi_user_controller import UserController
 
 
-def setup_routes(app: Sanic, user_controller: UserController):
+def _documented(wrapper, handler):
+    # sanic-ext finds the OpenAPI documentation of a bound method through __func__
+    wrapper.__func__ = getattr(handler, "__func__", handler)
+    return wrapper
+
+
+def streaming(handler):
+    """Sanic flags streaming handlers with an attribute, which bound methods cannot carry."""
+
+    @wraps(handler)
+    async def stream_handler(request, *args, **kwargs):
+        return await handler(request, *args, **kwargs)
+
+    return _documented(stream_handler, handler)
+
+
+def streamed_response(handler):
+    """
+    For handlers that respond with request.respond() and carry on sending. Response middleware
+    runs as the response starts, so it leaves whatever must wait for the end of the response
+    in request.ctx.stream_callbacks, which are run here once the handler has finished.
+    """
+
+    @wraps(handler)
+    async def streamed_response_handler(request, *args, **kwargs):
+        request.ctx.stream_callbacks = []
+        try:
+            return await handler(request, *args, **kwargs)
+        finally:
+            # Middleware for a response returned instead of streamed runs after this, as usual
+            callbacks, request.ctx.stream_callbacks = request.ctx.stream_callbacks, None
+            for callback in callbacks:
+                callback()
+
+    return _documented(streamed_response_handler, handler)
+
+
+def setup_routes(app: Sanic, user_controller: UserController, system_controller: SystemController):
     """
     Registers all endpoint routes for the application.
 
@@ -12,6 +53,12 @@ def setup_routes(app: Sanic, user_controller: UserController):
 
     # User routes
     app.add_route(user_controller.create_user, "/users", methods=["POST"])
+    app.add_route(
+        streamed_response(streaming(user_controller.import_users)), "/users/import", methods=["POST"], stream=True
+    )
+    app.add_route(
+        user_controller.lookup_users, "/users/lookup", methods=["POST"]
+    )
     app.add_route(
         user_controller.update_user, "/users/<user_reference:str>", methods=["POST"]
     )
@@ -26,6 +73,9 @@ def setup_routes(app: Sanic, user_controller: UserController):
         "/users/<user_reference:str>",
         methods=["GET"],
     )
+    app.add_route(
+        streamed_response(user_controller.export_users), "/users/export", methods=["GET"]
+    )
     app.add_route(
         user_controller.get_all_users, "/users/<page:int>", methods=["GET"]
     )  # Adjusted to not include <page:int> for simplicity
@@ -33,3 +83,8 @@ def setup_routes(app: Sanic, user_controller: UserController):
         user_controller.delete_user, "/users/<user_reference:str>", methods=["DELETE"]
     )
     app.add_route(user_controller.get_current_user, "/users/current", methods=["GET"])
+
+    # System routes
+    app.add_route(system_controller.cache_stats, "/system/cache", methods=["GET"])
+    if Config.Metrics_enabled:
+        app.add_route(system_controller.metrics, "/metrics", methods=["GET"])
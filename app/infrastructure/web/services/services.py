@@ -1,22 +1,42 @@
 
 import sys
-from app.infrastructure.persistence.database.setup.database_setup import Database
+from app.infrastructure.persistence.database.setup.database_setup import AsyncDatabase, Database
+from app.infrastructure.persistence.database.setup.index_setup import IndexManager
 from app.infrastructure.system.configuration.configuration import Config
-from app.infrastructure.messaging.redis.setup.redis_setup import Redis
+from app.infrastructure.messaging.redis.setup.redis_setup import AsyncRedis, Redis
+from app.infrastructure.cache.user.user_cache import UserCache
+from app.infrastructure.cache.user.user_existence_filter import UserExistenceFilter
 from app.infrastructure.secrets.vault.setup.vault_setup import Vault
 from app.infrastructure.secrets.vault.utils.helper.vault_helper import VaultHelper
 from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
 import app.domain.shared.shared_messages as message
 from app.application.application_services.tapi_user_application_service import UserApplicationService
 from app.application.use_cases.use_case_interactor.tapi_user_interactor import UserUseCase
+from app.infrastructure.messaging.publisher.redis_batch_publisher import RedisBatchPublisher
 from app.infrastructure.messaging.publisher.tapi_user_event_publisher import RedisEventPublisher
+from app.infrastructure.messaging.relay.outbox_relay import OutboxRelay
+from app.infrastructure.persistence.repository.tapi_outbox_async_repository import AsyncOutboxRepository
+from app.infrastructure.persistence.repository.tapi_outbox_repository import OutboxRepository
+from app.infrastructure.persistence.repository.tapi_outbox_threaded_repository import ThreadedOutboxRepository
+from app.infrastructure.persistence.repository.tapi_user_async_repository import AsyncUserRepository
+from app.infrastructure.persistence.repository.tapi_user_cached_repository import CachedUserRepository
+from app.infrastructure.persistence.repository.tapi_user_filtered_repository import FilteredUserRepository
 from app.infrastructure.persistence.repository.tapi_user_repository import UserRepository
+from app.infrastructure.persistence.repository.tapi_user_threaded_repository import ThreadedUserRepository
+from app.infrastructure.persistence.repository.tapi_user_timed_repository import TimedUserRepository
+from app.infrastructure.web.controller.system_controller import SystemController
 from app.infrastructure.web.controller.tapi_user_controller import UserController
 
 async def initialize_database():
-    database =  Database.connect()
+    if Config.Db_driver == "pymongo":
+        # Fallback: synchronous driver, calls are offloaded to worker threads
+        database = Database.connect()
+    else:
+        database = AsyncDatabase.connect()
     print(message.DatabaseMessage.CONNECTION_SUCCESS)
     log_event("INFO", message.DatabaseMessage.CONNECTION_SUCCESS)
+    await IndexManager.ensure_indexes(database)
+    print(message.DatabaseMessage.INDEXES_ENSURED)
     return database
 
 async def initialize_redis():
@@ -32,39 +52,100 @@ async def initialize_vault():
     print(message.VaultMessage.CONNECTION_SUCCESS)
     log_event("INFO", message.VaultMessage.CONNECTION_SUCCESS)
     return vault
-async def initialize_services():
+
+async def initialize_cache():
+    if not Config.Cache_enabled:
+        return None
+    try:
+        redis = await AsyncRedis.connect()
+        log_event("INFO", f"{Config.App_name} user cache is set up.")
+        return UserCache(redis)
+    except Exception as e:
+        print(f"Error during {Config.App_name} startup: {e}")
+        log_event("ERROR", f"Error during {Config.App_name} startup: {e}")
+        sys.exit(1)
+
+async def initialize_existence_filter():
+    if not Config.User_filter_enabled:
+        return None
+    try:
+        redis = await AsyncRedis.connect()
+        log_event("INFO", f"{Config.App_name} user existence filter is set up.")
+        return UserExistenceFilter(redis)
+    except Exception as e:
+        print(f"Error during {Config.App_name} startup: {e}")
+        log_event("ERROR", f"Error during {Config.App_name} startup: {e}")
+        sys.exit(1)
+
+async def initialize_event_publisher():
+    try:
+        redis = await AsyncRedis.connect()
+        log_event("INFO", f"{Config.App_name} event publisher is set up.")
+        return RedisBatchPublisher(redis)
+    except Exception as e:
+        print(f"Error during {Config.App_name} startup: {e}")
+        log_event("ERROR", f"Error during {Config.App_name} startup: {e}")
+        sys.exit(1)
+
+def initialize_repository(database, user_cache=None, user_filter=None):
+    if Config.Db_driver == "pymongo":
+        user_repository = ThreadedUserRepository(UserRepository(database))
+    else:
+        user_repository = AsyncUserRepository(database)
+    if Config.Metrics_enabled:
+        # Innermost, so only database calls are timed
+        user_repository = TimedUserRepository(user_repository)
+    if user_cache:
+        user_repository = CachedUserRepository(user_repository, user_cache)
+    if user_filter:
+        # Outermost, so definite misses skip the cache as well as the database
+        user_repository = FilteredUserRepository(user_repository, user_filter)
+    return user_repository
+
+def initialize_outbox_relay():
+    if Config.Event_delivery != "outbox":
+        return None
+    # Reuses the connection pool opened by initialize_database
+    if Config.Db_driver == "pymongo":
+        outbox_repository = ThreadedOutboxRepository(OutboxRepository(Database.connect()))
+    else:
+        outbox_repository = AsyncOutboxRepository(AsyncDatabase.connect())
+    return OutboxRelay(outbox_repository)
+
+async def initialize_services(batch_publisher, user_cache=None, user_filter=None):
     try:
         # Assuming these are properly defined and return awaitables
         database = await initialize_database()
-        redis = await initialize_redis()
+        await initialize_redis()  # Used by the outbox relay
         await initialize_vault()  # If this doesn't return anything, no need to assign it to a variable
 
         # Assuming the below constructors don't await, but the objects are used in async contexts later
-        redis_event_publisher = RedisEventPublisher(redis)
-        user_repository = UserRepository(database)
+        redis_event_publisher = RedisEventPublisher(batch_publisher)
+        user_repository = initialize_repository(database, user_cache, user_filter)
         user_use_case = UserUseCase(user_repository, redis_event_publisher)
         user_application_service = UserApplicationService(user_use_case)
 
         print(f"{Config.App_name} services are set up.")
         log_event("INFO", f"{Config.App_name} services are set up.")
 
-        return user_application_service  # Ensure this is returned
+        return user_application_service, user_repository  # Ensure this is returned
     except Exception as e:
         print(f"Error during {Config.App_name} startup: {e}")
         log_event("ERROR", f"Error during {Config.App_name} startup: {e}")
         sys.exit(1)
 
-async def initialize_controller(user_application_service):
+async def initialize_controller(user_application_service, user_cache=None, user_filter=None):
     try:
         # Ensure user_application_service is awaited if necessary and not None
         print(f"{Config.App_name} controllers are starting...")
         log_event("INFO", f"{Config.App_name} controllers are starting...")
 
         user_controller = UserController(user_application_service)
+        system_controller = SystemController(user_cache, user_filter)
 
         print(f"{Config.App_name} controllers are set up.")
         log_event("INFO", f"{Config.App_name} controllers are set up.")
-        return user_controller  # Ensure this is returned
+        return user_controller, system_controller  # Ensure this is returned
     except Exception as e:
         print(f"Error during {Config.App_name} startup: {e}")
         log_event("ERROR", f"Error during {Config.App_name} startup: {e}")
@@ -0,0 +1,78 @@
+from typing import AsyncIterator, Optional, Tuple
+
+from sanic import Request
+
+from app.domain.shared.shared_errors import DomainError, ErrorType
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
+
+
+# Streamed NDJSON output is sent in chunks of roughly this size
+FLUSH_BYTES = 64 * 1024
+
+
+class NdjsonHelper:
+    @staticmethod
+    async def read_records(
+        request: Request, max_record_bytes: int
+    ) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+        """
+        Yields (line_number, record) for every non-blank line of a streamed NDJSON body.
+        Only the current partial line is buffered, so memory stays flat regardless of
+        the upload size. Lines longer than max_record_bytes are yielded as None.
+        """
+        buffer = bytearray()
+        oversized = False
+        line_number = 0
+
+        while True:
+            chunk = await request.stream.read()
+            if chunk is None:
+                break
+            start = 0
+            while True:
+                end = chunk.find(b"\n", start)
+                piece = chunk[start:] if end == -1 else chunk[start:end]
+                if not oversized:
+                    buffer += piece
+                    if len(buffer) > max_record_bytes:
+                        oversized = True
+                        buffer.clear()
+                if end == -1:
+                    break
+                line_number += 1
+                if oversized:
+                    yield line_number, None
+                elif buffer.strip():
+                    yield line_number, bytes(buffer)
+                buffer.clear()
+                oversized = False
+                start = end + 1
+
+        # The last record does not need a trailing newline
+        if oversized:
+            yield line_number + 1, None
+        elif buffer.strip():
+            yield line_number + 1, bytes(buffer)
+
+    @staticmethod
+    def parse_record(record: Optional[bytes], max_record_bytes: int) -> dict:
+        if record is None:
+            raise DomainError(
+                ErrorType.PayloadTooLarge, f"Record exceeds the maximum size of {max_record_bytes} bytes."
+            )
+        try:
+            data = SerializerHelper.loads(record)
+        except ValueError:
+            raise DomainError(ErrorType.BadRequestError, "Record is not valid JSON.")
+        if not isinstance(data, dict):
+            raise DomainError(ErrorType.BadRequestError, "Record must be a JSON object.")
+        return data
+
+    @staticmethod
+    def error_details(domain_error: DomainError):
+        # Validation errors raised with a plain message are stored as a set
+        return list(domain_error.errors) if isinstance(domain_error.errors, set) else domain_error.errors
+
+    @staticmethod
+    def encode(data: dict) -> str:
+        return SerializerHelper.dumps(data) + "\n"
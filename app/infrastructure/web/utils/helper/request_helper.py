@@ -0,0 +1,79 @@
+from typing import List, Optional
+
+from sanic import Request
+
+from app.domain.dtos.tapi_user_export import UserExportFilterDTO
+from app.domain.models.tapi_user_model import User
+from app.domain.shared.shared_errors import DomainError, ErrorType
+import app.domain.shared.shared_validation as validator
+from app.infrastructure.system.configuration.configuration import Config
+
+
+class RequestHelper:
+    @staticmethod
+    def get_page_size(request: Request) -> int:
+        per_page = request.args.get("per_page")
+        if per_page is None:
+            return Config.Page_size
+        try:
+            per_page = int(per_page)
+        except ValueError:
+            raise DomainError(ErrorType.BadRequestError, "per_page must be an integer.")
+        if not 1 <= per_page <= Config.Max_page_size:
+            raise DomainError(
+                ErrorType.BadRequestError,
+                f"per_page must be between 1 and {Config.Max_page_size}.",
+            )
+        return per_page
+
+    @staticmethod
+    def get_fields(request: Request) -> Optional[List[str]]:
+        """Parses the comma separated `fields` query parameter into a sparse fieldset."""
+        fields = request.args.get("fields")
+        if not fields:
+            return None
+        fields = [field.strip() for field in fields.split(",") if field.strip()]
+        validator.validate_fields(fields, User.FIELDS)
+        return fields
+
+    @staticmethod
+    def get_user_references(request: Request) -> List[str]:
+        data = request.json or {}
+        user_references = data.get("user_references") if isinstance(data, dict) else None
+        if not isinstance(user_references, list) or not user_references:
+            raise DomainError(ErrorType.BadRequestError, "user_references must be a non-empty list.")
+        if not all(isinstance(user_reference, str) for user_reference in user_references):
+            raise DomainError(ErrorType.BadRequestError, "user_references must only contain strings.")
+        if len(user_references) > Config.Max_lookup_references:
+            raise DomainError(
+                ErrorType.PayloadTooLarge,
+                f"At most {Config.Max_lookup_references} user references can be looked up at once.",
+            )
+        return user_references
+
+    @staticmethod
+    def get_export_filter(request: Request) -> UserExportFilterDTO:
+        active = request.args.get("active")
+        if active is not None and active.lower() not in ("true", "false"):
+            raise DomainError(ErrorType.BadRequestError, "active must be true or false.")
+        return UserExportFilterDTO(
+            is_active=None if active is None else active.lower() == "true",
+            organisation_reference=request.args.get("organisation"),
+            updated_since=request.args.get("updated_since"),
+        )
+
+    @staticmethod
+    def get_expected_version(request: Request) -> Optional[int]:
+        """Parses the If-Match header into the user version a write is conditional on."""
+        if_match = (request.headers.get("If-Match") or "").strip()
+        if not if_match or if_match == "*":
+            return None
+        tag = if_match[2:] if if_match.startswith("W/") else if_match
+        tag = tag.strip('"')
+        if not tag.isdigit():
+            raise DomainError(ErrorType.BadRequestError, 'If-Match must be a user version, e.g. "3".')
+        return int(tag)
+
+    @staticmethod
+    def version_headers(user: User) -> dict:
+        return {"ETag": f'"{user.version}"'}
@@ -0,0 +1,101 @@
+"""
+Per-record cost of building and writing a log record.
+
+Reports, for the common kinds of log line, the time spent on the calling thread
+(prepare_log_data, which runs on the event loop) and on the log writer thread
+(formatting the record to JSON), and the size of the written line. Run from the
+repository root:
+
+    python -m benchmarks.log_record_benchmark
+"""
+import logging
+import time
+from types import SimpleNamespace
+
+from sanic.compat import Header
+
+from app.infrastructure.system.logger.setup.logger_setup import JsonFormatter
+from app.infrastructure.system.logger.utils.data.logger_data import prepare_log_data
+
+ITERATIONS = 20000
+
+REQUEST_BODY = b'{"firstName": "Ada", "lastName": "Lovelace", "email": "ada@example.com"}' * 10
+RESPONSE_BODY = b'{"user_reference": "0d5a3c6e", "organisations": []}' * 10
+# A page of users, as returned by the list endpoint
+LIST_BODY = b'[' + b','.join(
+    b'{"user_reference": "0d5a3c6e-%d", "first_name": "Ada", "last_name": "Lovelace", '
+    b'"email": "ada%d@example.com", "mobile_number": "+447000000000", "organisations": []}' % (i, i)
+    for i in range(100)
+) + b']'
+
+
+def make_request(handler="create_user"):
+    return SimpleNamespace(
+        name=f"tapi-user-service.{handler}",
+        method="POST",
+        url="http://localhost:8000/users",
+        host="localhost:8000",
+        ip="10.0.0.1",
+        headers=Header({
+            "Content-Type": "application/json",
+            "X-Correlation-ID": "b7c0a4b2",
+            "X-Forwarded-For": "192.168.1.10",
+            "User-Agent": "benchmark",
+        }),
+        query_args=[],
+        body=REQUEST_BODY,
+        ctx=SimpleNamespace(start_time=time.time()),
+    )
+
+
+def make_response(status, body=RESPONSE_BODY):
+    return SimpleNamespace(status=status, headers=Header({"Content-Type": "application/json"}), body=body)
+
+
+def event_info():
+    return prepare_log_data(level="INFO", message="User created")
+
+
+def event_error():
+    try:
+        raise ValueError("User not found")
+    except ValueError:
+        return prepare_log_data(level="ERROR", message="User not found")
+
+
+def request_ok(request=make_request(), response=make_response(200)):
+    return prepare_log_data(request, response)
+
+
+def request_not_found(request=make_request(), response=make_response(404)):
+    return prepare_log_data(request, response)
+
+
+def request_list(request=make_request("get_all_users"), response=make_response(200, LIST_BODY)):
+    return prepare_log_data(request, response)
+
+
+def measure(build):
+    formatter = JsonFormatter("%(message)s")
+    records = []
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        records.append(build())
+    caller = time.perf_counter() - started
+    size = 0
+    started = time.perf_counter()
+    for log_data in records:
+        size += len(formatter.format(logging.LogRecord("appLogger", logging.INFO, __file__, 0, log_data, None, None)))
+    writer = time.perf_counter() - started
+    return caller / ITERATIONS * 1e6, writer / ITERATIONS * 1e6, size / ITERATIONS
+
+
+def main():
+    print(f"{'record':<20}{'caller us':>12}{'writer us':>12}{'bytes':>10}")
+    for build in (event_info, event_error, request_ok, request_not_found, request_list):
+        caller, writer, size = measure(build)
+        print(f"{build.__name__:<20}{caller:>12.2f}{writer:>12.2f}{size:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
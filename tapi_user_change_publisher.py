@@ -0,0 +1,34 @@
+import asyncio
+import sys
+
+from app.infrastructure.messaging.change_stream.user_change_publisher import UserChangePublisher
+from app.infrastructure.messaging.redis.setup.redis_setup import Redis
+from app.infrastructure.persistence.database.setup.database_setup import AsyncDatabase
+from app.infrastructure.system.configuration.configuration import Config
+from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
+
+
+# Publishes user events from the users collection change stream.
+# Run a single instance alongside the API when EVENT_DELIVERY=change_stream.
+async def main():
+    publisher = UserChangePublisher(AsyncDatabase.connect())
+    try:
+        await publisher.run()
+    finally:
+        AsyncDatabase.disconnect()
+        Redis.disconnect()
+
+
+if __name__ == "__main__":
+    if Config.Event_delivery != "change_stream":
+        print(f"EVENT_DELIVERY is {Config.Event_delivery}; set it to change_stream to publish from the change stream.")
+        sys.exit(1)
+    try:
+        log_event("INFO", f"{Config.App_name} change stream publisher is starting...")
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        log_event("INFO", f"{Config.App_name} change stream publisher stopped.")
+    except Exception as e:
+        log_event("ERROR", f"An error occurred while running the {Config.App_name} change stream publisher: {e}")
+        print(f"An error occurred while running the {Config.App_name} change stream publisher: {e}")
+        sys.exit(1)
@@ -2,21 +2,30 @@ import sys
 from sanic import Sanic
 from sanic_ext import Extend
 from app.infrastructure.system.configuration.configuration import Config
-from app.infrastructure.persistence.database.setup.database_setup import Database
+from app.infrastructure.persistence.database.setup.database_setup import AsyncDatabase, Database
 from app.infrastructure.system.logger.utils.helper.logger_helper import log_event
-from app.infrastructure.messaging.redis.setup.redis_setup import Redis
+from app.infrastructure.system.logger.setup.logger_setup import stop_logger
+from app.infrastructure.messaging.redis.setup.redis_setup import AsyncRedis, Redis
 from app.infrastructure.secrets.vault.setup.vault_setup import Vault
 from app.infrastructure.web.routes.routes import setup_routes
 from app.infrastructure.web.handlers.handlers import setup_handlers
 from app.infrastructure.web.middleware.middleware import setup_middleware
 from app.infrastructure.web.services.services import (
+    initialize_cache,
     initialize_controller,
+    initialize_event_publisher,
+    initialize_existence_filter,
+    initialize_outbox_relay,
     initialize_services,
 )
 from app.infrastructure.web.docs.openapi_configuration import setup_openapi
+from app.infrastructure.system.serializer.utils.helper.serializer_helper import SerializerHelper
+from app.infrastructure.system.metrics.setup.metrics_setup import clear_metrics, mark_worker_stopped
+from app.infrastructure.system.metrics.utils.helper.metrics_helper import MetricsHelper
+from app.infrastructure.system.tracing.setup.tracing_setup import stop_tracing
 
-# Initialize the Sanic app
-app = Sanic(__name__)
+# Initialize the Sanic app; responses and request bodies use the shared JSON serializer
+app = Sanic(__name__, dumps=SerializerHelper.dumps_bytes, loads=SerializerHelper.loads)
 app.config.CORS_ORIGINS = "*"
 
 # Extend the app with Sanic-Ext
@@ -32,12 +41,50 @@ setup_middleware(app)
 setup_handlers(app)
 
 
+@app.listener("main_process_start")
+async def check_configuration(app, loop):
+    # Outbox events are only safe when they commit in the same transaction as the user write
+    if Config.Event_delivery == "outbox" and not Config.Db_transactions:
+        message = "EVENT_DELIVERY=outbox requires DB_TRANSACTIONS=true; use direct delivery without a replica set."
+        log_event("ERROR", message)
+        print(message)
+        raise RuntimeError(message)
+
+
+@app.listener("main_process_start")
+async def prepare_metrics(app, loop):
+    # Runs once, before the workers start, so the metrics of a previous run are not added in
+    clear_metrics()
+
+
 @app.listener("before_server_start")
 async def setup_services(app, loop):
-    user_application_service = await initialize_services()
-    user_controller = await initialize_controller(user_application_service)
+    # Runs in every worker process, so each worker owns its database and Redis connection pools
+    user_cache = await initialize_cache()
+    user_filter = await initialize_existence_filter()
+    app.ctx.event_publisher = await initialize_event_publisher()
+    user_application_service, user_repository = await initialize_services(
+        app.ctx.event_publisher, user_cache, user_filter
+    )
+    user_controller, system_controller = await initialize_controller(
+        user_application_service, user_cache, user_filter
+    )
     # Now setup routes correctly
-    setup_routes(app, user_controller)  # Assuming setup_routes doesn't need await
+    setup_routes(app, user_controller, system_controller)  # Assuming setup_routes doesn't need await
+    # Sends the events published by request handlers in pipelined batches
+    app.add_task(app.ctx.event_publisher.run(), name="event_publisher")
+    if user_cache:
+        # Drop locally cached users when another worker changes them
+        app.add_task(user_cache.listen_for_invalidations(), name="user_cache_invalidation")
+    if user_filter:
+        # Build the shared filter if no worker has yet, and repair it if a write to it was lost
+        app.add_task(user_filter.maintain(user_repository), name="user_filter_maintenance")
+    outbox_relay = initialize_outbox_relay()
+    if outbox_relay:
+        # Publish the events stored alongside user writes
+        app.add_task(outbox_relay.run(), name="outbox_relay")
+    if Config.Metrics_enabled:
+        app.add_task(MetricsHelper.monitor_loop_lag(), name="loop_lag_monitor")
 
 
 @app.listener("after_server_start")
@@ -50,6 +97,13 @@ async def notify_server_started(app, loop):
 async def notify_server_stopping(app, loop):
     log_event("INFO", f"{Config.App_name} is stopping...")
     print(f"{Config.App_name} is stopping...")
+    await app.cancel_task("user_cache_invalidation", raise_exception=False)
+    await app.cancel_task("user_filter_maintenance", raise_exception=False)
+    await app.cancel_task("outbox_relay", raise_exception=False)
+    await app.cancel_task("loop_lag_monitor", raise_exception=False)
+    # Send the events already queued before the publisher stops
+    await app.ctx.event_publisher.close()
+    await app.cancel_task("event_publisher", raise_exception=False)
 
 
 @app.listener("after_server_stop")
@@ -57,10 +111,16 @@ async def cleanup_services(app, loop):
     log_event("INFO", f"Disconnecting {Config.App_name} services...")
     print(f"Disconnecting {Config.App_name} services...")
     Database.disconnect()
+    AsyncDatabase.disconnect()
     Vault.disconnect()
     Redis.disconnect()
+    await AsyncRedis.disconnect()
     log_event("INFO", f"All {Config.App_name} services disconnected successfully.")
     print(f"All {Config.App_name} services disconnected successfully.")
+    mark_worker_stopped()
+    # Export the remaining spans, then write out the queued log records
+    stop_tracing()
+    stop_logger()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import asyncio
+
+from app.infrastructure.cache.bloom.bloom_filter import RedisBloomFilter
+
+
+class FakePipeline:
+    """Queues the bitmap commands the filter uses and applies them to FakeRedis on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    async def execute(self):
+        results = [getattr(self.redis, name)(*args) for name, args in self.commands]
+        self.commands = []
+        return results
+
+
+class FakeRedis:
+    """Bitmaps with Redis bit numbering: bit 0 is the most significant bit of the first byte."""
+
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def setbit(self, key, position, value):
+        bitmap = self.values.setdefault(key, bytearray())
+        if len(bitmap) <= position >> 3:
+            bitmap.extend(bytes((position >> 3) + 1 - len(bitmap)))
+        bitmap[position >> 3] |= 0x80 >> (position & 7)
+
+    def getbit(self, key, position):
+        bitmap = self.values.get(key, b"")
+        return int(position >> 3 < len(bitmap) and bool(bitmap[position >> 3] & (0x80 >> (position & 7))))
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def set(self, key, value):
+        self.values[key] = bytearray(value)
+
+    def bitop(self, operation, destination, *keys):
+        bitmaps = [self.values.get(key, bytearray()) for key in keys]
+        result = bytearray(max(len(bitmap) for bitmap in bitmaps))
+        for bitmap in bitmaps:
+            for index, byte in enumerate(bitmap):
+                result[index] |= byte
+        self.values[destination] = result
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def new_filter(redis=None):
+    return RedisBloomFilter(redis or FakeRedis(), "users:bloom", capacity=1000, error_rate=0.01)
+
+
+def test_size_and_hash_count_follow_capacity_and_error_rate():
+    bloom = new_filter()
+    assert bloom.size == 9586
+    assert bloom.hash_count == 7
+
+
+def test_positions_are_stable_and_within_the_bitmap():
+    positions = new_filter().positions("01ef9f9c-6671-406f-a388-93c9d1c7ca78")
+    assert positions == new_filter().positions("01ef9f9c-6671-406f-a388-93c9d1c7ca78")
+    assert len(positions) == 7
+    assert all(0 <= position < 9586 for position in positions)
+    assert len(set(positions)) == len(positions)
+
+
+def test_added_items_are_possibly_present():
+    bloom = new_filter()
+    items = [f"user-{index}" for index in range(500)]
+    asyncio.run(bloom.add(items))
+    assert asyncio.run(bloom.might_contain(items)) == [True] * len(items)
+
+
+def test_items_never_added_are_mostly_absent():
+    bloom = new_filter()
+    asyncio.run(bloom.add([f"user-{index}" for index in range(500)]))
+    answers = asyncio.run(bloom.might_contain([f"other-{index}" for index in range(1000)]))
+    # Half full at the configured 1% error rate, so well under 5% false positives
+    assert answers.count(True) < 50
+
+
+def test_set_bits_matches_the_bits_redis_sets():
+    redis = FakeRedis()
+    bloom = new_filter(redis)
+    items = [f"user-{index}" for index in range(100)]
+    asyncio.run(bloom.add(items))
+    bitmap = bloom.new_bitmap()
+    bloom.set_bits(bitmap, items)
+    assert bytes(bitmap).rstrip(b"\0") == bytes(redis.values["users:bloom"]).rstrip(b"\0")
+
+
+def test_merge_keeps_bits_set_by_other_workers():
+    redis = FakeRedis()
+    bloom = new_filter(redis)
+    asyncio.run(bloom.add(["added-by-another-worker"]))
+    bitmap = bloom.new_bitmap()
+    bloom.set_bits(bitmap, ["built-locally"])
+    asyncio.run(bloom.merge(bitmap))
+    assert asyncio.run(bloom.might_contain(["added-by-another-worker", "built-locally"])) == [True, True]
+    assert "users:bloom:staging" not in redis.values
+
+
+def test_every_item_is_possibly_present_until_the_filter_is_ready():
+    bloom = new_filter()
+    assert asyncio.run(bloom.might_contain(["a", "b"], ready_key="users:bloom:ready")) == [True, True]
+    asyncio.run(bloom.add(["a"]))
+    bloom.redis_client.set("users:bloom:ready", b"1")
+    assert asyncio.run(bloom.might_contain(["a", "b"], ready_key="users:bloom:ready")) == [True, False]
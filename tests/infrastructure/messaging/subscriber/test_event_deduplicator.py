@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.infrastructure.messaging.subscriber.event_deduplicator import HANDLED, PROCESSING, EventDeduplicator
+from app.infrastructure.system.configuration.configuration import Config
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+    def execute(self):
+        if self.redis.down:
+            raise ConnectionError("Redis is down")
+        return [self.redis.set(*args, **kwargs) for args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """The SET, MGET and DELETE subset of redis-py the deduplicator uses, recording expiries."""
+
+    def __init__(self):
+        self.values = {}
+        self.expiries = {}
+        self.down = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value).encode()
+        self.expiries[key] = ex
+        return True
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+@pytest.fixture
+def local(monkeypatch):
+    monkeypatch.setattr(Config, "Event_dedup", "local")
+    return EventDeduplicator.create("user_subscriber", redis_client=FakeRedis())
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+def test_create_follows_the_configured_mode(monkeypatch, redis):
+    monkeypatch.setattr(Config, "Event_dedup", "off")
+    assert EventDeduplicator.create("user_subscriber", redis) is None
+    monkeypatch.setattr(Config, "Event_dedup", "local")
+    assert EventDeduplicator.create("user_subscriber", redis).redis_client is None
+    monkeypatch.setattr(Config, "Event_dedup", "redis")
+    assert EventDeduplicator.create("user_subscriber", redis).redis_client is redis
+
+
+def test_local_claims_each_reference_once(local):
+    assert local.claim(["a", "b", "a"]) == [True, True, False]
+    assert local.claim(["a", "c"]) == [False, True]
+    assert local.stats() == {"duplicates": 2, "errors": 0}
+
+
+def test_events_without_a_reference_are_always_new(local):
+    assert local.claim([None, None]) == [True, True]
+    assert asyncio.run(local.claim_async([None])) == [True]
+    assert local.handled([None]) == [False]
+
+
+def test_local_reference_is_handled_only_once_confirmed(local):
+    local.claim(["a"])
+    assert local.handled(["a"]) == [False]
+    local.confirm(["a", None])
+    assert local.handled(["a"]) == [True]
+    assert local.claim(["a"]) == [False]
+
+
+def test_local_released_reference_can_be_claimed_again(local):
+    local.claim(["a"])
+    local.release("a")
+    assert local.handled(["a"]) == [False]
+    assert local.claim(["a"]) == [True]
+
+
+def test_local_async_claims_and_releases(local):
+    assert asyncio.run(local.claim_async(["a"])) == [True]
+    assert asyncio.run(local.claim_async(["a"])) == [False]
+    asyncio.run(local.release_async("a"))
+    assert asyncio.run(local.claim_async(["a"])) == [True]
+    asyncio.run(local.confirm_async(["a"]))
+    assert local.handled(["a"]) == [True]
+
+
+def test_redis_claim_marks_processing_for_the_processing_ttl(redis):
+    deduplicator = EventDeduplicator("user_subscriber", redis)
+    assert deduplicator.claim(["a", None, "a"]) == [True, True, False]
+    key = deduplicator.key("a")
+    assert key == f"{Config.App_name}:event_seen:user_subscriber:a"
+    assert int(redis.values[key]) == PROCESSING
+    assert redis.expiries[key] == Config.Event_dedup_processing_ttl
+    assert deduplicator.handled(["a"]) == [False]
+
+
+def test_redis_confirm_marks_handled_for_the_full_ttl(redis):
+    deduplicator = EventDeduplicator("user_subscriber", redis)
+    deduplicator.claim(["a", "b"])
+    deduplicator.confirm(["a"])
+    key = deduplicator.key("a")
+    assert int(redis.values[key]) == HANDLED
+    assert redis.expiries[key] == Config.Event_dedup_ttl
+    assert deduplicator.handled(["a", None, "b", "c"]) == [True, False, False, False]
+
+
+def test_redis_release_lets_a_redelivery_be_handled(redis):
+    deduplicator = EventDeduplicator("user_subscriber", redis)
+    deduplicator.claim(["a"])
+    deduplicator.release("a")
+    assert deduplicator.claim(["a"]) == [True]
+
+
+def test_scopes_do_not_share_references(redis):
+    EventDeduplicator("user_subscriber", redis).claim(["a"])
+    assert EventDeduplicator("audit_subscriber", redis).claim(["a"]) == [True]
+
+
+def test_redis_errors_let_events_through(redis):
+    deduplicator = EventDeduplicator("user_subscriber", redis)
+    deduplicator.claim(["a"])
+    redis.down = True
+    assert deduplicator.claim(["a", "b"]) == [True, True]
+    deduplicator.confirm(["a"])
+    assert deduplicator.stats() == {"duplicates": 0, "errors": 2}